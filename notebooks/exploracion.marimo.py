@@ -8,8 +8,8 @@ app = marimo.App(width="medium")
 def _():
     import pandas as pd
     from taller_utils.analysis import explorar_relacion_con_target
-    from taller_utils.helpers import resumen_na
-    return explorar_relacion_con_target, pd, resumen_na
+    from taller_utils.dataset import open_processed_dataset
+    return explorar_relacion_con_target, open_processed_dataset, pd
 
 
 @app.cell
@@ -24,111 +24,112 @@ def _(pd):
 
 
 @app.cell
-def _(df, resumen_na):
-    resumen_na(df)
+def _(df):
+    df.resumen_na()
     return
 
 
 @app.cell
-def _(pd):
-    df = pd.read_csv("data/processed/encuesta_codificada.csv")
-    df.head()
+def _(open_processed_dataset):
+    # Solo se lee el esquema: cada celda carga las columnas de su pregunta y el target
+    df = open_processed_dataset("data/processed/encuesta_codificada.parquet")
+    df
     return (df,)
 
 
 @app.cell
-def _(df, resumen_na):
-    resumen_na(df)
+def _(df):
+    df.resumen_na()
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Qué tanto te gusta estudiar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Qué tanto te gusta estudiar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Cuántas horas te dedicarías en una semana a estudiar para una asignatura si no tuvieras una evaluación pronto?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Cuántas horas te dedicarías en una semana a estudiar para una asignatura si no tuvieras una evaluación pronto?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Cuánto tiempo dedicas en una semana a estudiar para una asignatura en la que pronto tendrás una evaluación?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Cuánto tiempo dedicas en una semana a estudiar para una asignatura en la que pronto tendrás una evaluación?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="Si sientes que estás preparad(a/o) para una evaluación ¿Dedicarías horas a estudiar de todas formas?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="Si sientes que estás preparad(a/o) para una evaluación ¿Dedicarías horas a estudiar de todas formas?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="Cuando estudias algo relacionado con Matemática...¿Cuántos ejercicios resuelves en una sesión de estudio?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="Cuando estudias algo relacionado con Matemática...¿Cuántos ejercicios resuelves en una sesión de estudio?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Cuál o cuáles de los siguientes métodos utilizas para estudiar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Cuál o cuáles de los siguientes métodos utilizas para estudiar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿En qué horario prefieres estudiar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿En qué horario prefieres estudiar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Qué lugar(es) utilizas para estudiar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Qué lugar(es) utilizas para estudiar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Qué factores consideras que dificultan tus estudios?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Qué factores consideras que dificultan tus estudios?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Sientes que tienes tiempo suficiente para estudiar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Sientes que tienes tiempo suficiente para estudiar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Cuántas horas dedicas diariamente a dormir?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Cuántas horas dedicas diariamente a dormir?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Cuántas horas dedicas diariamente a descansar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Cuántas horas dedicas diariamente a descansar?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Estudias sol(a/o) o acompañad(a/o)?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Estudias sol(a/o) o acompañad(a/o)?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="¿Si no sabes resolver un problema a quién acudes?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="¿Si no sabes resolver un problema a quién acudes?", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
 @app.cell
 def _(df, explorar_relacion_con_target):
-    explorar_relacion_con_target(df, pregunta="Por favor describe brevemente por qué estás estudiando esta carrera", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?")
+    explorar_relacion_con_target(df, pregunta="Por favor describe brevemente por qué estás estudiando esta carrera", target="¿Has tenido la idea de retirarte o cambiarte a otra carrera?", cache=True)
     return
 
 
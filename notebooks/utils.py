@@ -1,11 +1,9 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import pandas as pd
 import numpy as np
-from scipy.stats import chi2_contingency
-from sklearn.preprocessing import OneHotEncoder
 import yaml
 from datetime import datetime
+from taller_utils.encoding import encode_multiselect
+from taller_utils.sparse import multiselect_indicators
 
 def plot_distribution(
    df: pd.DataFrame, 
@@ -31,6 +29,8 @@ def plot_distribution(
    target_counts = df[variable_name].value_counts().sort_index(ascending=ascending)
    title_text = question_text if question_text else f'Distribution for {variable_name}'
    
+   import matplotlib.pyplot as plt
+
    plt.figure(figsize=figsize if horizontal else figsize[::-1])
    target_counts.plot(
        kind='barh' if horizontal else 'bar',
@@ -88,6 +88,7 @@ def test_missing_mcar(df: pd.DataFrame, alpha: float = 0.01) -> None:
     contingency_table = np.array(observed).reshape(-1, 1)
 
     # Perform the chi-squared test
+    from scipy.stats import chi2_contingency
     chi2, p_value, dof, expected = chi2_contingency(contingency_table, correction=False)
 
     # Print test results
@@ -124,7 +125,8 @@ def process_survey_data(
     df: pd.DataFrame, 
     encoding_dict: dict, 
     one_hot_encoders: dict = None, 
-    ohe_categorical: bool = False
+    ohe_categorical: bool = False,
+    sparse: bool = False
 ) -> pd.DataFrame:
     """
     Processes survey data based on a given encoding dictionary.
@@ -135,6 +137,10 @@ def process_survey_data(
     - one_hot_encoders (dict): Dictionary to store OneHotEncoders for categorical variables.
     - ohe_categorical (bool): If True, apply one-hot encoding to categorical variables.
                             If False, replace categorical values with letters.
+    - sparse (bool): With ohe_categorical, build the dummies directly as a CSR matrix
+                     (taller_utils.sparse.SparseIndicators) and add them as pandas sparse
+                     columns, without exploding the responses. The matrix is stored in
+                     one_hot_encoders[question]['indicators'] for sklearn models.
 
     Returns:
     - pd.DataFrame: The processed DataFrame.
@@ -170,7 +176,22 @@ def process_survey_data(
             df[question_text] = df[question_text].apply(map_and_warn)
 
         elif encoding_type == 'categorical':
-            if ohe_categorical:
+            if ohe_categorical and sparse:
+                categories = list(encoding.keys())
+                indicators = multiselect_indicators(
+                    df[question_text],
+                    [f"{question_text}_{cat}" for cat in categories],
+                    {cat: i for i, cat in enumerate(categories)},
+                    sep=', ',
+                    strip=True
+                )
+                one_hot_encoders[question_text] = {
+                    'categories': categories,
+                    'encoded_columns': indicators.columns,
+                    'indicators': indicators
+                }
+                df = df.drop(columns=[question_text]).join(indicators.to_frame())
+            elif ohe_categorical:
                 try:
                     # Split multiple responses
                     responses = df[question_text].str.split(', ').explode().str.strip()
@@ -197,13 +218,9 @@ def process_survey_data(
                     print(f'Error one-hot encoding {question_text}: {str(e)}')
                     continue
             else:
-                # Handle multiple responses for categorical variables
-                for category_key, category_code in encoding.items():
-                    col_name = f"{question_text}__{category_code}"
-                    df[col_name] = df[question_text].apply(
-                        lambda x: category_key in str(x).split(', ') if pd.notna(x) else False
-                    ).astype(int)
-                df.drop(columns=[question_text], inplace=True)
+                # Handle multiple responses for categorical variables in a single pass
+                dummies = encode_multiselect(df[question_text], encoding, question_text)
+                df = pd.concat([df.drop(columns=[question_text]), dummies], axis=1)
         
     # Mostrar resumen de valores no mapeados
     for question, values in unmapped_values.items():
@@ -0,0 +1,117 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from taller_utils.analysis import resumen_relaciones_con_target
+from taller_utils.encoding import process_survey_data
+from taller_utils.helpers import calculate_age_series, resumen_na
+from taller_utils.missing_data import test_missing_mcar
+from taller_utils.synthetic import BIRTH_DATE_COLUMN, SYNTHETIC_TARGET, generate_survey
+
+# Fecha fija para que la edad calculada no dependa del día en que se corre el benchmark
+REFERENCE_DATE = "2025-01-01"
+
+BENCHMARKS = {
+    "process_survey_data": lambda raw, spec, encoded: process_survey_data(raw, spec, log_unmapped=False),
+    "test_missing_mcar": lambda raw, spec, encoded: test_missing_mcar(raw, verbose=False),
+    "resumen_na": lambda raw, spec, encoded: resumen_na(raw),
+    "calculate_age_series": lambda raw, spec, encoded: calculate_age_series(raw[BIRTH_DATE_COLUMN], REFERENCE_DATE),
+    "resumen_relaciones_con_target": lambda raw, spec, encoded: resumen_relaciones_con_target(encoded, SYNTHETIC_TARGET),
+}
+
+def measure(function, repeat: int, memory: bool) -> dict:
+    """
+    Mide el mejor tiempo de `repeat` ejecuciones y, en una ejecución aparte, el pico de memoria
+    asignada (tracemalloc registra las asignaciones de Python y NumPy, no los buffers de Arrow).
+    También guarda el máximo de memoria residente del proceso hasta ese momento.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"wall_s": min(times), "wall_s_all": times, "peak_mb": peak_mb, "max_rss_mb": max_rss_mb}
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+parser = argparse.ArgumentParser(description="Mide tiempo y memoria de las funciones principales sobre encuestas sintéticas.")
+parser.add_argument(
+    "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000],
+    help="Cantidades de filas a medir"
+)
+parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                    help="Funciones a medir (por defecto, todas)")
+parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición; se guarda el mejor tiempo")
+parser.add_argument("--seed", type=int, default=0, help="Semilla de la encuesta sintética")
+parser.add_argument("--unmapped-fraction", type=float, default=0.01, help="Fracción de respuestas no mapeadas")
+parser.add_argument("--missing-fraction", type=float, default=0.05, help="Fracción de respuestas faltantes")
+parser.add_argument("--no-memory", action="store_true", help="No mide el pico de memoria (evita la ejecución extra)")
+parser.add_argument(
+    "--output", default="data/benchmarks/benchmarks.jsonl",
+    help="Archivo JSON Lines donde se agregan los resultados (una línea por función y tamaño)"
+)
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+
+    run = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "unmapped_fraction": args.unmapped_fraction,
+        "missing_fraction": args.missing_fraction,
+    }
+
+    for n_rows in args.sizes:
+        raw, spec = generate_survey(
+            n_rows, seed=args.seed,
+            unmapped_fraction=args.unmapped_fraction, missing_fraction=args.missing_fraction
+        )
+        encoded = process_survey_data(raw, spec, log_unmapped=False)
+
+        for name in args.benchmarks:
+            result = measure(lambda: BENCHMARKS[name](raw, spec, encoded), args.repeat, not args.no_memory)
+            record = {**run, "benchmark": name, "n_rows": n_rows, "n_columns": raw.shape[1], **result}
+            with open(args.output, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+            peak = f"{result['peak_mb']:.1f} MB" if result['peak_mb'] is not None else "-"
+            print(f"⏱️  {name:<32} {n_rows:>12,} filas  {result['wall_s']:>9.3f} s  pico {peak}")
+
+        del raw, encoded
+        gc.collect()
+
+    print(f"✅ Resultados agregados en {args.output}")
@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Qué se mide: código a ejecutar con `python -c` (o argumentos de un script)
+TARGETS = {
+    "taller_utils": ["-c", "import taller_utils"],
+    "taller_utils.encoding": ["-c", "import taller_utils.encoding"],
+    "taller_utils.pipeline": ["-c", "import taller_utils.pipeline"],
+    "taller_utils.analysis": ["-c", "import taller_utils.analysis"],
+    "taller_utils.missing_data": ["-c", "import taller_utils.missing_data"],
+    "taller_utils.visuals": ["-c", "import taller_utils.visuals"],
+    "run_pipeline.py --help": [os.path.join(ROOT, "scripts", "run_pipeline.py"), "--help"],
+}
+
+# Paquetes pesados que no deberían cargarse al importar el pipeline
+HEAVY_MODULES = ("matplotlib", "seaborn", "scipy", "sklearn")
+
+def import_times(stderr: str) -> dict:
+    """
+    Tiempo acumulado (segundos) de cada módulo importado, según la salida de `-X importtime`.
+    La sangría del nombre indica la profundidad: los de primer nivel no tienen sangría.
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name[1:]] = int(cumulative) / 1e6
+    return times
+
+def measure(args: list, repeat: int) -> dict:
+    """
+    Mediana del tiempo de arranque de `repeat` procesos nuevos, con el detalle de `-X importtime`
+    de la última ejecución.
+    """
+    env = {**os.environ, "PYTHONPATH": os.path.join(ROOT, "src")}
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args], capture_output=True, text=True, check=True, env=env
+        )
+        times.append(time.perf_counter() - start)
+    modules = import_times(result.stderr)
+    loaded = {name.strip().split(".")[0] for name in modules}
+    top_level = {name: seconds for name, seconds in modules.items() if not name.startswith(" ")}
+    return {
+        "wall_s": statistics.median(times),
+        "wall_s_all": times,
+        "heavy_modules": [name for name in HEAVY_MODULES if name in loaded],
+        "top_imports": dict(sorted(top_level.items(), key=lambda item: -item[1])[:5]),
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=ROOT
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+parser = argparse.ArgumentParser(description="Mide el tiempo de arranque (importación) de taller_utils y del pipeline.")
+parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS),
+                    help="Importaciones a medir (por defecto, todas)")
+parser.add_argument("--repeat", type=int, default=5, help="Procesos por medición; se guarda la mediana")
+parser.add_argument(
+    "--output", default="data/benchmarks/imports.jsonl",
+    help="Archivo JSON Lines donde se agregan los resultados (una línea por importación)"
+)
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+
+    run = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+
+    for name in args.targets:
+        result = measure(TARGETS[name], args.repeat)
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**run, "target": name, **result}, ensure_ascii=False) + "\n")
+
+        heavy = ", ".join(result["heavy_modules"]) or "-"
+        print(f"⏱️  {name:<28} {result['wall_s']:>7.3f} s  pesados: {heavy}")
+
+    print(f"✅ Resultados agregados en {args.output}")
@@ -1,16 +1,160 @@
-import pandas as pd
-from taller_utils.encoding import load_yaml_encodings, process_survey_data
+import argparse
+import glob
+import os
+import sys
+import time
+from datetime import datetime
 
-# Cargar los datos crudos (ajusta la ruta según corresponda)
-df = pd.read_csv("data/raw/encuesta.csv")
+parser = argparse.ArgumentParser(description="Codifica las respuestas crudas de la encuesta.")
+parser.add_argument(
+    "--input", default="data/raw/encuesta.csv",
+    help="CSV crudo de la encuesta, o un directorio o patrón glob ('data/raw/ola_*.csv') para codificar "
+         "varios archivos con la misma especificación"
+)
+parser.add_argument("--encodings", default="data/raw/encodings.yaml", help="Archivo YAML o JSON con las codificaciones")
+parser.add_argument(
+    "--output", default=None,
+    help="Archivo de salida (.parquet o .csv). Por defecto data/processed/encuesta_codificada.parquet; "
+         "con varios archivos de entrada es un directorio (por defecto data/processed/olas)"
+)
+parser.add_argument(
+    "--jobs", type=int, default=1,
+    help="Con varios archivos de entrada, cuántos se codifican a la vez en procesos separados (-1: todos los núcleos)"
+)
+parser.add_argument(
+    "--chunksize", type=int, default=None,
+    help="Procesa el CSV por bloques de este tamaño y escribe la salida de forma incremental"
+)
+parser.add_argument(
+    "--unmapped-report", default="data/processed/unmapped_values.json",
+    help="Archivo JSON con el reporte de valores no mapeados"
+)
+parser.add_argument(
+    "--incremental", action="store_true",
+    help="Codifica solo las filas agregadas desde la última ejecución. Con salida .parquet, la salida "
+         "es un directorio con una partición por ejecución; con .csv, se agregan al final"
+)
+parser.add_argument(
+    "--rebuild", action="store_true",
+    help="Con --incremental, reconstruye la salida completa aunque la especificación no haya cambiado"
+)
+parser.add_argument(
+    "--backend", choices=["pandas", "arrow"], default="pandas",
+    help="Motor de codificación del modo de archivo completo: 'arrow' lee el CSV con pyarrow.csv "
+         "(multihilo) y codifica con pyarrow.compute sin pasar por pandas"
+)
+parser.add_argument(
+    "--metrics", default=None,
+    help="Archivo JSON Lines donde se agregan los tiempos por pregunta y por etapa (por defecto no se mide)"
+)
+parser.add_argument(
+    "--match-threshold", type=float, default=None,
+    help="En el modo de archivo completo con pandas, codifica los valores no mapeados con la clave "
+         "del encoding más parecida (sin tildes, mayúsculas ni espacios extra, o por distancia de "
+         "edición) si su puntaje es mayor o igual a este umbral (por ejemplo, 0.85)"
+)
+args = parser.parse_args()
 
-# Cargar el diccionario de codificación
-encoding_dict = load_yaml_encodings("data/raw/encodings.yaml")  # o diccionario .json adaptado si es el caso
+batch = os.path.isdir(args.input) or glob.has_magic(args.input)
+if batch and (args.incremental or args.rebuild):
+    parser.error("--incremental y --rebuild son para un solo archivo de entrada, no para un directorio o patrón")
+if args.backend == "arrow" and (batch or args.incremental or args.chunksize):
+    parser.error("--backend arrow es para el modo de archivo completo, no con --chunksize, --incremental ni varios archivos")
+if args.match_threshold is not None and (batch or args.incremental or args.chunksize or args.backend == "arrow"):
+    parser.error("--match-threshold solo se aplica en el modo de archivo completo con --backend pandas")
 
-# Procesar los datos
-df_encoded = process_survey_data(df, encoding_dict)
+# taller_utils se importa después de leer los argumentos: `--help` y los errores de argumentos
+# responden sin cargarlo. Cada modo importa solo lo que usa (pyarrow.parquet y pyarrow.csv se
+# cargan con `pipeline`, `dataset` y `arrow_encoding`)
+from taller_utils.instrumentation import JsonLinesExporter, StageEvent
+from taller_utils.plan import load_encoding_plan
 
-# Guardar resultados
-df_encoded.to_csv("data/processed/encuesta_codificada.csv", index=False)
+# Cargar el plan de codificación (compilado y cacheado según el contenido del archivo)
+encoding_dict = load_encoding_plan(args.encodings)
 
-print("✅ Codificación finalizada. Archivo guardado en data/processed/encuesta_codificada.csv")
\ No newline at end of file
+output_path = args.output or ("data/processed/olas" if batch else "data/processed/encuesta_codificada.parquet")
+
+# Métricas por pregunta y etapa, identificadas con el archivo de entrada y la hora de inicio
+observer = None
+if args.metrics:
+    observer = JsonLinesExporter(
+        args.metrics, extra={"input": args.input, "started_at": datetime.now().isoformat(timespec="seconds")}
+    )
+
+if batch:
+    # Varios archivos: una salida por archivo y el directorio como dataset combinado
+    from taller_utils.pipeline import process_survey_batch
+
+    run = process_survey_batch(
+        args.input, output_path, encoding_dict, n_jobs=args.jobs, chunksize=args.chunksize or 100_000,
+        unmapped_path=args.unmapped_report, observer=observer
+    )
+    ok = len(run.files) - len(run.failed)
+    print(f"📦 {ok} de {len(run.files)} archivo(s) codificado(s); dataset combinado en {output_path}")
+elif args.incremental:
+    # Modo incremental: solo las respuestas nuevas, según el manifiesto de la salida
+    from taller_utils.pipeline import process_survey_incremental
+
+    run = process_survey_incremental(
+        args.input, output_path, encoding_dict, chunksize=args.chunksize or 100_000,
+        unmapped_path=args.unmapped_report, observer=observer, rebuild=args.rebuild
+    )
+    action = "Reconstrucción completa" if run.rebuilt else "Actualización incremental"
+    print(f"🧩 {action}: {run.new_rows} fila(s) nueva(s), {run.total_rows} en total")
+elif args.chunksize:
+    # Modo streaming: memoria acotada por el tamaño del bloque
+    from taller_utils.pipeline import process_survey_file
+
+    process_survey_file(
+        args.input, output_path, encoding_dict, chunksize=args.chunksize, unmapped_path=args.unmapped_report,
+        observer=observer
+    )
+elif args.backend == "arrow":
+    # Lectura y codificación en Arrow; solo se convierte a pandas si la salida es CSV
+    from taller_utils.arrow_encoding import process_survey_arrow, table_to_pandas
+    from taller_utils.dataset import write_processed_dataset
+
+    table = process_survey_arrow(args.input, encoding_dict, unmapped_path=args.unmapped_report, observer=observer)
+
+    start = time.perf_counter()
+    if output_path.endswith(".parquet"):
+        write_processed_dataset(table, output_path, encoding_dict)
+    else:
+        table_to_pandas(table, encoding_dict).to_csv(output_path, index=False)
+    if observer is not None:
+        observer(StageEvent(stage="write", wall_s=time.perf_counter() - start, rows=table.num_rows))
+else:
+    from taller_utils.encoding import process_survey_data
+    from taller_utils.pipeline import read_survey_frame
+
+    # Cargar los datos crudos como texto, igual que el modo por bloques
+    start = time.perf_counter()
+    df = read_survey_frame(args.input)
+    if observer is not None:
+        observer(StageEvent(stage="read", wall_s=time.perf_counter() - start, rows=len(df)))
+
+    # Procesar los datos
+    df_encoded = process_survey_data(
+        df, encoding_dict, unmapped_path=args.unmapped_report, observer=observer, match_threshold=args.match_threshold
+    )
+
+    # Guardar resultados
+    start = time.perf_counter()
+    if output_path.endswith(".parquet"):
+        # Conserva los tipos y la especificación de encoding en los metadatos del archivo
+        from taller_utils.dataset import write_processed_dataset
+
+        write_processed_dataset(df_encoded, output_path, encoding_dict)
+    else:
+        df_encoded.to_csv(output_path, index=False)
+    if observer is not None:
+        observer(StageEvent(stage="write", wall_s=time.perf_counter() - start, rows=len(df_encoded)))
+
+if observer is not None:
+    observer.close()
+    print(f"⏱️  Métricas agregadas en {args.metrics}")
+
+if batch and run.failed:
+    sys.exit(1)
+
+print(f"✅ Codificación finalizada. Archivo guardado en {output_path}")
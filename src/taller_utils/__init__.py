@@ -0,0 +1,65 @@
+"""
+Utilidades para codificar y analizar la encuesta del taller.
+
+Las funciones principales se pueden importar directamente desde `taller_utils`. Cada una se
+carga recién al usarla, desde su módulo: `from taller_utils import process_survey_data` no
+importa matplotlib, seaborn ni scipy.
+"""
+import importlib
+
+# Nombre público -> módulo donde está definido
+_EXPORTS = {
+    "process_survey_data": "encoding",
+    "load_yaml_encodings": "encoding",
+    "encode_multiselect": "encoding",
+    "SurveyEncoder": "encoder",
+    "SparseIndicators": "sparse",
+    "TargetAggregates": "streaming",
+    "QuantileSketch": "streaming",
+    "suggest_matches": "matching",
+    "apply_matches": "matching",
+    "EncodingPlan": "plan",
+    "load_encoding_plan": "plan",
+    "process_survey_file": "pipeline",
+    "read_survey_frame": "pipeline",
+    "process_survey_incremental": "pipeline",
+    "IncrementalRun": "pipeline",
+    "process_survey_batch": "pipeline",
+    "BatchRun": "pipeline",
+    "process_survey_arrow": "arrow_encoding",
+    "read_survey_csv": "arrow_encoding",
+    "ProcessedDataset": "dataset",
+    "open_processed_dataset": "dataset",
+    "write_processed_dataset": "dataset",
+    "UnmappedReport": "unmapped",
+    "StageEvent": "instrumentation",
+    "EventCollector": "instrumentation",
+    "JsonLinesExporter": "instrumentation",
+    "LoggingObserver": "instrumentation",
+    "calculate_age": "helpers",
+    "calculate_age_series": "helpers",
+    "resumen_na": "helpers",
+    "memory_report": "helpers",
+    "explorar_relacion_con_target": "analysis",
+    "resumen_relaciones_con_target": "analysis",
+    "matriz_asociaciones": "analysis",
+    "pruebas_permutacion": "resampling",
+    "ResultCache": "cache",
+    "test_missing_mcar": "missing_data",
+    "plot_distribution": "visuals",
+    "export_target_report": "visuals",
+    "generate_survey": "synthetic",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'taller_utils' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f"taller_utils.{module}"), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
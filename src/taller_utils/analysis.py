@@ -1,10 +1,13 @@
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-from scipy.stats import mannwhitneyu, chi2_contingency, fisher_exact, power_divergence
+from taller_utils.cache import content_key, resolve_cache
+from taller_utils.dataset import ProcessedDataset
+from taller_utils.sparse import SparseIndicators
 
-def explorar_relacion_con_target(df, pregunta, target):
+# seaborn, matplotlib y scipy.stats se importan dentro de las funciones que los usan: importar
+# este módulo (por ejemplo, solo para `resumen_relaciones_con_target`) no carga el stack de gráficos.
+
+def explorar_relacion_con_target(df, pregunta, target, mostrar=True, cache=None, tamano_bloque=None):
     """
     Analiza la relación entre una variable de encuesta y una variable objetivo binaria.
 
@@ -24,8 +27,10 @@ def explorar_relacion_con_target(df, pregunta, target):
 
     Parámetros
     ----------
-    df : pd.DataFrame
-        DataFrame codificado con las respuestas de la encuesta.
+    df : pd.DataFrame o ProcessedDataset
+        DataFrame codificado con las respuestas de la encuesta. Con un `ProcessedDataset`
+        (ver `taller_utils.dataset.open_processed_dataset`) solo se leen del archivo las
+        columnas de la pregunta y del target.
     
     pregunta : str
         Nombre exacto de la columna (para preguntas simples) o prefijo (para preguntas multiselect).
@@ -33,10 +38,29 @@ def explorar_relacion_con_target(df, pregunta, target):
     target : str
         Nombre de la columna objetivo binaria (0: no, 1: sí).
 
+    mostrar : bool, opcional
+        Si es True (por defecto), muestra los gráficos con `plt.show()`. Si es False, no dibuja
+        nada en pantalla ni usa el estado global de pyplot: construye las figuras y las retorna,
+        para guardarlas o exportarlas en lote (ver `taller_utils.visuals.export_target_report`).
+
+    cache : bool o ResultCache, opcional
+        Caché de las estadísticas (tablas, resúmenes y pruebas), con clave según los datos de la
+        pregunta y del target. True usa el caché por defecto (ver `taller_utils.cache.ResultCache`).
+        Las figuras se dibujan siempre. Por defecto no se usa caché.
+
+    tamano_bloque : int, opcional
+        Solo con un `ProcessedDataset`: en vez de cargar la pregunta completa, la recorre en bloques
+        de esta cantidad de filas y acumula conteos y resúmenes combinables
+        (ver `taller_utils.streaming.TargetAggregates`), así que la memoria no depende del tamaño
+        del archivo. Los resultados son los mismos, salvo los cuantiles y la prueba de Mann–Whitney
+        de variables numéricas con muchos valores distintos, que son aproximados. El boxplot se
+        dibuja sin valores atípicos y no se usa el caché. Por defecto se carga la pregunta completa.
+
     Retorna
     -------
-    None
-        Muestra visualizaciones y estadísticas por pantalla. No retorna objetos.
+    None o list of matplotlib.figure.Figure
+        Con `mostrar=True`, muestra visualizaciones y estadísticas por pantalla y no retorna objetos.
+        Con `mostrar=False`, retorna las figuras generadas, en orden.
     
     Notas
     -----
@@ -44,89 +68,599 @@ def explorar_relacion_con_target(df, pregunta, target):
     - Para preguntas categóricas con muchas categorías o con baja frecuencia por categoría, se recomienda revisar las advertencias de validez estadística.
     """
 
+    figuras = []
+
+    por_bloques = isinstance(df, ProcessedDataset) and tamano_bloque is not None
+    if isinstance(df, ProcessedDataset) and not por_bloques:
+        df = df.read_questions(target, pregunta)
+
     if target not in df.columns:
         print(f"⚠️ Target '{target}' no encontrado.")
-        return
+        return None if mostrar else figuras
 
     columnas_multi = [col for col in df.columns if col.startswith(f"{pregunta}__")]
 
-    if columnas_multi:
+    if not columnas_multi and pregunta not in df.columns:
+        print(f"⚠️ Pregunta '{pregunta}' no encontrada.")
+        return None if mostrar else figuras
+
+    cache = resolve_cache(cache)
+    if por_bloques:
+        from taller_utils.streaming import TargetAggregates
+
+        estadisticas = TargetAggregates.from_dataset(df, pregunta, target, tamano_bloque).statistics()
+    elif cache is None:
+        estadisticas = _estadisticas_exploracion(df, pregunta, target, columnas_multi)
+    else:
+        clave = content_key("explorar_relacion_con_target", df[[target, *(columnas_multi or [pregunta])]])
+        estadisticas = cache.get_or_compute(clave, _estadisticas_exploracion, df, pregunta, target, columnas_multi)
+
+    if estadisticas["tipo"] == "multiselect":
         print(f"🔀 Pregunta multiselect detectada: {pregunta}")
-        medios = df.groupby(target)[columnas_multi].mean().T
-        medios.columns = ["No (0)", "Sí (1)"]
-        medios.plot(kind="barh", figsize=(10, len(columnas_multi) * 0.5))
-        plt.title(f"Proporción de uso por grupo del target\n{pregunta}")
-        plt.xlabel("Proporción")
-        plt.ylabel("Opción seleccionada")
-        plt.grid(axis="x", linestyle="--", alpha=0.6)
-        plt.tight_layout()
-        plt.show()
-        return
+        fig, ax = _nueva_figura((10, len(columnas_multi) * 0.5), mostrar)
+        estadisticas["medios"].plot(kind="barh", ax=ax)
+        ax.set_title(f"Proporción de uso por grupo del target\n{pregunta}")
+        ax.set_xlabel("Proporción")
+        ax.set_ylabel("Opción seleccionada")
+        ax.grid(axis="x", linestyle="--", alpha=0.6)
+        _terminar_figura(fig, mostrar, figuras)
+        return None if mostrar else figuras
 
-    if pregunta not in df.columns:
-        print(f"⚠️ Pregunta '{pregunta}' no encontrada.")
-        return
+    if estadisticas["tipo"] == "numerica":
+        print(f"📈 Análisis numérico/ordinal para: {pregunta}")
+        print(estadisticas["resumen"])
+
+        if estadisticas["tabla"] is not None:
+            fig, ax = _nueva_figura((8, 5), mostrar)
+            estadisticas["tabla"].plot(kind='bar', stacked=True, colormap="Paired", ax=ax)
+            ax.set_title(f"Distribución de respuestas por grupo del target\n{pregunta}")
+            ax.set_xlabel("Respuesta ordinal")
+            ax.set_ylabel("Porcentaje")
+            ax.legend(title="Target", labels=["No (0)", "Sí (1)"])
+            _terminar_figura(fig, mostrar, figuras)
+
+        fig, ax = _nueva_figura(None, mostrar)
+        if "cajas" in estadisticas:
+            ax.bxp(estadisticas["cajas"], showfliers=False)
+            ax.set_xlabel(target)
+            ax.set_ylabel(pregunta)
+        else:
+            import seaborn as sns
+
+            sns.boxplot(data=df, x=target, y=pregunta, ax=ax)
+        ax.set_title(f"Distribución de '{pregunta}' según target")
+        ax.grid(axis="y", linestyle="--", alpha=0.6)
+        _terminar_figura(fig, mostrar, figuras)
+
+        print(f"Mann–Whitney U test: U = {estadisticas['u']:.2f}, p = {estadisticas['p_valor']:.4f}")
+
+    else:
+        print(f"📊 Análisis categórico para: {pregunta}")
+
+        fig, ax = _nueva_figura((10, 6), mostrar)
+        estadisticas["tabla"].plot(kind='barh', stacked=True, colormap="Paired", ax=ax)
+        ax.set_title(f"Distribución de respuestas en '{pregunta}' por target")
+        ax.set_xlabel("Porcentaje")
+        ax.set_ylabel("Respuesta")
+        ax.legend(title="Target", labels=["No (0)", "Sí (1)"])
+        _terminar_figura(fig, mostrar, figuras)
+
+        resultado = estadisticas["prueba"]
+
+        if resultado["frecuencias_bajas"]:
+            print("⚠️ Advertencia: algunas frecuencias esperadas son menores a 5, lo que puede afectar la validez del test de Chi-cuadrado.")
+
+            if resultado["prueba"] == "fisher":
+                print("ℹ️ Se aplica test exacto de Fisher para mayor precisión en tabla 2x2.")
+                print(f"Fisher exact test: p-value = {resultado['p_valor']:.4f}")
+            else:
+                print("ℹ️ Se aplica G-test (power divergence) como alternativa.")
+                print(f"G-test (log-likelihood): G = {resultado['estadistico']:.2f}, p-value = {resultado['p_valor']:.4f}")
+
+        else:
+            print(f"Chi² test: χ² = {resultado['estadistico']:.2f}, p-value = {resultado['p_valor']:.4f}")
+
+    return None if mostrar else figuras
+
+def _estadisticas_exploracion(df, pregunta, target, columnas_multi) -> dict:
+    """
+    Calcula las tablas y pruebas de `explorar_relacion_con_target`, sin dibujar ni imprimir, para
+    poder guardarlas en el caché de resultados.
+    """
+    if columnas_multi:
+        medios = df.groupby(target)[columnas_multi].mean().T.astype(float)
+        medios.columns = ["No (0)", "Sí (1)"]
+        return {"tipo": "multiselect", "medios": medios}
 
     serie = df[pregunta]
 
     if pd.api.types.is_numeric_dtype(serie):
-        print(f"📈 Análisis numérico/ordinal para: {pregunta}")
+        from scipy.stats import mannwhitneyu
 
         resumen = df.groupby(target)[pregunta].describe()
-        print(resumen)
-
         unique_vals = sorted(serie.dropna().unique())
         is_discrete_ordinal = all(float(x).is_integer() for x in unique_vals) and len(unique_vals) <= 10
-
-        if is_discrete_ordinal:
-            tabla = pd.crosstab(df[pregunta], df[target], normalize='index') * 100
-            tabla.plot(kind='bar', stacked=True, figsize=(8, 5), colormap="Paired")
-            plt.title(f"Distribución de respuestas por grupo del target\n{pregunta}")
-            plt.xlabel("Respuesta ordinal")
-            plt.ylabel("Porcentaje")
-            plt.legend(title="Target", labels=["No (0)", "Sí (1)"])
-            plt.tight_layout()
-            plt.show()
-
-        sns.boxplot(data=df, x=target, y=pregunta)
-        plt.title(f"Distribución de '{pregunta}' según target")
-        plt.grid(axis="y", linestyle="--", alpha=0.6)
-        plt.tight_layout()
-        plt.show()
+        tabla = pd.crosstab(df[pregunta], df[target], normalize='index') * 100 if is_discrete_ordinal else None
 
         g0 = df[df[target] == 0][pregunta].dropna()
         g1 = df[df[target] == 1][pregunta].dropna()
         stat, p = mannwhitneyu(g0, g1, alternative="two-sided")
-        print(f"Mann–Whitney U test: U = {stat:.2f}, p = {p:.4f}")
+        return {"tipo": "numerica", "resumen": resumen, "tabla": tabla, "u": float(stat), "p_valor": float(p)}
+
+    tabla = pd.crosstab(df[pregunta], df[target], normalize='index') * 100
+    contingencia = pd.crosstab(df[pregunta], df[target])
+    return {"tipo": "categorica", "tabla": tabla, "prueba": _prueba_categorica(contingencia.to_numpy())}
 
+def _nueva_figura(figsize, mostrar: bool):
+    """
+    Crea una figura con un eje. Sin `mostrar`, la figura no se registra en pyplot,
+    así que no queda abierta en el estado global ni necesita cerrarse.
+    """
+    if mostrar:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=figsize)
     else:
-        print(f"📊 Análisis categórico para: {pregunta}")
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=figsize)
+    return fig, fig.subplots()
 
-        tabla = pd.crosstab(df[pregunta], df[target], normalize='index') * 100
-        tabla.plot(kind='barh', stacked=True, figsize=(10, 6), colormap="Paired")
-        plt.title(f"Distribución de respuestas en '{pregunta}' por target")
-        plt.xlabel("Porcentaje")
-        plt.ylabel("Respuesta")
-        plt.legend(title="Target", labels=["No (0)", "Sí (1)"])
-        plt.tight_layout()
+def _terminar_figura(fig, mostrar: bool, figuras: list) -> None:
+    fig.tight_layout()
+    if mostrar:
+        import matplotlib.pyplot as plt
         plt.show()
+    else:
+        figuras.append(fig)
 
-        contingencia = pd.crosstab(df[pregunta], df[target])
-        chi2, p_chi2, dof, expected = chi2_contingency(contingencia)
+def _prueba_categorica(tabla: np.ndarray) -> dict:
+    """
+    Aplica la prueba de independencia que corresponde a una tabla de contingencia pregunta × target.
 
-        if (expected < 5).any():
-            print("⚠️ Advertencia: algunas frecuencias esperadas son menores a 5, lo que puede afectar la validez del test de Chi-cuadrado.")
+    - Chi² (con corrección de Yates en tablas 2x2) si todas las frecuencias esperadas son >= 5.
+    - Fisher exacto si la tabla es 2x2 y hay frecuencias esperadas < 5.
+    - G-test (razón de verosimilitud) si la tabla es mayor y hay frecuencias esperadas < 5.
 
-            if expected.shape == (2, 2):
-                print("ℹ️ Se aplica test exacto de Fisher para mayor precisión en tabla 2x2.")
-                _, fisher_p = fisher_exact(contingencia)
-                print(f"Fisher exact test: p-value = {fisher_p:.4f}")
+    Retorna:
+    -------
+    dict
+        'prueba', 'estadistico', 'p_valor', 'frecuencias_bajas' y 'cramer_v' (calculado con el
+        χ² sin corrección). Si la tabla tiene menos de dos filas o columnas con datos, la prueba
+        es None y los valores son NaN.
+    """
+    tabla = tabla[tabla.sum(axis=1) > 0][:, tabla.sum(axis=0) > 0]
+    if tabla.shape[0] < 2 or tabla.shape[1] < 2:
+        return {"prueba": None, "estadistico": np.nan, "p_valor": np.nan, "frecuencias_bajas": False, "cramer_v": np.nan}
+
+    from scipy.stats import chi2_contingency, fisher_exact
+
+    chi2, p_chi2, _, expected = chi2_contingency(tabla)
+    chi2_sin_correccion = chi2_contingency(tabla, correction=False)[0] if tabla.shape == (2, 2) else chi2
+    cramer_v = float(np.sqrt(chi2_sin_correccion / (tabla.sum() * (min(tabla.shape) - 1))))
+    frecuencias_bajas = bool((expected < 5).any())
+
+    if not frecuencias_bajas:
+        prueba, estadistico, p_valor = "chi2", chi2, p_chi2
+    elif tabla.shape == (2, 2):
+        estadistico, p_valor = fisher_exact(tabla)
+        prueba = "fisher"
+    else:
+        estadistico, p_valor = chi2_contingency(tabla, lambda_="log-likelihood")[:2]
+        prueba = "g-test"
+
+    return {
+        "prueba": prueba,
+        "estadistico": float(estadistico),
+        "p_valor": float(p_valor),
+        "frecuencias_bajas": frecuencias_bajas,
+        "cramer_v": cramer_v
+    }
+
+def resumen_relaciones_con_target(df, target, preguntas=None, cache=None):
+    """
+    Evalúa en una sola pasada la relación de todas las preguntas codificadas con una variable objetivo binaria.
+
+    Es la versión sin gráficos ni impresiones de `explorar_relacion_con_target`, pensada para
+    revisar encuestas completas o para ejecutarse en procesos programados. El target se
+    factoriza una sola vez y las tablas de contingencia se construyen directamente a partir
+    de los códigos de cada columna, sin volver a filtrar el DataFrame por pregunta.
+
+    Según el tipo de cada pregunta aplica:
+    - Numéricas u ordinales: Mann–Whitney U, con la correlación biserial de rangos como efecto
+      (positiva si el grupo target=1 tiende a valores más altos).
+    - Categóricas: Chi², Fisher (2x2 con esperadas < 5) o G-test, con la V de Cramér como efecto.
+      Para Fisher, el estadístico es la razón de odds.
+    - Multiselect (columnas `pregunta__codigo`): prueba z de diferencia de proporciones por opción,
+      con la diferencia de proporciones (target=1 menos target=0) como efecto.
+
+    Parámetros
+    ----------
+    df : pd.DataFrame o ProcessedDataset
+        DataFrame codificado con las respuestas de la encuesta. Con un `ProcessedDataset` solo
+        se leen del archivo el target y las columnas de `preguntas`.
+
+    target : str
+        Nombre de la columna objetivo binaria (0: no, 1: sí). Las filas con otro valor se ignoran.
+
+    preguntas : list of str, opcional
+        Preguntas a evaluar (nombre de columna o prefijo multiselect). Por defecto, todas las
+        columnas distintas del target, agrupando las multiselect por su prefijo.
+
+    cache : bool o ResultCache, opcional
+        Caché de los resultados por pregunta, con clave según los datos de la pregunta y del target:
+        al repetir el resumen solo se recalculan las preguntas cuyos datos cambiaron. True usa el
+        caché por defecto (ver `taller_utils.cache.ResultCache`). Por defecto no se usa caché.
+
+    Retorna
+    -------
+    pd.DataFrame
+        Una fila por pregunta (y por opción en las multiselect) con las columnas:
+        'pregunta', 'opcion', 'tipo', 'prueba', 'estadistico', 'p_valor', 'p_ajustado'
+        (Benjamini–Hochberg sobre todas las filas), 'efecto', 'medida_efecto', 'n_0', 'n_1'
+        y 'frecuencias_bajas'.
+    """
+    if isinstance(df, ProcessedDataset):
+        df = df.read_questions(target, *preguntas) if preguntas is not None else df.read()
+
+    if target not in df.columns:
+        raise ValueError(f"Target '{target}' no encontrado.")
+
+    y = pd.to_numeric(df[target], errors="coerce").to_numpy(dtype=float)
+    validas = (y == 0) | (y == 1)
+    y = y[validas].astype(np.int64)
+
+    simples, multiselect = _agrupar_preguntas(df.columns.drop(target), preguntas)
+    grupos = {**{pregunta: [pregunta] for pregunta in simples}, **multiselect}
+    # Filas del resultado por pregunta, tomadas del caché o calculadas
+    filas = {}
+
+    cache = resolve_cache(cache)
+    claves = {}
+    if cache is not None:
+        clave_target = content_key("target", df[target])
+        for pregunta, columnas in grupos.items():
+            claves[pregunta] = content_key("resumen_relaciones_con_target", clave_target, df[columnas])
+            guardadas = cache.get(claves[pregunta])
+            if guardadas is not None:
+                filas[pregunta] = guardadas
+
+    calculadas = [pregunta for pregunta in grupos if pregunta not in filas]
+    for pregunta in simples:
+        if pregunta not in filas:
+            filas[pregunta] = [_fila_simple(df[pregunta], y, validas)]
+    pendientes = {pregunta: columnas for pregunta, columnas in multiselect.items() if pregunta not in filas}
+    if pendientes:
+        filas.update(_filas_multiselect(df, pendientes, y, validas))
+
+    if cache is not None:
+        for pregunta in calculadas:
+            cache.put(claves[pregunta], filas[pregunta])
+
+    resultado = pd.DataFrame([fila for pregunta in grupos for fila in filas[pregunta]], columns=[
+        "pregunta", "opcion", "tipo", "prueba", "estadistico", "p_valor", "efecto",
+        "medida_efecto", "n_0", "n_1", "frecuencias_bajas"
+    ])
+    resultado.insert(6, "p_ajustado", _benjamini_hochberg(resultado["p_valor"].to_numpy(dtype=float)))
+    return resultado
+
+def _fila_simple(serie: pd.Series, y: np.ndarray, validas: np.ndarray) -> dict:
+    """
+    Fila de `resumen_relaciones_con_target` para una pregunta de una columna.
+    """
+    pregunta = serie.name
+    if pd.api.types.is_numeric_dtype(serie):
+        from scipy.stats import mannwhitneyu
+
+        valores = serie.to_numpy(dtype=float, na_value=np.nan)[validas]
+        presentes = ~np.isnan(valores)
+        g0 = valores[presentes & (y == 0)]
+        g1 = valores[presentes & (y == 1)]
+        fila = {"pregunta": pregunta, "opcion": None, "tipo": "numerica", "prueba": "mann-whitney",
+                "estadistico": np.nan, "p_valor": np.nan, "efecto": np.nan,
+                "medida_efecto": "biserial de rangos", "n_0": len(g0), "n_1": len(g1),
+                "frecuencias_bajas": False}
+        if len(g0) and len(g1):
+            codigos, categorias = pd.factorize(valores[presentes], sort=True)
+            if len(categorias) < presentes.sum():
+                # Con empates scipy usa la aproximación normal, que se obtiene de la tabla de conteos
+                tabla = np.bincount(codigos * 2 + y[presentes], minlength=2 * len(categorias)).reshape(-1, 2)
+                u, p = _mann_whitney_tabla(tabla)
             else:
-                print("ℹ️ Se aplica G-test (power divergence) como alternativa.")
-                g_stat, g_p = power_divergence(contingencia.values, lambda_='log-likelihood')
-                g_stat_val = float(np.asarray(g_stat).flatten()[0])
-                g_p_val = float(np.asarray(g_p).flatten()[0])
-                print(f"G-test (log-likelihood): G = {g_stat_val:.2f}, p-value = {g_p_val:.4f}")
+                u, p = mannwhitneyu(g0, g1, alternative="two-sided")
+            fila.update(estadistico=float(u), p_valor=float(p), efecto=1 - 2 * float(u) / (len(g0) * len(g1)))
+        return fila
+
+    codigos, categorias = pd.factorize(serie)
+    codigos = codigos[validas]
+    presentes = codigos >= 0
+    tabla = np.bincount(
+        codigos[presentes] * 2 + y[presentes], minlength=2 * len(categorias)
+    ).reshape(-1, 2)
+    resultado = _prueba_categorica(tabla)
+    return {"pregunta": pregunta, "opcion": None, "tipo": "categorica", "prueba": resultado["prueba"],
+            "estadistico": resultado["estadistico"], "p_valor": resultado["p_valor"],
+            "efecto": resultado["cramer_v"], "medida_efecto": "V de Cramér",
+            "n_0": int(tabla[:, 0].sum()), "n_1": int(tabla[:, 1].sum()),
+            "frecuencias_bajas": resultado["frecuencias_bajas"]}
+
+def _filas_multiselect(df: pd.DataFrame, multiselect: dict, y: np.ndarray, validas: np.ndarray) -> dict:
+    """
+    Filas de `resumen_relaciones_con_target` para las preguntas multiselect ({prefijo: [columnas]}).
+    Retorna {prefijo: [filas]}.
+    """
+    from scipy.stats import norm
+
+    columnas = [col for cols in multiselect.values() for col in cols]
+    sumas, conteos = _sumas_por_grupo(df, columnas, y, validas)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p0, p1 = sumas[0] / conteos[0], sumas[1] / conteos[1]
+        p_comun = sumas.sum(axis=0) / conteos.sum(axis=0)
+        error = np.sqrt(p_comun * (1 - p_comun) * (1 / conteos[0] + 1 / conteos[1]))
+        z = np.where(error > 0, (p1 - p0) / error, np.nan)
+    p_valores = 2 * norm.sf(np.abs(z))
+
+    filas = {prefijo: [] for prefijo in multiselect}
+    i = 0
+    for prefijo, cols in multiselect.items():
+        for col in cols:
+            pregunta, opcion = col.rsplit("__", 1)
+            filas[prefijo].append({"pregunta": pregunta, "opcion": opcion, "tipo": "multiselect",
+                                   "prueba": "z proporciones", "estadistico": float(z[i]), "p_valor": float(p_valores[i]),
+                                   "efecto": float(p1[i] - p0[i]), "medida_efecto": "diferencia de proporciones",
+                                   "n_0": int(conteos[0, i]), "n_1": int(conteos[1, i]), "frecuencias_bajas": False})
+            i += 1
+    return filas
+
+# Filas de X por producto denso en `_conteos_conjuntos`
+_FILAS_POR_TRAMO = 2**13
+
+def matriz_asociaciones(df, preguntas=None, max_categorias: int = 50, tamano_bloque: int = 1024) -> dict:
+    """
+    Mide la asociación entre todos los pares de preguntas codificadas, para detectar preguntas
+    redundantes o colineales antes de modelar.
+
+    En vez de construir una tabla de contingencia por par con `pd.crosstab`, codifica todas las
+    preguntas en una única matriz dispersa de indicadores X (una columna por respuesta posible)
+    y obtiene todas las tablas de contingencia a la vez con el producto XᵀX: el bloque de XᵀX
+    que cruza dos preguntas es su tabla de contingencia. XᵀX se calcula por bloques de filas:
+    cada bloque cruza `tamano_bloque` indicadores con todos, recorriendo X por tramos de 8.192
+    filas que se densifican de a `tamano_bloque` columnas, así que la memoria depende de
+    `tamano_bloque` × (total de indicadores) y no de la cantidad de filas, incluso en encuestas
+    muy anchas. El tiempo, como en todo producto XᵀX denso, crece con filas × indicadores².
+
+    Parámetros
+    ----------
+    df : pd.DataFrame o ProcessedDataset
+        DataFrame codificado con las respuestas de la encuesta. Con un `ProcessedDataset` solo se
+        leen las columnas de `preguntas`.
+
+    preguntas : list of str, opcional
+        Preguntas a incluir (columna o prefijo multiselect). Por defecto, todas las columnas.
+
+    max_categorias : int, opcional
+        Las columnas con más valores distintos (por ejemplo, numéricas continuas o texto libre) se
+        omiten con un aviso. Por defecto es 50.
+
+    tamano_bloque : int, opcional
+        Indicadores (filas de XᵀX) por bloque. Cada bloque usa unas cinco matrices de
+        8 × tamano_bloque × indicadores bytes (las tablas y las medidas del bloque) más dos
+        tramos densos de 4 × 8.192 × tamano_bloque bytes. Con 20.000 indicadores y el valor por
+        defecto, unos 900 MB; en encuestas más anchas conviene bajarlo. Por defecto es 1024.
+
+    Retorna
+    -------
+    dict of pd.DataFrame
+        Matrices simétricas pregunta × pregunta:
+        - 'cramer_v': V de Cramér.
+        - 'chi2': estadístico χ² de independencia (sin corrección de Yates).
+        - 'p_valor': p-valor del χ².
+        - 'nmi': información mutua normalizada por la media aritmética de las entropías (0 a 1).
+        - 'n': filas en que ambas preguntas tienen respuesta.
+        Los pares en que alguna pregunta tiene menos de dos respuestas distintas quedan en NaN
+        (salvo en 'n').
+
+    Notas
+    -----
+    - Cada columna dummy de una multiselect (`pregunta__codigo`) es una variable binaria propia.
+    - Las respuestas numéricas u ordinales se tratan como categorías.
+    - Cada par usa solo las filas que respondieron ambas preguntas: los valores faltantes quedan
+      como filas sin indicadores en X.
+    """
+    from scipy import sparse
+
+    if isinstance(df, ProcessedDataset):
+        df = df.read_questions(*preguntas) if preguntas is not None else df.read()
+
+    simples, multiselect = _agrupar_preguntas(df.columns, preguntas)
+    nombres, inicios, filas, indices, omitidas = [], [0], [], [], []
+    for col in simples + [col for cols in multiselect.values() for col in cols]:
+        codigos, categorias = pd.factorize(df[col], sort=True)
+        if len(categorias) > max_categorias:
+            omitidas.append(col)
+            continue
+        presentes = np.flatnonzero(codigos >= 0)
+        filas.append(presentes)
+        indices.append(inicios[-1] + codigos[presentes])
+        nombres.append(col)
+        inicios.append(inicios[-1] + len(categorias))
+    if omitidas:
+        print(f"⚠️ Se omiten {len(omitidas)} columnas con más de {max_categorias} valores distintos: {omitidas}")
+
+    inicios = np.asarray(inicios)
+    filas = np.concatenate(filas) if filas else np.empty(0, dtype=np.int64)
+    indices = np.concatenate(indices) if indices else np.empty(0, dtype=np.int64)
+    x = sparse.csr_matrix(
+        (np.ones(len(filas), dtype=np.float32), (filas, indices)), shape=(len(df), inicios[-1])
+    )
+    # Pertenencia de cada indicador a su pregunta (indicadores × preguntas)
+    variables = _pertenencia(inicios)
 
+    q = len(nombres)
+    resultado = {medida: np.full((q, q), np.nan) for medida in ("cramer_v", "chi2", "p_valor", "nmi", "n")}
+    a = 0
+    while a < q:
+        # Bloque de preguntas completas con a lo más `tamano_bloque` indicadores (o una sola pregunta)
+        b = max(a + 1, int(np.searchsorted(inicios, inicios[a] + tamano_bloque, side="right")) - 1)
+        tablas = _conteos_conjuntos(x, inicios[a], inicios[b])
+        for medida, valores in _asociaciones_bloque(tablas, _pertenencia(inicios[a:b + 1] - inicios[a]), variables).items():
+            resultado[medida][a:b] = valores
+        a = b
+
+    resultado["n"] = resultado["n"].astype(np.int64)
+    return {medida: pd.DataFrame(valores, index=nombres, columns=nombres) for medida, valores in resultado.items()}
+
+def _conteos_conjuntos(x, inicio: int, fin: int) -> np.ndarray:
+    """
+    Filas `inicio:fin` de XᵀX. Por tramos de filas de X, las columnas del bloque y luego las del
+    tramo, de a grupos del mismo ancho que el bloque, se convierten a matrices densas float32 y
+    se multiplican con BLAS: nunca se densifica un tramo con todos los indicadores. Con a lo más
+    2**13 filas por tramo los conteos parciales en float32 son exactos.
+    """
+    ancho = fin - inicio
+    tablas = np.zeros((ancho, x.shape[1]))
+    for desde in range(0, x.shape[0], _FILAS_POR_TRAMO):
+        tramo = x[desde:desde + _FILAS_POR_TRAMO].tocsc()
+        bloque = tramo[:, inicio:fin].toarray()
+        for columna in range(0, x.shape[1], ancho):
+            tablas[:, columna:columna + ancho] += bloque.T @ tramo[:, columna:columna + ancho].toarray()
+    return tablas
+
+def _pertenencia(inicios: np.ndarray):
+    """
+    Matriz dispersa indicadores × preguntas que indica a qué pregunta pertenece cada indicador,
+    a partir de la posición del primer indicador de cada pregunta (más el total al final).
+    """
+    from scipy import sparse
+
+    variable = np.repeat(np.arange(len(inicios) - 1), np.diff(inicios))
+    return sparse.csr_matrix(
+        (np.ones(len(variable)), (np.arange(len(variable)), variable)), shape=(len(variable), len(inicios) - 1)
+    )
+
+def _asociaciones_bloque(tablas: np.ndarray, filas, columnas) -> dict:
+    """
+    Medidas de asociación de las preguntas de un bloque de filas de XᵀX contra todas las preguntas.
+
+    `tablas` tiene los conteos conjuntos (indicadores del bloque × todos los indicadores); `filas` y
+    `columnas` son las matrices de pertenencia (ver `_pertenencia`). Los totales de cada tabla se
+    obtienen multiplicando por ellas, así que no hay ciclos por par de preguntas.
+    """
+    from scipy.stats import chi2 as distribucion_chi2
+
+    def por_par(matriz):
+        # Suma los valores de cada tabla (pregunta del bloque × pregunta): filas.T @ matriz @ columnas
+        return np.asarray((columnas.T @ (filas.T @ matriz).T).T)
+
+    variable_fila = filas.indices
+    variable_columna = columnas.indices
+    # Totales marginales de cada tabla, solo sobre las filas en que ambas preguntas tienen respuesta
+    totales_fila = np.asarray((columnas.T @ tablas.T).T)           # indicadores del bloque × preguntas
+    totales_columna = np.asarray(filas.T @ tablas)                 # preguntas del bloque × indicadores
+    n = np.asarray(filas.T @ totales_fila)                         # preguntas del bloque × preguntas
+
+    r = totales_fila[:, variable_columna]
+    c = totales_columna[variable_fila]
+    n_celda = n[variable_fila][:, variable_columna]
+    presentes = tablas > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        esperado = np.where(presentes, r * c, 1.0)
+        suma = por_par(np.where(presentes, tablas ** 2 / esperado, 0.0))
+        informacion = por_par(np.where(presentes, tablas / n_celda * np.log(tablas * n_celda / esperado), 0.0))
+
+        p_fila = totales_fila / n[variable_fila]
+        p_columna = totales_columna / n[:, variable_columna]
+        entropia_fila = np.asarray(filas.T @ np.where(p_fila > 0, -p_fila * np.log(p_fila), 0.0))
+        entropia_columna = np.asarray((columnas.T @ np.where(p_columna > 0, -p_columna * np.log(p_columna), 0.0).T).T)
+
+        k_fila = np.asarray(filas.T @ (totales_fila > 0))
+        k_columna = np.asarray((columnas.T @ (totales_columna > 0).T).T)
+        validos = (k_fila >= 2) & (k_columna >= 2)
+
+        chi2 = np.where(validos, np.maximum(n * (suma - 1), 0.0), np.nan)
+        cramer_v = np.sqrt(chi2 / (n * (np.minimum(k_fila, k_columna) - 1)))
+        nmi = np.where(validos, informacion / ((entropia_fila + entropia_columna) / 2), np.nan)
+    p_valor = distribucion_chi2.sf(chi2, (k_fila - 1) * (k_columna - 1))
+
+    return {"cramer_v": cramer_v, "chi2": chi2, "p_valor": p_valor, "nmi": nmi, "n": n}
+
+def _sumas_por_grupo(df: pd.DataFrame, columnas: list, y: np.ndarray, validas: np.ndarray):
+    """
+    Suma y cantidad de valores no nulos de las columnas dummy en cada grupo del target (2 × columnas).
+
+    Con columnas dispersas (ver `process_survey_data(..., sparse=True)`) las sumas salen de un
+    producto con la matriz CSR, sin densificar; las columnas dispersas no tienen nulos.
+    """
+    if any(isinstance(df[col].dtype, pd.SparseDtype) for col in columnas):
+        from scipy import sparse
+
+        matriz = SparseIndicators.from_frame(df, columnas).matrix[validas]
+        grupos = sparse.csr_matrix((np.ones(len(y)), (y, np.arange(len(y)))), shape=(2, len(y)))
+        sumas = (grupos @ matriz).toarray().astype(float)
+        conteos = np.repeat(np.bincount(y, minlength=2)[:, np.newaxis], len(columnas), axis=1).astype(float)
+        return sumas, conteos
+
+    # Un único groupby sobre el target para todas las columnas dummy
+    grupos = df.loc[validas, columnas].groupby(y)
+    sumas = grupos.sum().reindex([0, 1], fill_value=0).to_numpy(dtype=float)
+    conteos = grupos.count().reindex([0, 1], fill_value=0).to_numpy(dtype=float)
+    return sumas, conteos
+
+def _mann_whitney_tabla(tabla: np.ndarray):
+    """
+    Mann–Whitney U bilateral a partir de una tabla de conteos valor × grupo, con valores en orden creciente.
+
+    Usa rangos medios para los empates y la aproximación normal con corrección por empates y
+    por continuidad, igual que `scipy.stats.mannwhitneyu` cuando hay empates. Retorna (U del
+    grupo 0, p-valor).
+    """
+    from scipy.stats import norm
+
+    tabla = tabla.astype(float)
+    totales = tabla.sum(axis=1)
+    n0, n1 = tabla[:, 0].sum(), tabla[:, 1].sum()
+    n = n0 + n1
+    rangos = np.cumsum(totales) - totales + (totales + 1) / 2
+    u0 = (tabla[:, 0] * rangos).sum() - n0 * (n0 + 1) / 2
+    varianza = n0 * n1 / 12 * ((n + 1) - (totales ** 3 - totales).sum() / (n * (n - 1)))
+    if varianza <= 0:
+        return float(u0), 1.0
+    z = (max(u0, n0 * n1 - u0) - n0 * n1 / 2 - 0.5) / np.sqrt(varianza)
+    return float(u0), float(min(2 * norm.sf(z), 1.0))
+
+def _agrupar_preguntas(columnas, preguntas=None):
+    """
+    Separa las preguntas en simples (una columna) y multiselect ({prefijo: [columnas dummy]}).
+    """
+    multiselect = {}
+    if preguntas is None:
+        simples = []
+        for col in columnas:
+            if "__" in col:
+                multiselect.setdefault(col.rsplit("__", 1)[0], []).append(col)
+            else:
+                simples.append(col)
+        return simples, multiselect
+
+    simples = []
+    for pregunta in preguntas:
+        dummies = [col for col in columnas if col.startswith(f"{pregunta}__")]
+        if dummies:
+            multiselect[pregunta] = dummies
+        elif pregunta in columnas:
+            simples.append(pregunta)
         else:
-            print(f"Chi² test: χ² = {chi2:.2f}, p-value = {p_chi2:.4f}")
+            raise ValueError(f"Pregunta '{pregunta}' no encontrada.")
+    return simples, multiselect
+
+def _benjamini_hochberg(p_valores: np.ndarray) -> np.ndarray:
+    """
+    Ajusta p-valores por Benjamini–Hochberg (FDR), ignorando los NaN.
+    """
+    ajustados = np.full_like(p_valores, np.nan)
+    validos = np.flatnonzero(~np.isnan(p_valores))
+    if len(validos) == 0:
+        return ajustados
+    orden = validos[np.argsort(p_valores[validos])]
+    m = len(orden)
+    escalados = p_valores[orden] * m / np.arange(1, m + 1)
+    ajustados[orden] = np.minimum(np.minimum.accumulate(escalados[::-1])[::-1], 1.0)
+    return ajustados
@@ -0,0 +1,377 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from taller_utils.encoding import _encode_question, _report_unmapped
+from taller_utils.instrumentation import StageEvent, timed
+from taller_utils.plan import as_plan
+from taller_utils.unmapped import UnmappedReport
+
+# Textos que se leen como nulos: los mismos que `pd.read_csv` por defecto, para que ambos backends
+# vean las mismas respuestas faltantes
+NA_VALUES = (
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+)
+
+def read_survey_csv(path: str, columns: list = None, use_threads: bool = True) -> pa.Table:
+    """
+    Lee un CSV de respuestas como tabla Arrow, con el lector multihilo de `pyarrow.csv`.
+
+    Parámetros:
+    ----------
+    path : str
+        Ruta del CSV crudo.
+
+    columns : list of str, opcional
+        Columnas a leer. Por defecto, todas.
+
+    use_threads : bool, opcional
+        Si es True (por defecto), el archivo se separa en bloques que se leen en paralelo.
+
+    Retorna:
+    -------
+    pa.Table
+        Las respuestas, con los mismos textos que `pd.read_csv` considera nulos (`NA_VALUES`).
+
+    Notas:
+    ------
+    - Todas las columnas se leen como texto, igual que `taller_utils.pipeline.read_survey_frame`
+      y el modo por bloques: con la inferencia de tipos, una columna de respuestas como '1', '2'
+      se leería como int64 en Arrow y como float en pandas (si tiene vacíos), y los backends
+      codificarían distinto.
+    """
+    import pyarrow.csv as pv
+
+    read_options = pv.ReadOptions(use_threads=use_threads)
+    convert_options = pv.ConvertOptions(
+        column_types={col: pa.string() for col in pd.read_csv(path, nrows=0).columns},
+        null_values=list(NA_VALUES), strings_can_be_null=True, include_columns=columns
+    )
+    return pv.read_csv(path, read_options=read_options, convert_options=convert_options)
+
+def process_survey_arrow(
+    source,
+    encoding_dict,
+    log_unmapped: bool = True,
+    unmapped_path: str = None,
+    return_report: bool = False,
+    to_pandas: bool = False,
+    observer=None
+):
+    """
+    Codifica una encuesta con `pyarrow.compute`, sin pasar por columnas de objetos de pandas.
+
+    Es el backend 'arrow' de `process_survey_data`, pero trabaja directamente sobre tablas Arrow:
+    cada columna se codifica como diccionario, los valores distintos se normalizan y se buscan en
+    el encoding con kernels de Arrow, y el resultado se propaga a las filas con `take`. Las
+    multiselect se separan con `split_pattern` sobre los valores distintos.
+
+    Parámetros:
+    ----------
+    source : str o pa.Table
+        Ruta de un CSV (se lee con `read_survey_csv`) o una tabla Arrow ya leída.
+
+    encoding_dict : dict o EncodingPlan
+        Especificación de encoding (ver `process_survey_data`).
+
+    log_unmapped, unmapped_path, return_report, observer :
+        Igual que en `process_survey_data`. Con un observador, también se emite un evento 'read'
+        si `source` es una ruta.
+
+    to_pandas : bool, opcional
+        Si es True, convierte el resultado a DataFrame con los tipos de `EncodingPlan.output_schema`
+        (ver `table_to_pandas`). Por defecto retorna la tabla Arrow.
+
+    Retorna:
+    -------
+    pa.Table o pd.DataFrame, o la tupla (resultado, UnmappedReport) con `return_report=True`.
+        Las columnas quedan en el mismo orden que con `process_survey_data`.
+
+    Notas:
+    ------
+    - Los valores codificados y el reporte de no mapeados coinciden con los del backend 'pandas'.
+      La única diferencia posible está en la normalización: `utf8_trim_whitespace` no quita los
+      caracteres de control que `str.strip()` sí considera espacio (\\x1c a \\x1f).
+    """
+    if isinstance(source, str):
+        if observer is None:
+            table = read_survey_csv(source)
+        else:
+            table, wall_s = timed(read_survey_csv, source)
+            observer(StageEvent(stage="read", wall_s=wall_s, rows=table.num_rows))
+    else:
+        table = source
+
+    if observer is None:
+        table, report = encode_table(table, encoding_dict)
+    else:
+        (table, report), wall_s = timed(encode_table, table, encoding_dict, True, observer)
+        observer(StageEvent(stage="encode", wall_s=wall_s, rows=table.num_rows, unmapped=report.total()))
+    _report_unmapped(report, log_unmapped=log_unmapped, unmapped_path=unmapped_path)
+
+    result = table_to_pandas(table, encoding_dict) if to_pandas else table
+    if return_report:
+        return result, report
+    return result
+
+def encode_table(table: pa.Table, encoding_dict, warn: bool = True, observer=None):
+    """
+    Codifica una tabla Arrow según `encoding_dict` (núcleo de `process_survey_arrow`).
+
+    Las preguntas binary/ordinal/categorical reemplazan su columna y las multiselect se eliminan
+    y agregan sus dummies al final, en el orden de las preguntas, igual que `_encode_frame`.
+
+    Retorna:
+    -------
+    tuple (pa.Table, UnmappedReport)
+    """
+    columns = dict(zip(table.column_names, table.columns))
+    report = UnmappedReport()
+    dummy_blocks = []
+    multiselect_questions = set()
+
+    for question in as_plan(encoding_dict).questions:
+        question_text = question.question
+        if question_text not in columns or question_text in multiselect_questions:
+            if warn:
+                print(f"⚠️ Pregunta no encontrada en el DataFrame: '{question_text}'")
+            continue
+        if question.type == "multiselect" and question.encoding:
+            multiselect_questions.add(question_text)
+
+        column = columns[question_text]
+        if observer is None:
+            encoded, unmapped, messages = _encode_column(column, question, warn)
+        else:
+            (encoded, unmapped, messages), wall_s = timed(_encode_column, column, question, warn)
+            observer(_column_event(column, question, encoded, unmapped, wall_s))
+
+        for message in messages:
+            print(message)
+        for value, (count, first_row) in (unmapped or {}).items():
+            report.add(question_text, value, count, first_row)
+        if isinstance(encoded, dict):
+            dummy_blocks.append(encoded)
+        elif encoded is not None:
+            columns[question_text] = encoded
+
+    if dummy_blocks:
+        replaced = multiselect_questions.union(col for block in dummy_blocks for col in block)
+        columns = {col: values for col, values in columns.items() if col not in replaced}
+        for block in dummy_blocks:
+            columns.update(block)
+
+    return pa.table(columns), report
+
+def table_to_pandas(table: pa.Table, encoding_dict=None) -> pd.DataFrame:
+    """
+    Convierte una tabla codificada a DataFrame, con los tipos de pandas que genera el backend
+    'pandas' para las columnas codificadas ('Int8', 'boolean', 'category', uint8).
+    """
+    schema = as_plan(encoding_dict).output_schema() if encoding_dict is not None else {}
+    return pd.DataFrame({
+        name: _column_to_pandas(column, schema.get(name))
+        for name, column in zip(table.column_names, table.columns)
+    })
+
+def _encode_question_arrow(series: pd.Series, question, warn: bool = True):
+    """
+    `_encode_question` con `pyarrow.compute`, para el backend 'arrow' de `process_survey_data`.
+
+    Retorna lo mismo que `_encode_question`, ya convertido a pandas. Las columnas que Arrow no
+    puede representar (objetos de tipos mezclados) y las preguntas sin tipo compacto se codifican
+    con pandas, para que el resultado sea siempre el mismo.
+    """
+    if question.type in ("binary", "ordinal", "categorical") and question.dtype is None:
+        return _encode_question(series, question, warn)
+    try:
+        column = pa.chunked_array([pa.array(series, from_pandas=True)])
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return _encode_question(series, question, warn)
+
+    encoded, unmapped, messages = _encode_column(column, question, warn, series.index)
+    if isinstance(encoded, dict):
+        encoded = pd.DataFrame({col: values.to_numpy() for col, values in encoded.items()}, index=series.index)
+    elif encoded is not None:
+        encoded = pd.Series(_column_to_pandas(encoded, question.dtype).array, index=series.index, name=series.name)
+    return encoded, unmapped, messages
+
+def _encode_column(column: pa.ChunkedArray, question, warn: bool = True, index: pd.Index = None):
+    """
+    Codifica la columna Arrow de una pregunta. Retorna lo mismo que `_encode_question`, pero con
+    la columna como `pa.ChunkedArray` y las dummies como {columna: pa.ChunkedArray}.
+
+    `index` da las etiquetas de fila del reporte de no mapeados; por defecto, la posición.
+    """
+    encoding_type = question.type
+    messages = []
+
+    if encoding_type in ("binary", "ordinal"):
+        encoded, keys, indices, positions = _map_dictionary(column, question.encoding, question.dtype)
+        index = index if index is not None else pd.RangeIndex(len(column))
+        return encoded, _unmapped_counts(index, keys, indices, positions), messages
+
+    if encoding_type in ("categorical", "multiselect"):
+        if not question.encoding:
+            if warn:
+                messages.append(f"⚠️  Sin encoding definido para '{question.question}', se omite.")
+            return None, None, messages
+        if encoding_type == "categorical":
+            return _map_dictionary(column, question.encoding, question.dtype)[0], None, messages
+        return _multiselect_dummies(column, question.dummy_columns, question.dummy_positions), None, messages
+
+    if warn:
+        messages.append(f"⚠️ Tipo de codificación desconocido: '{encoding_type}' en '{question.question}'")
+    return None, None, messages
+
+def _dictionary_encode(column: pa.ChunkedArray):
+    """
+    Codifica la columna como diccionario. Todos los bloques comparten el mismo diccionario, con
+    los valores en orden de primera aparición (igual que `pd.factorize`).
+
+    Retorna (diccionario, bloques de índices); los nulos quedan como índices nulos.
+    """
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    encoded = pc.dictionary_encode(column)
+    if encoded.num_chunks == 0:
+        return pa.array([], type=column.type), []
+    return encoded.chunk(encoded.num_chunks - 1).dictionary, [chunk.indices for chunk in encoded.chunks]
+
+def _normalized_keys(dictionary: pa.Array) -> pa.Array:
+    """
+    Normaliza los valores distintos como `str(x).strip()`: el texto con `utf8_trim_whitespace`, y
+    los demás tipos (números leídos del CSV) con `str`, igual que el backend 'pandas'.
+    """
+    if pa.types.is_string(dictionary.type) or pa.types.is_large_string(dictionary.type):
+        return pc.utf8_trim_whitespace(dictionary)
+    return pa.array([str(value).strip() for value in dictionary.to_pylist()], type=pa.string())
+
+def _map_dictionary(column: pa.ChunkedArray, encoding, dtype):
+    """
+    Equivalente Arrow de `_map_unique_values`: busca en el encoding solo los valores distintos y
+    propaga el resultado a las filas con `take`.
+
+    Retorna:
+    -------
+    tuple (pa.ChunkedArray, pa.Array, list, pa.Array)
+        - La columna mapeada (diccionario de categorías si `dtype` es categórico).
+        - Los valores distintos normalizados, en orden de primera aparición.
+        - Los bloques de índices de cada fila en esos valores (nulos para las respuestas nulas).
+        - La posición de cada valor distinto en el encoding (nula si no está mapeado).
+    """
+    dictionary, indices = _dictionary_encode(column)
+    keys = _normalized_keys(dictionary)
+    spec_keys = [key for key in encoding if isinstance(key, str)]
+    positions = pc.index_in(keys, value_set=pa.array(spec_keys, type=pa.string()))
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = pa.array(list(dtype.categories))
+        category_of_key = pa.array([dtype.categories.get_loc(encoding[key]) for key in spec_keys], type=pa.int32())
+        category_codes = category_of_key.take(positions)
+        encoded = pa.chunked_array(
+            [pa.DictionaryArray.from_arrays(category_codes.take(chunk), categories) for chunk in indices],
+            type=pa.dictionary(pa.int32(), categories.type)
+        )
+    else:
+        values = [encoding[key] for key in spec_keys]
+        try:
+            code_array = pa.array(values, type=_arrow_type(dtype)) if dtype is not None else pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as error:
+            raise ValueError(f"Códigos de tipos mezclados, use backend='pandas': {error}") from None
+        mapped = code_array.take(positions)
+        encoded = pa.chunked_array([mapped.take(chunk) for chunk in indices], type=mapped.type)
+
+    return encoded, keys, indices, positions
+
+def _unmapped_counts(index: pd.Index, keys: pa.Array, indices: list, positions: pa.Array) -> dict:
+    """
+    Equivalente de `taller_utils.unmapped.unmapped_counts` sobre los índices del diccionario:
+    las cantidades salen de un `bincount` y las primeras filas de todos los valores no mapeados,
+    de una sola pasada por el máximo acumulado de los índices.
+    """
+    unmapped_positions = np.flatnonzero(positions.is_null().to_numpy(zero_copy_only=False))
+    if len(unmapped_positions) == 0:
+        return {}
+
+    codes = np.concatenate([pc.fill_null(chunk, len(keys)).to_numpy() for chunk in indices])
+    counts = np.bincount(codes, minlength=len(keys) + 1)
+    # El diccionario está en orden de primera aparición, así que el máximo acumulado de los
+    # índices (ignorando nulos) alcanza el valor c justo en la primera fila donde aparece c
+    running_max = np.maximum.accumulate(np.where(codes == len(keys), -1, codes))
+    first_rows = np.searchsorted(running_max, unmapped_positions, side='left')
+
+    result = {}
+    for position, first in zip(unmapped_positions, first_rows):
+        key = keys[position].as_py()
+        count, first = int(counts[position]), int(first)
+        if key in result:
+            # Valores crudos distintos que se normalizan al mismo texto se suman
+            previous_count, previous_first = result[key]
+            result[key] = (previous_count + count, min(previous_first, first))
+        else:
+            result[key] = (count, first)
+    return {key: (count, index[first]) for key, (count, first) in result.items()}
+
+def _multiselect_dummies(column: pa.ChunkedArray, columns: tuple, column_of_key, sep: str = ', ') -> dict:
+    """
+    Equivalente Arrow de `_encode_multiselect_layout`: separa cada valor distinto con
+    `split_pattern`, marca sus opciones en un bloque uint8 y lo propaga a las filas con `take`.
+    """
+    dictionary, indices = _dictionary_encode(column)
+    if not (pa.types.is_string(dictionary.type) or pa.types.is_large_string(dictionary.type)):
+        dictionary = pa.array([str(value) for value in dictionary.to_pylist()], type=pa.string())
+
+    tokens = pc.split_pattern(dictionary, pattern=sep)
+    option_keys = list(column_of_key)
+    option_positions = np.array([column_of_key[key] for key in option_keys], dtype=np.int64)
+    found = pc.index_in(pc.list_flatten(tokens), value_set=pa.array(option_keys, type=pa.string()))
+    found = found.to_numpy(zero_copy_only=False)
+    parents = pc.list_parent_indices(tokens).to_numpy()
+
+    # La fila extra (en ceros) corresponde a los nulos
+    unique_block = np.zeros((len(dictionary) + 1, len(columns)), dtype=np.uint8)
+    matched = ~np.isnan(found)
+    unique_block[parents[matched], option_positions[found[matched].astype(np.int64)]] = 1
+
+    rows = [pc.fill_null(chunk, len(dictionary)).to_numpy() for chunk in indices]
+    return {
+        col: pa.chunked_array([pa.array(unique_block[codes, position]) for codes in rows], type=pa.uint8())
+        for position, col in enumerate(columns)
+    }
+
+def _arrow_type(dtype) -> pa.DataType:
+    """
+    Tipo Arrow de un tipo de `output_dtype` ('Int8' -> int8, 'boolean' -> bool).
+    """
+    if isinstance(dtype, pd.BooleanDtype):
+        return pa.bool_()
+    return pa.from_numpy_dtype(dtype.numpy_dtype)
+
+def _column_to_pandas(column: pa.ChunkedArray, dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return column.to_pandas().astype(dtype)
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        return column.to_pandas(types_mapper={column.type: dtype}.get)
+    return column.to_pandas()
+
+def _column_event(column: pa.ChunkedArray, question, encoded, unmapped, wall_s: float) -> StageEvent:
+    """
+    Equivalente de `question_event` para columnas Arrow (la memoria se mide con `nbytes`).
+    """
+    if isinstance(encoded, dict):
+        output_bytes = sum(values.nbytes for values in encoded.values())
+    else:
+        output_bytes = encoded.nbytes if encoded is not None else column.nbytes
+    return StageEvent(
+        stage="question",
+        wall_s=wall_s,
+        rows=len(column),
+        question=question.question,
+        type=question.type,
+        distinct=pc.count_distinct(column).as_py(),
+        unmapped=sum(count for count, _ in unmapped.values()) if unmapped is not None else None,
+        unmapped_distinct=len(unmapped) if unmapped is not None else None,
+        memory_delta=output_bytes - column.nbytes
+    )
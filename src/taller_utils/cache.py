@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from taller_utils.plan import _default_cache_dir, _write_atomic
+
+# Se incrementa cuando cambia el cálculo de algún resultado cacheado, para no reutilizar valores viejos
+_CACHE_VERSION = 1
+
+_MISSING = object()
+
+_default_cache = None
+
+class ResultCache:
+    """
+    Caché de resultados de análisis, direccionado por contenido: la clave es un hash de los datos
+    de las columnas usadas, el target y los parámetros (ver `content_key`), así que un resultado
+    se reutiliza mientras esos datos no cambien, sin importar de qué archivo o sesión vengan.
+
+    Tiene dos capas: un diccionario LRU en memoria, para las re-ejecuciones dentro del mismo
+    proceso (por ejemplo, las celdas del notebook), y archivos en disco, para las sesiones
+    siguientes y los procesos de `export_target_report`. El disco tiene un tamaño máximo: al
+    superarlo se borran los resultados usados hace más tiempo.
+
+    Parámetros:
+    ----------
+    cache_dir : str, opcional
+        Directorio base, el mismo del caché de planes. Por defecto es `$TALLER_UTILS_CACHE` o
+        '~/.cache/taller_utils'. Los resultados se guardan en su subdirectorio 'results'.
+
+    max_bytes : int, opcional
+        Tamaño máximo en disco. Por defecto, 256 MB.
+
+    max_items : int, opcional
+        Resultados que se mantienen en memoria. Por defecto, 256.
+
+    Atributos:
+    ----------
+    stats : dict
+        Aciertos en memoria ('memory'), en disco ('disk') y cálculos ('misses') desde que se creó.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = 256 * 2**20, max_items: int = 256):
+        self.cache_dir = cache_dir
+        self.directory = os.path.join(cache_dir or _default_cache_dir(), "results")
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.stats = {"memory": 0, "disk": 0, "misses": 0}
+        self._memory = OrderedDict()
+        self._disk_bytes = None
+        self._last_use = 0
+
+    def __reduce__(self):
+        # Los workers reciben la configuración y usan el disco; la capa en memoria no se copia
+        return (ResultCache, (self.cache_dir, self.max_bytes, self.max_items))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pkl")
+
+    def get(self, key: str, default=None):
+        """
+        Retorna el resultado guardado con `key`, o `default` si no está.
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.stats["memory"] += 1
+            return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            self.stats["misses"] += 1
+            return default
+        self._touch(path)
+        self.stats["disk"] += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value) -> None:
+        """
+        Guarda `value` en memoria y en disco. Si el disco supera `max_bytes`, borra los resultados
+        usados hace más tiempo. Los resultados más grandes que `max_bytes` solo quedan en memoria.
+        """
+        self._remember(key, value)
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        _write_atomic(path, data)
+        self._touch(path)
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._entries())
+        else:
+            self._disk_bytes += len(data) - previous
+        if self._disk_bytes > self.max_bytes:
+            self._evict()
+
+    def get_or_compute(self, key: str, function, *args):
+        """
+        Retorna el resultado de `key` o, si no está, lo calcula con `function(*args)` y lo guarda.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = function(*args)
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Borra todos los resultados, en memoria y en disco.
+        """
+        self._memory.clear()
+        for _, _, path in self._entries():
+            _remove(path)
+        self._disk_bytes = 0
+
+    def _remember(self, key: str, value) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _touch(self, path: str) -> None:
+        # La fecha de modificación marca el último uso, para el desalojo LRU. Se fuerza creciente
+        # porque el reloj del sistema de archivos puede repetir la misma fecha en usos seguidos
+        self._last_use = max(time.time_ns(), self._last_use + 1)
+        try:
+            os.utime(path, ns=(self._last_use, self._last_use))
+        except OSError:
+            pass
+
+    def _entries(self) -> list:
+        """
+        Archivos del caché en disco como (último uso, tamaño, ruta).
+        """
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".pkl"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+        self._disk_bytes = total
+
+def content_key(kind: str, *parts) -> str:
+    """
+    Clave de caché para un resultado de tipo `kind` a partir de sus datos y parámetros.
+
+    Las Series y DataFrames se identifican por el nombre, el tipo y el hash de los valores de cada
+    columna, en orden (el índice no se incluye). El resto de las partes (parámetros) se incluyen
+    como JSON.
+    """
+    digest = hashlib.blake2b(f"{kind}-v{_CACHE_VERSION}".encode("utf-8"), digest_size=20)
+    for part in parts:
+        digest.update(b"\0")
+        if isinstance(part, pd.DataFrame):
+            for name in part.columns:
+                _update_series(digest, part[name])
+        elif isinstance(part, pd.Series):
+            _update_series(digest, part)
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+def resolve_cache(cache):
+    """
+    Interpreta el parámetro `cache` de las funciones de análisis: None o False no usan caché, True
+    usa el caché por defecto del proceso (ver `default_result_cache`) y un `ResultCache` se usa tal cual.
+    """
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return default_result_cache()
+    return cache
+
+def default_result_cache() -> ResultCache:
+    """
+    Caché compartido por el proceso, en el directorio por defecto.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+def _update_series(digest, series: pd.Series) -> None:
+    digest.update(f"{series.name}\0{series.dtype}\0".encode("utf-8"))
+    dtype = series.dtype
+    # Las columnas codificadas (enteros, dummies, categóricas) y los textos Arrow se hashean
+    # directamente desde sus buffers; hash_pandas_object queda para el resto de los tipos
+    if isinstance(dtype, pd.CategoricalDtype):
+        digest.update(series.cat.codes.to_numpy().tobytes())
+        digest.update(pd.util.hash_pandas_object(dtype.categories, index=False).to_numpy().tobytes())
+    elif isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        digest.update(np.ascontiguousarray(series.to_numpy()))
+    elif pd.api.types.is_extension_array_dtype(dtype) and hasattr(dtype, "numpy_dtype") and dtype.kind in "biuf":
+        digest.update(np.ascontiguousarray(series.isna().to_numpy()))
+        digest.update(np.ascontiguousarray(series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)))
+    elif hasattr(series.array, "__arrow_array__"):
+        import pyarrow as pa
+
+        array = pa.array(series.array)
+        for chunk in array.chunks if isinstance(array, pa.ChunkedArray) else [array]:
+            digest.update(f"{chunk.offset}\0{len(chunk)}\0".encode("utf-8"))
+            for buffer in chunk.buffers():
+                digest.update(b"\0" if buffer is None else buffer)
+    else:
+        digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
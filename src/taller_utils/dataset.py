@@ -0,0 +1,260 @@
+import glob
+import json
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from taller_utils.plan import EncodingPlan, as_plan
+
+# Clave de los metadatos del archivo Parquet donde se guarda la especificación de encoding
+METADATA_KEY = b"taller_utils.encoding"
+
+# Manifiesto de un dataset particionado (ver `taller_utils.pipeline.process_survey_incremental`)
+MANIFEST_NAME = "_manifest.json"
+
+def write_processed_dataset(df: pd.DataFrame, path: str, encoding_dict=None) -> None:
+    """
+    Guarda la encuesta codificada en Parquet, con la especificación de encoding en los metadatos.
+
+    Parámetros:
+    ----------
+    df : pd.DataFrame o pa.Table
+        Resultado de `process_survey_data` (el índice no se guarda) o la tabla Arrow de
+        `process_survey_arrow`, que se escribe sin convertir.
+
+    path : str
+        Ruta del archivo '.parquet'.
+
+    encoding_dict : dict o EncodingPlan, opcional
+        Especificación usada para codificar. Se guarda en los metadatos para que
+        `ProcessedDataset` sepa qué columnas corresponden a cada pregunta.
+
+    Notas:
+    ------
+    - Los tipos de las columnas (Int8, category, uint8) se conservan en los metadatos de pandas
+      y se recuperan al leer, a diferencia del CSV.
+    - Las columnas dispersas (`process_survey_data(..., sparse=True)`) se guardan como uint8.
+    """
+    if isinstance(df, pa.Table):
+        table = df
+        if encoding_dict is not None and table.schema.pandas_metadata is None:
+            # Sin metadatos de pandas, las columnas Int8 con nulos se leerían como float: se toman
+            # de la tabla vacía convertida con los tipos del plan
+            from taller_utils.arrow_encoding import table_to_pandas
+            empty = table_to_pandas(table.slice(0, 0), encoding_dict)
+            table = table.replace_schema_metadata(pa.Schema.from_pandas(empty, preserve_index=False).metadata)
+    else:
+        sparse_columns = [col for col in df.columns if isinstance(df[col].dtype, pd.SparseDtype)]
+        if sparse_columns:
+            # Parquet no tiene columnas dispersas: las dummies se guardan densas (comprimidas)
+            df = df.astype({col: df[col].dtype.subtype for col in sparse_columns})
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    if encoding_dict is not None:
+        table = table.replace_schema_metadata(with_plan_metadata(table.schema, encoding_dict).metadata)
+    pq.write_table(table, path)
+
+def with_plan_metadata(schema: pa.Schema, encoding_dict) -> pa.Schema:
+    """
+    Agrega la especificación de encoding a los metadatos de un esquema Arrow.
+
+    Las opciones se guardan como pares [respuesta, código] para conservar el tipo de los códigos
+    (un diccionario JSON convertiría las claves no textuales en texto).
+    """
+    plan = as_plan(encoding_dict)
+    questions = [
+        {
+            'question': q.question,
+            'type': q.type,
+            'encoding': [[key, _json_value(code)] for key, code in q.encoding.items()] if q.encoding is not None else None
+        }
+        for q in plan.questions
+    ]
+    payload = json.dumps({'spec_hash': plan.spec_hash, 'questions': questions}, ensure_ascii=False)
+    return schema.with_metadata({**(schema.metadata or {}), METADATA_KEY: payload.encode('utf-8')})
+
+class ProcessedDataset:
+    """
+    Acceso perezoso a una encuesta codificada en Parquet.
+
+    Al abrirlo solo se lee el esquema del archivo (mapeado en memoria); los datos se leen al
+    pedir columnas, y solo esas. Se puede pasar directamente a `explorar_relacion_con_target`,
+    `resumen_relaciones_con_target` y `export_target_report` en lugar de un DataFrame.
+
+    Parámetros:
+    ----------
+    path : str
+        Ruta del archivo escrito con `write_processed_dataset` o con `process_survey_file`, o un
+        directorio de particiones '.parquet' (por ejemplo, el de `process_survey_incremental`).
+        Si el directorio tiene un `_manifest.json`, solo se leen las particiones registradas
+        en él, en su orden; si no, todos los '.parquet' en orden alfabético.
+
+    Atributos:
+    ----------
+    columns : pd.Index
+        Columnas del archivo, en orden.
+
+    plan : EncodingPlan o None
+        Especificación de encoding guardada en el archivo, si la hay.
+
+    num_rows : int
+        Cantidad de filas.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._files = [pq.ParquetFile(file, memory_map=True) for file in _partition_files(path)]
+        if not self._files:
+            raise FileNotFoundError(f"No hay archivos Parquet en '{path}'")
+        schema = self._files[0].schema_arrow
+        # Las particiones pueden tener columnas distintas (por ejemplo, olas con otras preguntas):
+        # el dataset tiene todas, en orden de aparición, y al leer se completan con nulos
+        names = [file.schema_arrow.names for file in self._files]
+        self._uniform = all(file_names == names[0] for file_names in names)
+        self.columns = pd.Index(list(dict.fromkeys(name for file_names in names for name in file_names)))
+        self.num_rows = sum(file.metadata.num_rows for file in self._files)
+        payload = (schema.metadata or {}).get(METADATA_KEY)
+        self.plan = _plan_from_metadata(payload) if payload is not None else None
+
+    def __reduce__(self):
+        # El archivo abierto no se puede serializar: los workers lo vuelven a abrir
+        return (ProcessedDataset, (self.path,))
+
+    def __repr__(self) -> str:
+        return f"ProcessedDataset('{self.path}', {self.num_rows} filas, {len(self.columns)} columnas)"
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __contains__(self, column) -> bool:
+        return column in self.columns
+
+    def __getitem__(self, columns) -> pd.DataFrame:
+        """
+        `dataset[['a', 'b']]` lee esas columnas como DataFrame; `dataset['a']` como Serie.
+        """
+        if isinstance(columns, str):
+            return self.read([columns])[columns]
+        return self.read(list(columns))
+
+    def columns_for(self, question: str) -> list:
+        """
+        Columnas de una pregunta: la propia columna o, si es multiselect, sus dummies `question__*`.
+        """
+        if question in self.columns:
+            return [question]
+        return [col for col in self.columns if col.startswith(f"{question}__")]
+
+    def read(self, columns: list = None) -> pd.DataFrame:
+        """
+        Lee las columnas indicadas (todas si es None), con los tipos guardados en el archivo.
+        """
+        if columns is not None:
+            columns = list(dict.fromkeys(columns))
+        if self._uniform:
+            tables = [file.read(columns=columns, use_pandas_metadata=True) for file in self._files]
+            table = tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+            return table.to_pandas()
+        # Con esquemas distintos, cada partición se convierte con sus propios metadatos de pandas
+        # (así conserva Int8 y category) y las columnas que le faltan quedan nulas
+        columns = list(self.columns) if columns is None else columns
+        frames = [self._read_file(file, columns) for file in self._files]
+        return pd.concat(frames, ignore_index=True).reindex(columns=columns)
+
+    def iter_batches(self, columns: list = None, batch_size: int = 65_536):
+        """
+        Recorre las columnas indicadas (todas si es None) en bloques de a lo más `batch_size` filas,
+        como DataFrames con los tipos guardados en el archivo, sin cargar el archivo completo.
+        """
+        if columns is not None:
+            columns = list(dict.fromkeys(columns))
+        for file in self._files:
+            if self._uniform:
+                for batch in file.iter_batches(batch_size=batch_size, columns=columns, use_pandas_metadata=True):
+                    yield batch.to_pandas()
+                continue
+            wanted = list(self.columns) if columns is None else columns
+            present = [col for col in wanted if col in file.schema_arrow.names]
+            for batch in file.iter_batches(batch_size=batch_size, columns=present, use_pandas_metadata=True):
+                yield batch.to_pandas().reindex(columns=wanted)
+
+    def read_questions(self, *questions: str) -> pd.DataFrame:
+        """
+        Lee solo las columnas de las preguntas indicadas (columna simple o prefijo multiselect).
+
+        Las preguntas que no están en el archivo se omiten, para que quien llama decida cómo avisarlo.
+        """
+        return self.read([col for question in questions for col in self.columns_for(question)])
+
+    def resumen_na(self) -> pd.DataFrame:
+        """
+        Igual que `taller_utils.helpers.resumen_na`, pero calculado con las estadísticas del
+        archivo, sin leer los datos. Las columnas sin estadísticas se leen una a una.
+        """
+        nulls = np.zeros(len(self.columns), dtype=np.int64)
+        missing_stats = set()
+        for file in self._files:
+            metadata = file.metadata
+            positions = self.columns.get_indexer(file.schema_arrow.names)
+            # Las columnas que no están en la partición son nulas en todas sus filas
+            absent = np.ones(len(self.columns), dtype=bool)
+            absent[positions] = False
+            nulls[absent] += metadata.num_rows
+            for rg in range(metadata.num_row_groups):
+                row_group = metadata.row_group(rg)
+                for i in range(row_group.num_columns):
+                    statistics = row_group.column(i).statistics
+                    if statistics is None or not statistics.has_null_count:
+                        missing_stats.add(positions[i])
+                    else:
+                        nulls[positions[i]] += statistics.null_count
+        for i in missing_stats:
+            nulls[i] = self.read([self.columns[i]]).iloc[:, 0].isna().sum()
+
+        na_counts = pd.Series(nulls, index=self.columns)
+        return pd.DataFrame({
+            'nulos': na_counts,
+            'porcentaje': (na_counts / max(self.num_rows, 1) * 100).round(2)
+        }).sort_values(by='nulos', ascending=False)
+
+    @staticmethod
+    def _read_file(file, columns: list) -> pd.DataFrame:
+        present = [col for col in columns if col in file.schema_arrow.names]
+        return file.read(columns=present, use_pandas_metadata=True).to_pandas()
+
+def open_processed_dataset(path: str) -> ProcessedDataset:
+    """
+    Abre una encuesta codificada en Parquet sin leer sus datos (ver `ProcessedDataset`).
+    """
+    return ProcessedDataset(path)
+
+def _partition_files(path: str) -> list:
+    """
+    Archivos Parquet de `path`: el propio archivo o las particiones de un directorio.
+    """
+    if not os.path.isdir(path):
+        return [path]
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            partitions = json.load(f).get('partitions', [])
+        return [os.path.join(path, partition['file']) for partition in partitions]
+    return sorted(glob.glob(os.path.join(path, "*.parquet")))
+
+def _plan_from_metadata(payload: bytes) -> EncodingPlan:
+    data = json.loads(payload.decode('utf-8'))
+    entries = [
+        {
+            'question': entry['question'],
+            'type': entry['type'],
+            'encoding': {key: code for key, code in entry['encoding']} if entry['encoding'] is not None else None
+        }
+        for entry in data['questions']
+    ]
+    return EncodingPlan.from_dict(entries, validate=False, spec_hash=data.get('spec_hash'))
+
+def _json_value(value):
+    """
+    Convierte escalares de NumPy a tipos nativos para guardarlos en JSON.
+    """
+    return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+from taller_utils.plan import as_plan, load_encoding_plan
+
+# sklearn se importa a nivel de módulo porque SurveyEncoder hereda de sus clases base: este módulo
+# no lo importa ningún otro del paquete, así que solo se carga al usar el encoder.
+
+_NA = pd.NA
+
+class SurveyEncoder(TransformerMixin, BaseEstimator):
+    """
+    Codificador de respuestas de encuesta con la interfaz fit/transform de scikit-learn.
+
+    Aplica las mismas reglas que `process_survey_data`, pero produce una matriz NumPy con un orden
+    de columnas fijo (ver `get_feature_names_out`), pensada para modelos y para servicios que
+    codifican respuestas de a una. `transform_one` codifica un diccionario {pregunta: respuesta}
+    solo con búsquedas en diccionarios precompilados en `fit`, sin pandas ni archivos, en
+    microsegundos. El encoder se puede serializar con pickle o joblib.
+
+    Columnas de salida, en el orden de la especificación:
+    - 'binary'/'ordinal' con códigos numéricos o booleanos: el código.
+    - 'categorical', o códigos de texto: la posición del código entre los códigos distintos del
+      encoding (como `Series.cat.codes` en la salida de `process_survey_data`).
+    - 'multiselect': una columna 0/1 por código (`pregunta__codigo`).
+    Las respuestas nulas o no mapeadas quedan en NaN (en 0 para las dummies). Las preguntas sin
+    encoding o de tipo desconocido se omiten.
+
+    Parámetros:
+    ----------
+    spec : dict, EncodingPlan o str
+        Especificación de `load_yaml_encodings`, un `EncodingPlan` o la ruta a un archivo YAML/JSON
+        (que se carga con `load_encoding_plan`, usando su caché).
+
+    sep : str, opcional
+        Separador de las opciones en las respuestas multiselect. Por defecto es ', '.
+
+    Atributos:
+    ----------
+    plan_ : EncodingPlan
+        Especificación compilada.
+
+    n_features_out_ : int
+        Cantidad de columnas de salida.
+    """
+
+    def __init__(self, spec=None, sep: str = ", "):
+        self.spec = spec
+        self.sep = sep
+
+    def fit(self, X=None, y=None):
+        """
+        Compila la especificación. Los datos no se usan: el encoding está definido por `spec`.
+        """
+        if self.spec is None:
+            raise ValueError("SurveyEncoder necesita una especificación de encoding ('spec').")
+        plan = load_encoding_plan(self.spec) if isinstance(self.spec, str) else as_plan(self.spec)
+
+        names, steps, empty = [], [], []
+        for question in plan.questions:
+            if not question.encoding or question.type not in ("binary", "ordinal", "categorical", "multiselect"):
+                continue
+            if question.type == "multiselect":
+                steps.append((question.question, len(names), None, dict(question.dummy_positions), len(question.dummy_columns)))
+                names.extend(question.dummy_columns)
+                empty.extend([0.0] * len(question.dummy_columns))
+            else:
+                steps.append((question.question, len(names), _lookup_table(question.type, question.encoding), None, 1))
+                names.append(question.question)
+                empty.append(np.nan)
+
+        self.plan_ = plan
+        self.n_features_out_ = len(names)
+        self._feature_names = np.array(names, dtype=object)
+        self._steps = steps
+        self._empty = empty
+        return self
+
+    def transform(self, X) -> np.ndarray:
+        """
+        Codifica un DataFrame, una lista de respuestas (diccionarios) o una sola respuesta.
+
+        Con un DataFrame, cada columna se codifica sobre sus valores distintos; las preguntas que
+        no están en el DataFrame quedan como sin respuesta. Retorna un array float64 de
+        filas × `n_features_out_`.
+        """
+        check_is_fitted(self, "plan_")
+        if isinstance(X, dict):
+            return self.transform_one(X)[np.newaxis, :]
+        if not isinstance(X, pd.DataFrame):
+            return self.transform_records(X)
+
+        out = np.tile(np.array(self._empty), (len(X), 1))
+        for question, column, table, positions, width in self._steps:
+            if question not in X.columns:
+                continue
+            codes, uniques = pd.factorize(X[question])
+            if positions is None:
+                # La última posición (NaN) corresponde al código -1 de los nulos
+                values = np.array([_lookup(table, value) for value in uniques] + [np.nan])
+                out[:, column] = values[codes]
+            else:
+                block = np.zeros((len(uniques) + 1, width))
+                for i, value in enumerate(uniques):
+                    for token in str(value).split(self.sep):
+                        position = positions.get(token)
+                        if position is not None:
+                            block[i, position] = 1.0
+                out[:, column:column + width] = block[codes]
+        return out
+
+    def transform_one(self, response: dict) -> np.ndarray:
+        """
+        Codifica una respuesta {pregunta: valor} en un vector de largo `n_features_out_`.
+
+        Las preguntas ausentes del diccionario quedan como sin respuesta. Es el camino rápido para
+        servicios: no valida que el encoder esté ajustado (llamar antes a `fit`).
+        """
+        row = self._empty.copy()
+        sep = self.sep
+        for question, column, table, positions, _ in self._steps:
+            value = response.get(question)
+            if value is None or value is _NA or value != value:
+                continue
+            if positions is None:
+                code = table.get(value)
+                row[column] = code if code is not None else _lookup(table, value)
+            else:
+                for token in str(value).split(sep):
+                    position = positions.get(token)
+                    if position is not None:
+                        row[column + position] = 1.0
+        return np.array(row)
+
+    def transform_records(self, responses) -> np.ndarray:
+        """
+        Codifica una lista de respuestas (diccionarios) con `transform_one`, para lotes chicos.
+        """
+        check_is_fitted(self, "plan_")
+        if not responses:
+            return np.empty((0, self.n_features_out_))
+        return np.array([self.transform_one(response) for response in responses])
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        """
+        Nombres de las columnas de salida, en orden.
+        """
+        check_is_fitted(self, "plan_")
+        return self._feature_names.copy()
+
+def _lookup_table(encoding_type: str, encoding) -> dict:
+    """
+    Tabla {respuesta: valor numérico} de una pregunta binary/ordinal/categorical.
+
+    Solo incluye claves de texto sin espacios alrededor: son las únicas que puede encontrar la
+    búsqueda de `process_survey_data`, que normaliza cada respuesta con `str(x).strip()`.
+    """
+    codes = list(dict.fromkeys(encoding.values()))
+    numeric = encoding_type != "categorical" and all(
+        isinstance(code, (bool, int, float, np.bool_, np.integer, np.floating)) for code in codes
+    )
+    position = {code: i for i, code in enumerate(codes)}
+    return {
+        key: float(code) if numeric else float(position[code])
+        for key, code in encoding.items()
+        if isinstance(key, str) and key == key.strip()
+    }
+
+def _lookup(table: dict, value) -> float:
+    """
+    Valor de una respuesta normalizada como en `process_survey_data`; NaN si es nula o no está mapeada.
+    """
+    if value is None or value is _NA or value != value:
+        return np.nan
+    return table.get(str(value).strip(), np.nan)
@@ -1,7 +1,14 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 import pandas as pd
 import numpy as np
 import yaml
 import json
+from taller_utils.instrumentation import StageEvent, question_event, timed
+from taller_utils.plan import EncodingPlan, YamlLoader, as_plan, multiselect_layout
+from taller_utils.sparse import multiselect_indicators
+from taller_utils.unmapped import UnmappedReport, unmapped_counts
 
 def load_yaml_encodings(yaml_file_path: str) -> dict:
     """
@@ -12,15 +19,136 @@ def load_yaml_encodings(yaml_file_path: str) -> dict:
 
     Retorna:
     - Un diccionario con la clave 'survey_responses' conteniendo la lista de preguntas y sus codificaciones
+
+    Usa el parser en C de libyaml si está disponible. Para reutilizar el resultado entre
+    ejecuciones, ver `taller_utils.plan.load_encoding_plan`.
     """
     with open(yaml_file_path, 'r', encoding='utf-8') as file:
-        yaml_data = yaml.safe_load(file)
+        yaml_data = yaml.load(file, Loader=YamlLoader)
     return {'survey_responses': yaml_data}
+
+def _map_unique_values(series: pd.Series, encoding: dict, dtype=None):
+    """
+    Mapea una columna normalizando y buscando en el encoding solo sus valores únicos.
+
+    Los valores se factorizan una vez, cada valor distinto se normaliza con
+    `str(x).strip()` y se busca en el diccionario, y los códigos resultantes se
+    propagan de vuelta a todas las filas. Los valores son idénticos a los de aplicar
+    la búsqueda fila a fila con `Series.apply`, incluyendo `pd.NA` para nulos y
+    valores no mapeados.
+
+    Parámetros:
+    ----------
+    series : pd.Series
+        Columna original con las respuestas.
+
+    encoding : dict
+        Diccionario de mapeo de valores para la pregunta.
+
+    dtype : tipo de pandas, opcional
+        Tipo de la columna resultante (ver `taller_utils.plan.output_dtype`). Se aplica sobre la
+        tabla de valores distintos antes de propagarla. Si es None, el tipo se infiere de los valores.
+
+    Retorna:
+    -------
+    tuple (pd.Series, np.ndarray, np.ndarray)
+        - La columna mapeada, con el mismo índice y nombre que la original.
+        - Los valores únicos normalizados (array de objetos).
+        - Los códigos por fila que apuntan a esos valores únicos (`len(keys)` para nulos).
+    """
+    codes, uniques = pd.factorize(series)
+    keys = np.array([str(value).strip() for value in uniques], dtype=object)
+    mapped = [encoding.get(key, pd.NA) for key in keys]
+    if (codes == -1).any():
+        # Los nulos quedan en la última posición para el código -1 de factorize
+        mapped.append(pd.NA)
+        codes = np.where(codes == -1, len(keys), codes)
+    if isinstance(dtype, pd.CategoricalDtype):
+        table = pd.Categorical(mapped, dtype=dtype)
+        values = pd.Categorical.from_codes(table.codes.take(codes), dtype=dtype)
+    elif dtype is not None:
+        values = pd.array(mapped, dtype=dtype).take(codes)
+    else:
+        # El dtype se infiere sobre los valores distintos, igual que lo haría apply fila a fila
+        table = pd.Series(np.array(mapped, dtype=object)).infer_objects()
+        result = pd.Series(table.to_numpy().take(codes), index=series.index, name=series.name, dtype=table.dtype)
+        return result, keys, codes
+    return pd.Series(values, index=series.index, name=series.name), keys, codes
+
+def encode_multiselect(
+    series: pd.Series,
+    encoding: dict,
+    question_text: str = None,
+    sep: str = ', ',
+    sparse: bool = False
+) -> pd.DataFrame:
+    """
+    Codifica una pregunta multiselect como columnas dummy en una sola pasada.
+
+    Cada valor distinto de la columna se separa una única vez por `sep` y sus opciones
+    se marcan en un bloque NumPy uint8 preasignado, que luego se propaga a todas las
+    filas con los códigos de factorización. Una opción está presente si coincide
+    exactamente con una de las partes de la respuesta; los nulos no marcan ninguna.
+
+    Parámetros:
+    ----------
+    series : pd.Series
+        Columna original con las respuestas separadas por `sep`.
+
+    encoding : dict
+        Diccionario {opción: código}. Cada código genera la columna `question_text__codigo`.
+
+    question_text : str, opcional
+        Prefijo de las columnas dummy. Por defecto es el nombre de la serie.
+
+    sep : str, opcional
+        Separador entre opciones dentro de una respuesta. Por defecto es ', '.
+
+    sparse : bool, opcional
+        Si es True, retorna las dummies como `taller_utils.sparse.SparseIndicators` (matriz CSR con
+        los nombres de columna), sin construir el bloque denso.
+
+    Retorna:
+    -------
+    pd.DataFrame o SparseIndicators
+        DataFrame uint8 con una columna por código, en el orden del encoding y con el índice de la serie.
+    """
+    if question_text is None:
+        question_text = series.name
+
+    columns, column_of_key = multiselect_layout(encoding, question_text)
+    if sparse:
+        return multiselect_indicators(series, columns, column_of_key, sep)
+    return _encode_multiselect_layout(series, columns, column_of_key, sep)
+
+def _encode_multiselect_layout(series: pd.Series, columns: tuple, column_of_key, sep: str = ', ') -> pd.DataFrame:
+    """
+    Núcleo de `encode_multiselect` con las columnas y posiciones ya calculadas (ver `multiselect_layout`).
+    """
+    codes, uniques = pd.factorize(series)
+    # La fila extra (en ceros) corresponde al código -1 de los nulos
+    unique_block = np.zeros((len(uniques) + 1, len(columns)), dtype=np.uint8)
+    for i, value in enumerate(uniques):
+        for token in str(value).split(sep):
+            position = column_of_key.get(token)
+            if position is not None:
+                unique_block[i, position] = 1
+
+    return pd.DataFrame(unique_block[codes], index=series.index, columns=list(columns))
+
 def process_survey_data(
     df: pd.DataFrame, 
-    encoding_dict: dict, 
+    encoding_dict, 
     one_hot_encoders: dict = None, 
-    log_unmapped: bool = True
+    log_unmapped: bool = True,
+    n_jobs: int = 1,
+    parallel_backend: str = "thread",
+    unmapped_path: str = None,
+    return_report: bool = False,
+    observer=None,
+    backend: str = "pandas",
+    sparse: bool = False,
+    match_threshold: float = None
 ) -> pd.DataFrame:
     """
     Aplica codificación a los datos de una encuesta utilizando un diccionario de encoding personalizado.
@@ -36,98 +164,315 @@ def process_survey_data(
     df : pd.DataFrame
         DataFrame con las respuestas originales de la encuesta.
 
-    encoding_dict : dict
+    encoding_dict : dict o EncodingPlan
         Diccionario con la clave 'survey_responses' que contiene una lista de preguntas.
         Cada entrada debe incluir:
         - 'question': nombre exacto de la columna en el DataFrame.
         - 'type': uno de 'binary', 'ordinal', 'categorical', 'multiselect'.
         - 'encoding': diccionario de mapeo de valores para esa pregunta.
+        También acepta un `EncodingPlan` ya compilado (ver `taller_utils.plan.load_encoding_plan`).
 
     one_hot_encoders : dict, opcional
         Estructura para registrar las columnas creadas por codificación multiselect. Por defecto es None.
 
     log_unmapped : bool, opcional
-        Si es True, imprime advertencias para los valores no encontrados en el encoding
-        y guarda un archivo 'unmapped_values.json' con el resumen.
+        Si es True, imprime un único resumen de los valores no encontrados en el encoding.
+
+    n_jobs : int, opcional
+        Cantidad de workers para codificar las preguntas en paralelo. Cada pregunta solo lee su
+        propia columna, así que se reparten por columna y el resultado se rearma en el orden
+        original; es idéntico al de la ejecución en serie. -1 usa todos los núcleos. Por defecto es 1.
+
+    parallel_backend : str, opcional
+        'thread' (por defecto) comparte el DataFrame sin copiarlo; 'process' envía cada columna a
+        otro proceso, lo que solo compensa con columnas muy grandes y mucho trabajo por pregunta.
+
+    unmapped_path : str, opcional
+        Si se indica, guarda ahí el reporte de valores no mapeados en JSON (solo si hubo alguno).
+        Por defecto no se escribe ningún archivo.
+
+    return_report : bool, opcional
+        Si es True, retorna la tupla (DataFrame, UnmappedReport).
+
+    observer : callable, opcional
+        Función que recibe un `taller_utils.instrumentation.StageEvent` por pregunta (tiempo,
+        filas, valores distintos, no mapeados y diferencia de memoria) y uno final con el total
+        ('encode'). Ver `EventCollector`, `JsonLinesExporter` y `LoggingObserver`. Sin observador
+        no se mide nada.
+
+    backend : str, opcional
+        'pandas' (por defecto) u 'arrow'. Con 'arrow', cada columna se codifica con `pyarrow.compute`
+        (ver `taller_utils.arrow_encoding`); el resultado y el reporte son los mismos. Para trabajar
+        directamente sobre tablas Arrow leídas del CSV, ver `process_survey_arrow`.
+
+    sparse : bool, opcional
+        Si es True, las dummies multiselect se construyen como matriz CSR (ver `encode_multiselect`)
+        y se agregan como columnas dispersas de pandas (`Sparse[uint8, 0]`), que solo ocupan memoria
+        por las opciones marcadas. Las funciones de análisis las aceptan igual que las densas, y
+        `SparseIndicators.from_frame(df)` retorna la matriz CSR para scikit-learn.
+
+    match_threshold : float, opcional
+        Si se indica, los valores no mapeados se comparan con las claves del encoding de su
+        pregunta (sin tildes, mayúsculas ni espacios extra, y luego por distancia de edición; ver
+        `taller_utils.matching.suggest_matches`) y los que tienen una coincidencia con puntaje
+        mayor o igual se codifican con esa clave. Solo se recodifican las preguntas afectadas, y
+        el reporte queda con los valores que siguen sin mapear. Por defecto no se corrige nada.
 
     Retorna:
     -------
-    pd.DataFrame
+    pd.DataFrame o tuple (pd.DataFrame, UnmappedReport)
         Una copia del DataFrame original, con las columnas codificadas según las reglas provistas.
         Las columnas originales pueden ser reemplazadas o expandidas según su tipo.
+        Con `return_report=True`, también el reporte de valores no mapeados de las preguntas
+        binary/ordinal: cada valor distinto con su cantidad y la etiqueta de su primera fila.
+
+        Los tipos de las columnas codificadas se derivan de la especificación y no de los datos
+        (ver `EncodingPlan.output_schema`): enteros nullable ('Int8', 'UInt8', ...) para binary/ordinal,
+        'category' para categorical y uint8 para las dummies multiselect. Para comparar el uso de
+        memoria antes y después, ver `taller_utils.helpers.memory_report`.
 
     Efectos secundarios:
     --------------------
     - Muestra advertencias para preguntas no encontradas.
-    - Imprime valores no mapeados y los guarda en 'unmapped_values.json' si log_unmapped es True.
+    - Imprime un resumen de valores no mapeados si log_unmapped es True.
+    - Escribe el reporte en `unmapped_path` si se indica.
     """
     if one_hot_encoders is None:
         one_hot_encoders = {}
+    original = df
+    if backend not in ("pandas", "arrow"):
+        raise ValueError(f"Backend no soportado: '{backend}' (use 'pandas' o 'arrow')")
 
-    df = df.copy()
-    unmapped_values = {}
+    if observer is None:
+        df, report = _encode_frame(
+            df.copy(), encoding_dict, n_jobs=n_jobs, parallel_backend=parallel_backend, backend=backend,
+            sparse=sparse
+        )
+    else:
+        (df, report), wall_s = timed(
+            _encode_frame, df.copy(), encoding_dict, True, n_jobs, parallel_backend, observer, backend, sparse
+        )
+        observer(StageEvent(stage="encode", wall_s=wall_s, rows=len(df), unmapped=report.total()))
+    if match_threshold is not None and report:
+        df, report = _apply_unmapped_matches(
+            original, df, encoding_dict, report, match_threshold, log_unmapped=log_unmapped, backend=backend
+        )
+    _report_unmapped(report, log_unmapped=log_unmapped, unmapped_path=unmapped_path)
 
-    for question in encoding_dict['survey_responses']:
-        question_text = question['question']
-        encoding_type = question['type']
-        encoding = question.get('encoding', {})
+    if return_report:
+        return df, report
+    return df
 
-        if question_text not in df.columns:
-            print(f"⚠️ Pregunta no encontrada en el DataFrame: '{question_text}'")
-            continue
+def _encode_frame(
+    df: pd.DataFrame,
+    encoding_dict,
+    warn: bool = True,
+    n_jobs: int = 1,
+    parallel_backend: str = "thread",
+    observer=None,
+    backend: str = "pandas",
+    sparse: bool = False
+):
+    """
+    Codifica `df` en el lugar según `encoding_dict` (núcleo de `process_survey_data`).
 
-        if encoding_type in ("binary", "ordinal"):
-            unmapped_values[question_text] = []
-
-            def map_and_warn(x):
-                val = str(x).strip() if pd.notna(x) else None
-                if val is None:
-                    return pd.NA
-                if val not in encoding:
-                    if log_unmapped:
-                        print(f"⚠️  Valor no mapeado en '{question_text}': '{val}'")
-                    unmapped_values[question_text].append(val)
-                    return pd.NA
-                return encoding[val]
-
-            df[question_text] = df[question_text].apply(map_and_warn)
-
-        elif encoding_type == "categorical":
-            if not encoding:
-                print(f"⚠️  Sin encoding definido para '{question_text}', se omite.")
-                continue
-
-            df[question_text] = df[question_text].apply(
-                lambda x: encoding.get(str(x).strip(), pd.NA) if pd.notna(x) else pd.NA
-            )
-
-        elif encoding_type == "multiselect":
-            if not encoding:
-                print(f"⚠️  Sin encoding definido para '{question_text}', se omite.")
-                continue
-
-            for category_key, category_code in encoding.items():
-                col_name = f"{question_text}__{category_code}"
-                df[col_name] = df[question_text].apply(
-                    lambda x: category_key in str(x).split(', ') if pd.notna(x) else False
-                ).astype(int)
-            df.drop(columns=[question_text], inplace=True)
+    Parámetros:
+    ----------
+    df : pd.DataFrame
+        DataFrame a codificar. Se modifica, por lo que quien llama decide si pasar una copia.
 
-        else:
-            print(f"⚠️ Tipo de codificación desconocido: '{encoding_type}' en '{question_text}'")
+    encoding_dict : dict o EncodingPlan
+        Especificación de encoding (ver `process_survey_data`).
+
+    warn : bool, opcional
+        Si es True, advierte sobre preguntas no encontradas, sin encoding o con tipo desconocido.
+        El modo por bloques lo desactiva después del primer bloque para no repetirlas.
+
+    n_jobs : int, opcional
+        Cantidad de workers para codificar preguntas en paralelo (-1 usa todos los núcleos).
+
+    parallel_backend : str, opcional
+        'thread' o 'process'. Ver `process_survey_data`.
+
+    observer : callable, opcional
+        Recibe un `StageEvent` por pregunta codificada, en el orden de las preguntas. El tiempo
+        se mide dentro del worker, así que en paralelo refleja el costo de cada pregunta.
+
+    backend : str, opcional
+        'pandas' o 'arrow'. Ver `process_survey_data`.
+
+    sparse : bool, opcional
+        Si es True, las dummies multiselect quedan como columnas dispersas. Ver `process_survey_data`.
+
+    Retorna:
+    -------
+    tuple (pd.DataFrame, UnmappedReport)
+        El DataFrame codificado y el reporte de valores no mapeados.
+    """
+    questions = as_plan(encoding_dict).questions
+    names = [question.question for question in questions]
+    n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+    # Con preguntas repetidas, cada pasada lee el resultado de la anterior: solo se puede en serie
+    parallel = n_jobs > 1 and len(questions) > 1 and len(set(names)) == len(names)
+
+    report = UnmappedReport()
+    multiselect_blocks = []
+    multiselect_questions = set()
+
+    def apply(question, result, wall_s=None):
+        encoded, unmapped, messages = result
+        if wall_s is not None:
+            observer(question_event(df[question.question], question, encoded, unmapped, wall_s))
+        for message in messages:
+            print(message)
+        for value, (count, first_row) in (unmapped or {}).items():
+            report.add(question.question, value, count, first_row)
+        if isinstance(encoded, pd.DataFrame):
+            multiselect_blocks.append(encoded)
+        elif encoded is not None:
+            df[question.question] = encoded
+
+    tasks = []
+    for question in questions:
+        question_text = question.question
+        if question_text not in df.columns or question_text in multiselect_questions:
+            missing = (None, None, [f"⚠️ Pregunta no encontrada en el DataFrame: '{question_text}'"] if warn else [])
+            if parallel:
+                tasks.append((question, missing))
+            else:
+                apply(question, missing)
             continue
+        if question.type == "multiselect" and question.encoding:
+            multiselect_questions.add(question_text)
+        if parallel:
+            tasks.append((question, None))
+        elif observer is None:
+            apply(question, _encode_question(df[question_text], question, warn, backend, sparse))
+        else:
+            apply(question, *_encode_question_timed(df[question_text], question, warn, backend, sparse))
+
+    if parallel:
+        pending = [question for question, result in tasks if result is None]
+        executor_class = ProcessPoolExecutor if parallel_backend == "process" else ThreadPoolExecutor
+        with executor_class(max_workers=n_jobs) as executor:
+            results = iter(executor.map(
+                _encode_question if observer is None else _encode_question_timed,
+                [df[question.question] for question in pending],
+                pending,
+                repeat(warn),
+                repeat(backend),
+                repeat(sparse)
+            ))
+            # Los resultados se aplican en el orden de las preguntas, igual que en serie
+            for question, result in tasks:
+                if result is not None:
+                    apply(question, result)
+                elif observer is None:
+                    apply(question, next(results))
+                else:
+                    apply(question, *next(results))
+
+    if multiselect_blocks:
+        # Las columnas dummy se agregan al final en un único concat, en el orden de las preguntas
+        replaced = multiselect_questions.union(col for block in multiselect_blocks for col in block.columns)
+        df = df.drop(columns=[col for col in df.columns if col in replaced])
+        df = pd.concat([df] + multiselect_blocks, axis=1)
+
+    return df, report
+
+def _encode_question(series: pd.Series, question, warn: bool = True, backend: str = "pandas", sparse: bool = False):
+    """
+    Codifica la columna de una pregunta sin tocar el DataFrame, para poder ejecutarse en un worker.
+    Con `backend='arrow'` delega en `taller_utils.arrow_encoding`, salvo las multiselect dispersas.
 
+    Retorna:
+    -------
+    tuple
+        - La columna codificada (pd.Series), el bloque de dummies (pd.DataFrame) o None si se omite.
+        - Los valores no mapeados {valor: (cantidad, primera fila)} (solo binary/ordinal; None en otro caso).
+        - Los mensajes a imprimir, en orden.
+    """
+    if sparse and question.type == "multiselect" and question.encoding:
+        indicators = multiselect_indicators(series, question.dummy_columns, question.dummy_positions)
+        return indicators.to_frame(), None, []
+
+    if backend == "arrow":
+        from taller_utils.arrow_encoding import _encode_question_arrow
+        return _encode_question_arrow(series, question, warn)
+
+    question_text = question.question
+    encoding_type = question.type
+    encoding = question.encoding
+    messages = []
+
+    if encoding_type in ("binary", "ordinal"):
+        mapped, keys, codes = _map_unique_values(series, encoding, question.dtype)
+        return mapped, unmapped_counts(series.index, keys, codes, encoding), messages
+
+    if encoding_type in ("categorical", "multiselect"):
+        if not encoding:
+            if warn:
+                messages.append(f"⚠️  Sin encoding definido para '{question_text}', se omite.")
+            return None, None, messages
+        if encoding_type == "categorical":
+            return _map_unique_values(series, encoding, question.dtype)[0], None, messages
+        return _encode_multiselect_layout(series, question.dummy_columns, question.dummy_positions), None, messages
+
+    if warn:
+        messages.append(f"⚠️ Tipo de codificación desconocido: '{encoding_type}' en '{question_text}'")
+    return None, None, messages
+
+def _encode_question_timed(series: pd.Series, question, warn: bool = True, backend: str = "pandas", sparse: bool = False):
+    """
+    `_encode_question` con su tiempo de ejecución: retorna (resultado, segundos).
+    """
+    return timed(_encode_question, series, question, warn, backend, sparse)
+
+def _apply_unmapped_matches(original, df, encoding_dict, report, threshold, log_unmapped=True, backend="pandas"):
+    """
+    Recodifica con las coincidencias aceptadas de `suggest_matches` las preguntas que tenían
+    valores no mapeados, desde sus columnas originales. Retorna (df, reporte restante).
+    """
+    from taller_utils.matching import apply_matches, suggest_matches
+
+    matches = suggest_matches(report, encoding_dict, threshold)
+    accepted = matches[matches['accepted']]
+    if accepted.empty:
+        return df, report
+
+    affected = set(accepted['question'])
+    # Una entrada por pregunta: con preguntas repetidas en la especificación se usa la primera
+    questions = {}
+    for question in apply_matches(encoding_dict, accepted).questions:
+        if question.question in affected:
+            questions.setdefault(question.question, question)
+    encoded, remaining = _encode_frame(
+        original[list(questions)].copy(), EncodingPlan(tuple(questions.values())), warn=False, backend=backend
+    )
+    for question_text in questions:
+        df[question_text] = encoded[question_text]
+
+    if log_unmapped:
+        print(f"🔧 {len(accepted)} valor(es) no mapeado(s) corregido(s) ({int(accepted['count'].sum())} fila(s)):")
+        for row in accepted.itertuples(index=False):
+            print(f"- '{row.question}': '{row.value}' → '{row.match}' ({row.method}, {row.score:.2f})")
+
+    result = UnmappedReport()
+    for question_text, values in report.questions.items():
+        source = remaining.questions.get(question_text, {}) if question_text in affected else values
+        for value, entry in source.items():
+            result.add(question_text, value, entry['count'], entry['first_row'])
+    return df, result
+
+def _report_unmapped(report: UnmappedReport, log_unmapped: bool = True, unmapped_path: str = None) -> None:
+    """
+    Imprime el resumen de valores no mapeados y lo guarda en `unmapped_path` si hubo alguno.
+    """
+    if not report:
+        return
     if log_unmapped:
-        for question, values in unmapped_values.items():
-            unique_unmapped = set(values)
-            if unique_unmapped:
-                print(f"\nResumen no mapeado en: {question}")
-                print(f"Valores únicos no mapeados ({len(unique_unmapped)}): {unique_unmapped}")
-
-        if any(unmapped_values.values()):
-            import json
-            with open("unmapped_values.json", "w", encoding="utf-8") as f:
-                json.dump(unmapped_values, f, ensure_ascii=False, indent=2)
-            print("\n🔍 Detalles guardados en: unmapped_values.json")
-
-    return df
\ No newline at end of file
+        print(report.summary())
+    if unmapped_path:
+        report.to_json(unmapped_path)
+        if log_unmapped:
+            print(f"🔍 Detalles guardados en: {unmapped_path}")
@@ -1,6 +1,7 @@
 from datetime import datetime
+import numpy as np
 import pandas as pd
-def calculate_age(birth_date_str: str):
+def calculate_age(birth_date_str: str, reference_date=None):
     """
     Calcula la edad de una persona a partir de su fecha de nacimiento en formato 'dd/mm/yyyy'.
 
@@ -9,6 +10,9 @@ def calculate_age(birth_date_str: str):
     birth_date_str : str
         Fecha de nacimiento como string en el formato 'día/mes/año' (por ejemplo, '25/12/2000').
 
+    reference_date : date, datetime o str, opcional
+        Fecha respecto de la cual se calcula la edad. Por defecto es la fecha actual.
+
     Retorna:
     -------
     int o None
@@ -17,16 +21,67 @@ def calculate_age(birth_date_str: str):
 
     Notas:
     ------
-    - La edad se calcula con base en la fecha actual (hoy).
+    - Parsea el valor con `datetime.strptime` y calcula la edad con la misma regla entera que
+      `calculate_age_series`; para columnas completas conviene usar `calculate_age_series`.
     - Si la fecha es inválida o no cumple el formato esperado, se ignora silenciosamente devolviendo None.
     """
     try:
         birth_date = datetime.strptime(birth_date_str, '%d/%m/%Y')
-        today = datetime.now()
-        age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
-        return age
-    except:
+    except (TypeError, ValueError):
         return None
+    return int(_age(_reference_date(reference_date), birth_date.year, birth_date.month, birth_date.day))
+
+def calculate_age_series(birth_dates: pd.Series, reference_date=None) -> pd.Series:
+    """
+    Calcula la edad para una columna completa de fechas de nacimiento en formato 'dd/mm/yyyy'.
+
+    Solo se parsean los valores distintos de la columna, con un parser vectorizado de formato
+    fijo, y la edad se obtiene con aritmética entera contra una única fecha de referencia.
+    Luego el resultado se propaga a todas las filas.
+
+    Parámetros:
+    ----------
+    birth_dates : pd.Series
+        Fechas de nacimiento como texto 'día/mes/año'.
+
+    reference_date : date, datetime o str, opcional
+        Fecha respecto de la cual se calcula la edad. Por defecto es la fecha actual, tomada
+        una sola vez; conviene indicarla explícitamente para que el resultado sea reproducible.
+
+    Retorna:
+    -------
+    pd.Series
+        Edades como enteros nullable (Int64), con `pd.NA` para valores nulos, que no son texto
+        o que no cumplen el formato. Conserva el índice y el nombre de la columna original.
+    """
+    reference = _reference_date(reference_date)
+    codes, uniques = pd.factorize(birth_dates)
+
+    text = pd.Series(np.asarray(uniques, dtype=object))
+    text = text.where(text.map(type) == str)
+    parsed = pd.to_datetime(text, format='%d/%m/%Y', errors='coerce')
+
+    ages = _age(reference, parsed.dt.year, parsed.dt.month, parsed.dt.day).astype('Int64')
+
+    # La posición extra recoge el código -1 de los nulos
+    table = pd.array(list(ages) + [pd.NA], dtype='Int64')
+    return pd.Series(table.take(codes), index=birth_dates.index, name=birth_dates.name)
+
+def _reference_date(reference_date=None):
+    """
+    Fecha de referencia de `calculate_age` y `calculate_age_series`: la indicada (como
+    `pd.Timestamp`) o la actual.
+    """
+    return pd.Timestamp(reference_date) if reference_date is not None else datetime.now()
+
+def _age(reference, year, month, day):
+    """
+    Años cumplidos a la fecha `reference`: la diferencia de años, menos uno si todavía no llega
+    el cumpleaños. Sirve para un valor o para Series de año, mes y día.
+    """
+    birthday_not_reached = (reference.month * 100 + reference.day) < (month * 100 + day)
+    return reference.year - year - birthday_not_reached
+
 def resumen_na(df: pd.DataFrame) -> pd.DataFrame:
     """
     Genera un resumen con la cantidad y porcentaje de valores nulos por columna.
@@ -48,3 +103,33 @@ def resumen_na(df: pd.DataFrame) -> pd.DataFrame:
     }).sort_values(by='nulos', ascending=False)
 
     return resumen
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compara el uso de memoria por columna de dos versiones de un DataFrame (por ejemplo, la
+    encuesta cruda y la codificada con `process_survey_data`).
+
+    Parámetros:
+    - before (pd.DataFrame): DataFrame original.
+    - after (pd.DataFrame): DataFrame transformado.
+
+    Retorna:
+    - pd.DataFrame indexado por columna (primero las de `after`, luego las que solo están en `before`)
+      y una fila final 'TOTAL', con columnas:
+        - 'dtype_antes', 'bytes_antes': tipo y bytes de la columna en `before`
+        - 'dtype_despues', 'bytes_despues': tipo y bytes de la columna en `after`
+      Los bytes se miden con `memory_usage(deep=True)`, por lo que incluyen el contenido de los
+      textos; las columnas ausentes en una de las versiones cuentan 0 bytes en ella.
+    """
+    bytes_before = before.memory_usage(index=False, deep=True)
+    bytes_after = after.memory_usage(index=False, deep=True)
+    columns = list(after.columns) + [col for col in before.columns if col not in bytes_after.index]
+
+    report = pd.DataFrame({
+        'dtype_antes': before.dtypes.reindex(columns).astype(object),
+        'bytes_antes': bytes_before.reindex(columns, fill_value=0),
+        'dtype_despues': after.dtypes.reindex(columns).astype(object),
+        'bytes_despues': bytes_after.reindex(columns, fill_value=0)
+    }, index=columns)
+    report.loc['TOTAL'] = [None, int(bytes_before.sum()), None, int(bytes_after.sum())]
+    return report.astype({'bytes_antes': 'int64', 'bytes_despues': 'int64'})
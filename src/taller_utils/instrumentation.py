@@ -0,0 +1,174 @@
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+import pandas as pd
+
+@dataclass
+class StageEvent:
+    """
+    Medición de una etapa del pipeline de codificación.
+
+    Los observadores (`observer`) de `process_survey_data` y `process_survey_file` reciben un
+    evento por pregunta codificada (stage='question') y uno por etapa completa ('encode',
+    'read', 'write'). `process_survey_batch` agrega uno por archivo ('file') y marca todos con `file`.
+
+    Atributos:
+    ----------
+    stage : str
+        'question', 'encode', 'read', 'write' o 'file'.
+
+    wall_s : float
+        Tiempo de reloj en segundos.
+
+    rows : int
+        Filas procesadas.
+
+    question : str, opcional
+        Pregunta (solo en los eventos 'question').
+
+    type : str, opcional
+        Tipo de codificación de la pregunta.
+
+    distinct : int, opcional
+        Valores distintos no nulos de la columna original.
+
+    unmapped : int, opcional
+        Ocurrencias no mapeadas (binary/ordinal) o cantidad total en 'encode'.
+
+    unmapped_distinct : int, opcional
+        Valores distintos no mapeados.
+
+    memory_delta : int, opcional
+        Bytes de la salida menos bytes de la entrada (`memory_usage(deep=True)`); negativo si
+        la codificación libera memoria.
+
+    chunk : int, opcional
+        Número de bloque, en el modo por bloques de `process_survey_file`.
+
+    file : str, opcional
+        Archivo de entrada, en `process_survey_batch`.
+    """
+    stage: str
+    wall_s: float
+    rows: int
+    question: str = None
+    type: str = None
+    distinct: int = None
+    unmapped: int = None
+    unmapped_distinct: int = None
+    memory_delta: int = None
+    chunk: int = None
+    file: str = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+class EventCollector:
+    """
+    Observador que guarda los eventos en memoria, para revisarlos en un notebook.
+
+    Ejemplo:
+    --------
+    >>> collector = EventCollector()
+    >>> process_survey_data(df, encoding_dict, observer=collector)
+    >>> collector.to_frame().sort_values('wall_s', ascending=False).head()
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event: StageEvent) -> None:
+        self.events.append(event)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Eventos como tabla, una fila por evento y una columna por atributo de `StageEvent`.
+        """
+        columns = list(StageEvent.__dataclass_fields__)
+        return pd.DataFrame([event.to_dict() for event in self.events], columns=columns)
+
+class JsonLinesExporter:
+    """
+    Observador que escribe cada evento como una línea JSON, en el momento en que ocurre.
+
+    Parámetros:
+    ----------
+    path : str
+        Archivo de salida. Se agrega al final si ya existe, para acumular ejecuciones.
+
+    extra : dict, opcional
+        Campos fijos que se agregan a cada línea (por ejemplo, {'run': '2025-01-01'}).
+    """
+
+    def __init__(self, path: str, extra: dict = None):
+        self.path = path
+        self.extra = dict(extra or {})
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, event: StageEvent) -> None:
+        self._file.write(json.dumps({**self.extra, **event.to_dict()}, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class LoggingObserver:
+    """
+    Observador que emite cada evento con `logging`, como texto JSON y con los campos en `extra`
+    (para handlers que generan logs estructurados).
+
+    Parámetros:
+    ----------
+    logger : logging.Logger, opcional
+        Por defecto, el logger 'taller_utils.pipeline'.
+
+    level : int, opcional
+        Nivel de los mensajes. Por defecto es INFO.
+    """
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO):
+        self.logger = logger or logging.getLogger("taller_utils.pipeline")
+        self.level = level
+
+    def __call__(self, event: StageEvent) -> None:
+        if self.logger.isEnabledFor(self.level):
+            data = event.to_dict()
+            self.logger.log(self.level, json.dumps(data, ensure_ascii=False), extra={"stage_event": data})
+
+def question_event(series: pd.Series, question, encoded, unmapped, wall_s: float) -> StageEvent:
+    """
+    Arma el evento de una pregunta codificada. Solo se llama con un observador activo: los
+    valores distintos y la memoria se calculan aparte, fuera del tiempo medido.
+    """
+    input_bytes = int(series.memory_usage(index=False, deep=True))
+    if isinstance(encoded, pd.DataFrame):
+        output_bytes = int(encoded.memory_usage(index=False, deep=True).sum())
+    elif encoded is not None:
+        output_bytes = int(encoded.memory_usage(index=False, deep=True))
+    else:
+        output_bytes = input_bytes
+    return StageEvent(
+        stage="question",
+        wall_s=wall_s,
+        rows=len(series),
+        question=question.question,
+        type=question.type,
+        distinct=int(series.nunique()),
+        unmapped=sum(count for count, _ in unmapped.values()) if unmapped is not None else None,
+        unmapped_distinct=len(unmapped) if unmapped is not None else None,
+        memory_delta=output_bytes - input_bytes
+    )
+
+def timed(function, *args):
+    """
+    Ejecuta `function(*args)` y retorna (resultado, segundos).
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
@@ -0,0 +1,211 @@
+import unicodedata
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+import yaml
+from taller_utils.plan import EncodingPlan, as_plan
+
+# Sugerencias de corrección para los valores no mapeados: casi siempre son variantes de una clave
+# del encoding con otros acentos, mayúsculas, espacios o errores de tipeo ("Si" en vez de "Sí").
+# Se trabaja sobre los valores distintos de `UnmappedReport`, nunca sobre las filas.
+
+MATCH_COLUMNS = ['question', 'value', 'count', 'first_row', 'match', 'code', 'score', 'method', 'accepted']
+
+def fold_text(value) -> str:
+    """
+    Normaliza un texto para compararlo: Unicode NFKC, sin tildes ni diacríticos, en minúsculas
+    (`casefold`) y con los espacios repetidos reducidos a uno.
+    """
+    text = unicodedata.normalize("NFKC", str(value))
+    text = "".join(char for char in unicodedata.normalize("NFD", text) if not unicodedata.combining(char))
+    return " ".join(text.casefold().split())
+
+class MatchIndex:
+    """
+    Índice de las claves del encoding de una pregunta para buscar la más parecida a un valor.
+
+    Primero busca el valor normalizado con `fold_text` (coincidencia exacta, puntaje 1). Si no
+    está, toma como candidatas las claves que comparten más n-gramas de caracteres con el valor
+    y elige la de menor distancia de edición (con transposiciones). El puntaje es
+    1 - distancia / largo del texto más largo.
+
+    Parámetros:
+    ----------
+    encoding : Mapping
+        Encoding de la pregunta {respuesta: código}.
+
+    n : int, opcional
+        Largo de los n-gramas. Por defecto, 3.
+
+    candidates : int, opcional
+        Cantidad de candidatas por n-gramas que se comparan con la distancia de edición. Por defecto, 20.
+    """
+
+    def __init__(self, encoding, n: int = 3, candidates: int = 20):
+        self.n = n
+        self.candidates = candidates
+        self.keys = [key for key in encoding if isinstance(key, str)]
+        self.codes = [encoding[key] for key in self.keys]
+        self.folded = [fold_text(key) for key in self.keys]
+        self._exact = defaultdict(list)
+        self._grams = defaultdict(list)
+        for position, folded in enumerate(self.folded):
+            self._exact[folded].append(position)
+            for gram in set(_ngrams(folded, n)):
+                self._grams[gram].append(position)
+
+    def match(self, value) -> tuple:
+        """
+        Mejor clave para `value`: (clave, código, puntaje, método), con método 'folded' o 'fuzzy'.
+
+        Si las mejores claves empatan y tienen códigos distintos, la coincidencia es ambigua y
+        se retorna la primera con método 'ambiguous'. Sin claves, retorna (None, None, 0.0, None).
+        """
+        folded = fold_text(value)
+        exact = self._exact.get(folded)
+        if exact:
+            return self._result(exact, 1.0, "folded")
+
+        shared = defaultdict(int)
+        for gram in set(_ngrams(folded, self.n)):
+            for position in self._grams.get(gram, ()):
+                shared[position] += 1
+        if shared:
+            positions = sorted(shared, key=lambda position: -shared[position])[:self.candidates]
+        else:
+            positions = range(len(self.keys))
+
+        best, best_score = [], 0.0
+        for position in positions:
+            other = self.folded[position]
+            length = max(len(folded), len(other))
+            score = 1.0 - _edit_distance(folded, other) / length if length else 1.0
+            if score > best_score:
+                best, best_score = [position], score
+            elif score == best_score and best:
+                best.append(position)
+        if not best:
+            return None, None, 0.0, None
+        return self._result(best, best_score, "fuzzy")
+
+    def _result(self, positions: list, score: float, method: str) -> tuple:
+        first = positions[0]
+        if len({_code_key(self.codes[position]) for position in positions}) > 1:
+            method = "ambiguous"
+        return self.keys[first], self.codes[first], score, method
+
+def suggest_matches(report, encoding_dict, threshold: float = 0.8) -> pd.DataFrame:
+    """
+    Propone una clave del encoding para cada valor distinto no mapeado.
+
+    Parámetros:
+    ----------
+    report : UnmappedReport
+        Reporte de `process_survey_data(..., return_report=True)` (o de `process_survey_file`).
+
+    encoding_dict : dict o EncodingPlan
+        Especificación con que se codificó.
+
+    threshold : float, opcional
+        Puntaje mínimo (entre 0 y 1) para aceptar una sugerencia. Por defecto, 0.8.
+
+    Retorna:
+    -------
+    pd.DataFrame
+        Una fila por valor, con las columnas de `UnmappedReport.to_frame` más 'match' (clave
+        sugerida), 'code', 'score', 'method' ('folded', 'fuzzy' o 'ambiguous') y 'accepted'
+        (puntaje >= `threshold` y no ambigua), ordenadas por pregunta y cantidad. Ver
+        `matches_to_patch` para convertir las aceptadas en un parche de la especificación.
+    """
+    questions = {question.question: question for question in as_plan(encoding_dict).questions}
+    rows = []
+    for question_text, values in report.questions.items():
+        question = questions.get(question_text)
+        if not values or question is None or not question.encoding:
+            continue
+        index = MatchIndex(question.encoding)
+        for value, entry in values.items():
+            match, code, score, method = index.match(value)
+            rows.append({
+                'question': question_text, 'value': value, 'count': entry['count'],
+                'first_row': entry['first_row'], 'match': match, 'code': code, 'score': round(score, 4),
+                'method': method, 'accepted': method in ("folded", "fuzzy") and score >= threshold,
+            })
+    matches = pd.DataFrame(rows, columns=MATCH_COLUMNS)
+    # Las claves y códigos conservan su tipo de la especificación (sin pasar a float por los faltantes)
+    for column in ('match', 'code'):
+        matches[column] = pd.Series([row[column] for row in rows], dtype=object)
+    # Las preguntas quedan en el orden del reporte y, dentro de cada una, los valores más frecuentes primero
+    order = matches['question'].map({question: i for i, question in enumerate(report.questions)})
+    return matches.iloc[np.lexsort((-matches['count'].to_numpy(), order.to_numpy()))].reset_index(drop=True)
+
+def matches_to_patch(matches: pd.DataFrame) -> dict:
+    """
+    Las sugerencias aceptadas como parche {pregunta: {valor: código}}, listo para agregar a cada
+    `encoding` del YAML (ver `write_patch`) o para `apply_matches`.
+    """
+    patch = {}
+    for row in matches[matches['accepted']].itertuples(index=False):
+        patch.setdefault(row.question, {})[row.value] = row.code
+    return patch
+
+def apply_matches(encoding_dict, matches) -> EncodingPlan:
+    """
+    Retorna un nuevo plan con las claves del parche agregadas al encoding de cada pregunta.
+
+    Parámetros:
+    ----------
+    encoding_dict : dict o EncodingPlan
+        Especificación original (no se modifica).
+
+    matches : pd.DataFrame o dict
+        Resultado de `suggest_matches` (solo se usan las filas aceptadas) o de `matches_to_patch`.
+    """
+    patch = matches_to_patch(matches) if isinstance(matches, pd.DataFrame) else matches
+    spec = as_plan(encoding_dict).to_encoding_dict()
+    for entry in spec['survey_responses']:
+        extra = patch.get(entry['question'])
+        if extra and entry['encoding'] is not None:
+            entry['encoding'] = {**entry['encoding'], **extra}
+    return EncodingPlan.from_dict(spec, validate=False)
+
+def write_patch(matches: pd.DataFrame, path: str) -> dict:
+    """
+    Guarda el parche de las sugerencias aceptadas en YAML, con la misma forma de cada entrada de
+    la especificación (`question` y las claves nuevas de su `encoding`), y lo retorna.
+    """
+    patch = matches_to_patch(matches)
+    entries = [{'question': question, 'encoding': values} for question, values in patch.items()]
+    with open(path, "w", encoding="utf-8") as file:
+        yaml.safe_dump(entries, file, allow_unicode=True, sort_keys=False)
+    return patch
+
+def _ngrams(text: str, n: int) -> list:
+    padded = f" {text} "
+    if len(padded) <= n:
+        return [padded]
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+def _edit_distance(a: str, b: str) -> int:
+    """
+    Distancia de edición con transposiciones de caracteres vecinos (optimal string alignment).
+    """
+    if a == b:
+        return 0
+    previous2, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            cost = char_a != char_b
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+def _code_key(code):
+    # Códigos equivalentes (1, 1.0, True) cuentan como el mismo
+    try:
+        return float(code) if not isinstance(code, str) else code
+    except (TypeError, ValueError):
+        return repr(code)
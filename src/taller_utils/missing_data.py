@@ -1,7 +1,51 @@
+from dataclasses import dataclass
 import pandas as pd
 import numpy as np
-from scipy.stats import chi2_contingency
-def test_missing_mcar(df: pd.DataFrame, alpha: float = 0.01) -> None:
+
+# Hasta 64 columnas el patrón completo cabe en un entero de 64 bits
+_MAX_PACKED_COLUMNS = 64
+
+@dataclass
+class MCARTestResult:
+    """
+    Resultado de `test_missing_mcar`.
+
+    Atributos:
+    ----------
+    statistic : float
+        Estadístico Chi² (NaN si hay menos de dos patrones).
+
+    p_value : float
+        Valor p de la prueba (NaN si hay menos de dos patrones).
+
+    dof : int
+        Grados de libertad.
+
+    expected : np.ndarray
+        Frecuencias esperadas por patrón, en el orden de `patterns`.
+
+    patterns : pd.DataFrame
+        Un patrón por fila: una columna booleana por columna del DataFrame (True = faltante)
+        y la columna 'conteo' con la cantidad de filas que lo presentan.
+
+    alpha : float
+        Nivel de significancia usado para interpretar la prueba.
+    """
+    statistic: float
+    p_value: float
+    dof: int
+    expected: np.ndarray
+    patterns: pd.DataFrame
+    alpha: float
+
+    @property
+    def reject(self) -> bool:
+        """
+        True si se rechaza la hipótesis nula de que los datos faltantes son MCAR.
+        """
+        return bool(self.p_value <= self.alpha)
+
+def test_missing_mcar(df: pd.DataFrame, alpha: float = 0.01, verbose: bool = True) -> MCARTestResult:
     """
     Evalúa si los datos faltantes en un DataFrame son MCAR (Missing Completely At Random)
     usando una prueba de chi-cuadrado sobre los patrones de valores faltantes.
@@ -12,15 +56,19 @@ def test_missing_mcar(df: pd.DataFrame, alpha: float = 0.01) -> None:
     Parámetros:
     ----------
     df : pd.DataFrame
-        DataFrame sobre el que se desea evaluar el patrón de valores faltantes.
+        DataFrame sobre el que se desea evaluar el patrón de valores faltantes. No se modifica.
 
     alpha : float, opcional
         Nivel de significancia para la prueba de hipótesis (por defecto 0.01).
 
+    verbose : bool, opcional
+        Si es True (por defecto), imprime los resultados en consola.
+
     Retorna:
     -------
-    None
-        Imprime en consola:
+    MCARTestResult
+        Estadístico Chi², valor p, grados de libertad, frecuencias esperadas y la tabla de patrones.
+        Con `verbose=True` también imprime en consola:
         - Estadístico Chi²
         - Valor p
         - Grados de libertad
@@ -29,25 +77,87 @@ def test_missing_mcar(df: pd.DataFrame, alpha: float = 0.01) -> None:
 
     Notas:
     ------
+    - Los textos vacíos ("") se consideran faltantes, igual que NaN/None.
+    - Cada patrón se representa con sus bits empaquetados (`np.packbits`) en un entero, y los patrones
+      se cuentan con un `np.unique` vectorizado. Con más de 64 columnas se usa un hash de las palabras
+      empaquetadas, verificando que no haya colisiones.
     - Si hay menos de dos patrones únicos de valores faltantes, la prueba no se puede realizar.
     - La hipótesis nula es que los datos faltantes están completamente al azar (MCAR).
     - Un valor p bajo indica que los datos no son MCAR.
     """
-    df.replace("", np.nan, inplace=True)
-    missing_patterns = df.isnull().astype(int)
-    missing_patterns['pattern'] = missing_patterns.apply(lambda row: ''.join(row.astype(str)), axis=1)
-    grouped = df.groupby(missing_patterns['pattern'])
-    observed = grouped.size()
-    if len(observed) < 2:
-        print("Not enough unique missing patterns to perform a chi-squared test.")
-        return
-    contingency_table = np.array(observed).reshape(-1, 1)
+    mask = _missing_mask(df)
+    first_rows, counts = _count_patterns(mask)
+
+    patterns = pd.DataFrame(mask[first_rows], columns=df.columns)
+    patterns['conteo'] = counts
+
+    if len(counts) < 2:
+        if verbose:
+            print("Not enough unique missing patterns to perform a chi-squared test.")
+        return MCARTestResult(np.nan, np.nan, 0, counts.astype(float), patterns, alpha)
+
+    # scipy solo se importa si hay prueba que hacer
+    from scipy.stats import chi2_contingency
+
+    contingency_table = counts.reshape(-1, 1)
     chi2, p_value, dof, expected = chi2_contingency(contingency_table, correction=False)
-    print(f"Chi2 Statistic: {chi2}")
-    print(f"P-value: {p_value}")
-    print(f"Degrees of Freedom: {dof}")
-    print(f"Expected Frequencies: {expected.flatten()}")
-    if p_value > alpha:
-        print("Result: Cannot reject the null hypothesis. The missing data is MCAR.")
-    else:
-        print("Result: Reject the null hypothesis. The missing data is not MCAR.")
+    result = MCARTestResult(float(chi2), float(p_value), int(dof), expected.flatten(), patterns, alpha)
+
+    if verbose:
+        print(f"Chi2 Statistic: {result.statistic}")
+        print(f"P-value: {result.p_value}")
+        print(f"Degrees of Freedom: {result.dof}")
+        print(f"Expected Frequencies: {result.expected}")
+        if not result.reject:
+            print("Result: Cannot reject the null hypothesis. The missing data is MCAR.")
+        else:
+            print("Result: Reject the null hypothesis. The missing data is not MCAR.")
+    return result
+
+def _missing_mask(df: pd.DataFrame) -> np.ndarray:
+    """
+    Matriz booleana filas × columnas con True donde el valor es nulo o un texto vacío.
+    """
+    mask = df.isna().to_numpy(dtype=bool)
+    for j, (_, column) in enumerate(df.items()):
+        if column.dtype == object or pd.api.types.is_string_dtype(column.dtype):
+            mask[:, j] |= column.eq("").to_numpy(dtype=bool, na_value=False)
+    return mask
+
+def _count_patterns(mask: np.ndarray):
+    """
+    Cuenta los patrones distintos (filas distintas de `mask`).
+
+    Retorna:
+    -------
+    tuple (np.ndarray, np.ndarray)
+        La primera fila donde aparece cada patrón y su cantidad de filas, con los patrones en
+        orden lexicográfico (el mismo orden que sus cadenas '0101...').
+    """
+    n_rows, n_columns = mask.shape
+    if n_rows == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    packed = np.packbits(mask, axis=1)
+    # Se rellena hasta múltiplos de 8 bytes para leer cada fila como palabras big-endian de 64 bits
+    n_words = max(1, -(-packed.shape[1] // 8))
+    padded = np.zeros((n_rows, n_words * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    words = padded.view('>u8').astype(np.uint64)
+
+    if n_columns <= _MAX_PACKED_COLUMNS:
+        _, first_rows, counts = np.unique(words[:, 0], return_index=True, return_counts=True)
+        return first_rows, counts
+
+    keys = words[:, 0].copy()
+    with np.errstate(over='ignore'):
+        for w in range(1, n_words):
+            keys = keys * np.uint64(0x9E3779B97F4A7C15) + words[:, w]
+    _, first_rows, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+    if not (words[first_rows[inverse.ravel()]] == words).all():
+        # Colisión de hash: se cuenta comparando las filas completas
+        _, first_rows, counts = np.unique(words, axis=0, return_index=True, return_counts=True)
+        return first_rows, counts
+
+    order = np.lexsort(words[first_rows].T[::-1])
+    return first_rows[order], counts[order]
@@ -0,0 +1,816 @@
+import glob
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from taller_utils.dataset import MANIFEST_NAME, with_plan_metadata
+from taller_utils.encoding import _encode_frame, _report_unmapped
+from taller_utils.instrumentation import EventCollector, StageEvent
+from taller_utils.plan import DUMMY_DTYPE, _write_atomic, as_plan
+from taller_utils.unmapped import UnmappedReport
+
+# Se incrementa cuando cambia el formato del manifiesto; un manifiesto de otra versión fuerza la reconstrucción
+_MANIFEST_VERSION = 1
+
+@dataclass
+class IncrementalRun:
+    """
+    Resultado de `process_survey_incremental`.
+
+    Atributos:
+    ----------
+    report : UnmappedReport
+        Valores no mapeados acumulados de todas las filas procesadas hasta ahora.
+
+    new_rows : int
+        Filas codificadas en esta ejecución.
+
+    total_rows : int
+        Filas codificadas en total en la salida.
+
+    rebuilt : bool
+        True si se reconstruyó la salida completa (primera ejecución, cambio de especificación
+        o archivo de entrada reescrito).
+
+    partition : str o None
+        Partición Parquet escrita en esta ejecución (None si no hubo filas nuevas o la salida es CSV).
+    """
+    report: UnmappedReport
+    new_rows: int
+    total_rows: int
+    rebuilt: bool
+    partition: str = None
+
+@dataclass
+class FileRun:
+    """
+    Resultado de un archivo en `process_survey_batch`.
+
+    Atributos:
+    ----------
+    input_path : str
+        CSV crudo.
+
+    output_path : str
+        Parquet codificado (solo existe si `status` es 'ok').
+
+    status : str
+        'ok' o 'error'.
+
+    rows : int
+        Filas codificadas.
+
+    wall_s : float
+        Segundos que tardó el archivo en su worker.
+
+    report : UnmappedReport
+        Valores no mapeados del archivo.
+
+    error : str o None
+        Tipo y mensaje de la excepción, si falló.
+
+    events : list
+        Eventos de `StageEvent` medidos en el worker (solo si se pasó un `observer`).
+    """
+    input_path: str
+    output_path: str
+    status: str
+    rows: int = 0
+    wall_s: float = 0.0
+    report: UnmappedReport = field(default_factory=UnmappedReport)
+    error: str = None
+    events: list = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            'input': self.input_path, 'output': os.path.basename(self.output_path), 'status': self.status,
+            'rows': self.rows, 'wall_s': round(self.wall_s, 4), 'unmapped': self.report.total(), 'error': self.error,
+        }
+
+@dataclass
+class BatchRun:
+    """
+    Resultado de `process_survey_batch`.
+
+    Atributos:
+    ----------
+    files : list of FileRun
+        Un resultado por archivo, en el orden de entrada.
+
+    output_dir : str
+        Directorio con las salidas por archivo y el manifiesto del dataset combinado.
+
+    report : UnmappedReport
+        Valores no mapeados de todos los archivos correctos, en el orden de entrada.
+    """
+    files: list
+    output_dir: str
+    report: UnmappedReport
+
+    @property
+    def failed(self) -> list:
+        return [run for run in self.files if run.status != "ok"]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Estado, filas, tiempo, cantidad de no mapeados y error de cada archivo.
+        """
+        return pd.DataFrame([run.to_dict() for run in self.files],
+                            columns=['input', 'output', 'status', 'rows', 'wall_s', 'unmapped', 'error'])
+
+def read_survey_frame(input_path: str, dtype: dict = None) -> pd.DataFrame:
+    """
+    Lee el CSV completo con la misma regla de tipos que `process_survey_file`: todas las columnas
+    como texto, salvo las indicadas en `dtype`.
+
+    Así el modo de archivo completo codifica igual que el modo por bloques: con la inferencia de
+    `pd.read_csv`, una columna de respuestas como '1', '2' con vacíos se lee como float y sus
+    valores ('1.0', '2.0') no coinciden con las claves del encoding.
+    """
+    column_types = _column_types(pd.read_csv(input_path, nrows=0).columns, dtype)
+    return pd.read_csv(input_path, dtype=column_types)
+
+def process_survey_file(
+    input_path: str,
+    output_path: str,
+    encoding_dict,
+    chunksize: int = 100_000,
+    dtype: dict = None,
+    log_unmapped: bool = True,
+    unmapped_path: str = None,
+    observer=None
+) -> UnmappedReport:
+    """
+    Codifica un CSV de encuesta por bloques y escribe el resultado de forma incremental.
+
+    Lee `input_path` en bloques de `chunksize` filas, codifica cada bloque con el mismo
+    `encoding_dict` que usa `process_survey_data` y lo agrega al archivo de salida, de modo
+    que la memoria máxima depende del tamaño del bloque y no del tamaño del archivo.
+
+    Parámetros:
+    ----------
+    input_path : str
+        Ruta al CSV crudo de la encuesta.
+
+    output_path : str
+        Ruta de salida. El formato se deduce de la extensión: '.parquet' o '.csv'.
+
+    encoding_dict : dict o EncodingPlan
+        Especificación de encoding (ver `process_survey_data`).
+
+    chunksize : int, opcional
+        Cantidad de filas por bloque. Por defecto es 100.000.
+
+    dtype : dict, opcional
+        Tipos explícitos para columnas que no son texto (por ejemplo {'edad': 'Int64'}).
+        El resto de las columnas se lee como texto.
+
+    log_unmapped : bool, opcional
+        Si es True, imprime el resumen de valores no mapeados de todo el archivo, igual que
+        una ejecución sobre el archivo completo.
+
+    unmapped_path : str, opcional
+        Si se indica, guarda ahí el reporte de valores no mapeados en JSON.
+
+    observer : callable, opcional
+        Recibe un `taller_utils.instrumentation.StageEvent` por etapa de cada bloque ('read',
+        'encode', 'write') y por pregunta codificada, todos con el número de bloque en `chunk`.
+
+    Retorna:
+    -------
+    UnmappedReport
+        Valores no mapeados acumulados a través de todos los bloques. Las primeras filas
+        son números de fila del archivo, porque los bloques de `read_csv` continúan el índice.
+
+    Notas:
+    ------
+    - Las columnas se leen como texto para que todos los bloques se interpreten igual: la
+      inferencia de tipos de pandas puede variar de un bloque a otro (por ejemplo, una columna
+      numérica pasa a float en los bloques que tienen vacíos).
+    - En Parquet, el esquema se fija con el primer bloque; las columnas que en ese bloque
+      vienen completamente vacías toman el tipo de los códigos del encoding o texto. La
+      especificación se guarda en los metadatos del archivo (ver `ProcessedDataset`).
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension not in (".parquet", ".csv"):
+        raise ValueError(f"Formato de salida no soportado: '{extension}' (use .parquet o .csv)")
+
+    plan = as_plan(encoding_dict)
+    column_types = _column_types(pd.read_csv(input_path, nrows=0).columns, dtype)
+
+    reader = pd.read_csv(input_path, chunksize=chunksize, dtype=column_types)
+    with _ChunkSink(output_path, plan) as sink:
+        report = _encode_stream(reader, plan, sink, observer)
+
+    _report_unmapped(report, log_unmapped=log_unmapped, unmapped_path=unmapped_path)
+
+    return report
+
+def process_survey_incremental(
+    input_path: str,
+    output_path: str,
+    encoding_dict,
+    chunksize: int = 100_000,
+    dtype: dict = None,
+    log_unmapped: bool = True,
+    unmapped_path: str = None,
+    observer=None,
+    rebuild: bool = False
+) -> IncrementalRun:
+    """
+    Codifica solo las respuestas agregadas al CSV desde la ejecución anterior.
+
+    Un manifiesto guarda el hash de la especificación de encoding, hasta qué byte del archivo de
+    entrada se procesó y el hash de la última fila procesada. En cada ejecución se verifica que el
+    archivo siga empezando igual (mismo encabezado y misma última fila en la misma posición) y se
+    codifican solo los bytes nuevos, por bloques, igual que `process_survey_file`. El costo depende
+    de la cantidad de respuestas nuevas y no del tamaño total de la encuesta.
+
+    La salida completa se reconstruye si no hay manifiesto, si cambió la especificación, si el
+    archivo de entrada no es una continuación del ya procesado o si falta la salida anterior.
+
+    Parámetros:
+    ----------
+    input_path : str
+        CSV crudo de la encuesta, al que se agregan respuestas al final.
+
+    output_path : str
+        Si termina en '.csv', las filas nuevas se agregan al final de ese CSV y el manifiesto se
+        guarda en '<output_path>.manifest.json'. Si no, es un directorio donde cada ejecución
+        escribe una partición 'part-00000.parquet', 'part-00001.parquet', ... y el manifiesto
+        '_manifest.json' (se puede abrir con `open_processed_dataset`).
+
+    encoding_dict : dict o EncodingPlan
+        Especificación de encoding (ver `process_survey_data`).
+
+    chunksize, dtype, log_unmapped, observer :
+        Igual que en `process_survey_file`. El resumen de no mapeados impreso es el de las filas nuevas.
+
+    unmapped_path : str, opcional
+        Si se indica, guarda ahí el reporte acumulado de valores no mapeados en JSON.
+
+    rebuild : bool, opcional
+        Si es True, reconstruye la salida completa aunque no haya cambios en la especificación.
+
+    Retorna:
+    -------
+    IncrementalRun
+        Filas nuevas y totales, si hubo reconstrucción, la partición escrita y el reporte acumulado.
+
+    Notas:
+    ------
+    - Solo se procesan filas completas (hasta el último salto de línea), así que una fila que se
+      está escribiendo al momento de leer se toma en la ejecución siguiente. Se asume que el
+      archivo no termina a la mitad de un campo entre comillas con saltos de línea.
+    - El manifiesto se escribe al final y de forma atómica: si una ejecución falla, la siguiente
+      descarta la partición incompleta (o recorta el CSV) y repite las mismas filas.
+    """
+    plan = as_plan(encoding_dict)
+    spec_hash = _plan_fingerprint(plan)
+    csv_output = output_path.lower().endswith(".csv")
+    manifest_path = f"{output_path}.manifest.json" if csv_output else os.path.join(output_path, MANIFEST_NAME)
+
+    with open(input_path, "rb") as raw:
+        header = raw.readline()
+        size = os.fstat(raw.fileno()).st_size
+        manifest = None if rebuild else _read_manifest(manifest_path)
+        if manifest is not None and not _is_continuation(manifest, raw, header, size, spec_hash, output_path):
+            manifest = None
+
+        rebuilt = manifest is None
+        if rebuilt:
+            _clear_output(output_path, csv_output, manifest_path)
+            manifest = {'rows': 0, 'input_offset': len(header), 'partitions': [], 'unmapped': {}}
+            if not csv_output:
+                os.makedirs(output_path, exist_ok=True)
+        elif csv_output:
+            # Descarta filas agregadas por una ejecución que falló antes de actualizar el manifiesto
+            os.truncate(output_path, manifest['output_bytes'])
+
+        start = manifest['input_offset']
+        end = _last_line_end(raw, start, size)
+        rows_done = manifest['rows']
+        report = UnmappedReport()
+        partition = None
+        new_rows = 0
+
+        if end > start:
+            column_types = _column_types(pd.read_csv(io.BytesIO(header), nrows=0).columns, dtype)
+            reader = pd.read_csv(
+                io.BufferedReader(_CsvSlice(raw, header, start, end), buffer_size=1 << 20),
+                chunksize=chunksize, dtype=column_types
+            )
+            if csv_output:
+                with _ChunkSink(output_path, plan, append=not rebuilt) as sink:
+                    report = _encode_stream(reader, plan, sink, observer, row_offset=rows_done)
+                new_rows = sink.rows
+            else:
+                name = f"part-{len(manifest['partitions']):05d}.parquet"
+                # Se escribe con un nombre oculto y se renombra al terminar, para no dejar particiones a medias
+                tmp_path = os.path.join(output_path, f".{name}")
+                with _ChunkSink(tmp_path, plan) as sink:
+                    report = _encode_stream(reader, plan, sink, observer, row_offset=rows_done)
+                new_rows = sink.rows
+                if new_rows:
+                    partition = os.path.join(output_path, name)
+                    os.replace(tmp_path, partition)
+                    manifest['partitions'].append({'file': name, 'rows': new_rows, 'first_row': rows_done})
+                elif os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        last_start = _line_start(raw, end)
+        raw.seek(last_start)
+        last_row = raw.read(end - last_start)
+
+    total = UnmappedReport(manifest['unmapped']).merge(report)
+    manifest.update({
+        'version': _MANIFEST_VERSION,
+        'spec_hash': spec_hash,
+        'header_hash': hashlib.sha256(header).hexdigest(),
+        'input_offset': end,
+        'last_row_start': last_start,
+        'last_row_hash': hashlib.sha256(last_row).hexdigest(),
+        'rows': rows_done + new_rows,
+        'unmapped': total.to_dict(),
+    })
+    if csv_output:
+        manifest['output_bytes'] = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+    _write_atomic(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    _report_unmapped(report, log_unmapped=log_unmapped)
+    if unmapped_path and total:
+        total.to_json(unmapped_path)
+
+    return IncrementalRun(total, new_rows, rows_done + new_rows, rebuilt, partition)
+
+def process_survey_batch(
+    inputs,
+    output_dir: str,
+    encoding_dict,
+    n_jobs: int = 1,
+    chunksize: int = 100_000,
+    dtype: dict = None,
+    log_unmapped: bool = True,
+    unmapped_path: str = None,
+    observer=None
+) -> BatchRun:
+    """
+    Codifica varios CSV de encuesta (por ejemplo, una ola o facultad por archivo) con la misma especificación.
+
+    Cada archivo se codifica por bloques en un proceso aparte, igual que `process_survey_file`, y
+    se escribe en `output_dir/<nombre>.parquet`. El directorio queda además como un dataset
+    particionado con todos los archivos correctos: su `_manifest.json` registra cada partición
+    con su archivo de origen, y `open_processed_dataset(output_dir)` los lee como uno solo.
+
+    Parámetros:
+    ----------
+    inputs : str o list
+        Un directorio (se toman sus '*.csv'), un patrón glob ('data/raw/ola_*.csv'), un archivo o
+        una lista de rutas. Los nombres de archivo (sin extensión) deben ser distintos.
+
+    output_dir : str
+        Directorio de salida. Se crea si no existe.
+
+    encoding_dict : dict o EncodingPlan
+        Especificación de encoding. Se compila una sola vez y se envía a los workers ya compilada.
+
+    n_jobs : int, opcional
+        Archivos que se procesan a la vez, cada uno en su proceso (-1 usa todos los núcleos). Nunca
+        hay más de `n_jobs` archivos en curso, así que la memoria máxima es del orden de
+        `n_jobs` × `chunksize` filas. Con 1 (por defecto) se procesan en serie en este proceso.
+
+    chunksize, dtype :
+        Igual que en `process_survey_file`.
+
+    log_unmapped : bool, opcional
+        Si es True, imprime una línea por archivo (estado, filas, tiempo y no mapeados) y el
+        resumen de valores no mapeados de todos los archivos.
+
+    unmapped_path : str, opcional
+        Si se indica, guarda ahí en JSON el reporte de valores no mapeados de todos los archivos
+        correctos (además del reporte de cada archivo en `output_dir`).
+
+    observer : callable, opcional
+        Recibe los mismos eventos que en `process_survey_file` y uno 'file' por archivo (tiempo,
+        filas y no mapeados), todos con el nombre del archivo en `file`. Los eventos se miden en
+        cada worker y se entregan desde este proceso cuando el archivo termina.
+
+    Retorna:
+    -------
+    BatchRun
+        Resultado por archivo (ver `BatchRun.to_frame`) y el reporte de no mapeados combinado.
+
+    Notas:
+    ------
+    - Cada salida se escribe con un nombre oculto y se renombra al terminar: un archivo que falla
+      no deja una salida a medias, y no reemplaza la de una ejecución anterior. Tampoco se incluye
+      en el dataset combinado; su error queda en el resultado y en el manifiesto.
+    - Los valores no mapeados de cada archivo se guardan en `output_dir/<nombre>.unmapped.json`
+      (si hubo alguno) y las primeras filas son números de fila de su archivo.
+    - El manifiesto se escribe al final y de forma atómica. Si un worker muere (por ejemplo, por
+      falta de memoria), los archivos que estaban en curso se reintentan uno por proceso: el que
+      lo causó queda con estado 'error' y los demás siguen con un pool nuevo.
+    - Todas las salidas tienen las columnas de la especificación: si una ola no trae una pregunta,
+      sus columnas quedan nulas (las dummies multiselect como 'UInt8'). Las demás columnas pueden
+      variar entre archivos; `ProcessedDataset` las combina completando con nulos.
+    """
+    paths = _expand_inputs(inputs)
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    repeated = sorted({name for name in names if names.count(name) > 1})
+    if repeated:
+        raise ValueError(f"Archivos de entrada con el mismo nombre: {repeated}")
+
+    plan = as_plan(encoding_dict)
+    os.makedirs(output_dir, exist_ok=True)
+    collect = observer is not None
+    tasks = [(path, os.path.join(output_dir, f"{name}.parquet"), plan, chunksize, dtype, collect)
+             for path, name in zip(paths, names)]
+    runs = {}
+
+    def finish(i, run):
+        # Los resultados y eventos de cada archivo se entregan desde este proceso, al terminar
+        runs[i] = run
+        _log_file_run(run, log_unmapped)
+        if observer is not None:
+            name = os.path.basename(run.input_path)
+            for event in run.events:
+                observer(replace(event, file=name))
+            observer(StageEvent(stage="file", wall_s=run.wall_s, rows=run.rows, unmapped=run.report.total(), file=name))
+
+    n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+    if n_jobs > 1 and len(tasks) > 1:
+        queue = list(range(len(tasks)))
+        while queue:
+            in_flight, queue, error = _run_in_pool(tasks, queue, n_jobs, finish)
+            # Si un worker murió (memoria, señal), no se sabe cuál de los archivos en curso lo
+            # causó: se reintenta cada uno en un proceso propio y solo falla el que vuelve a romperlo
+            for i in in_flight:
+                if _run_in_pool(tasks, [i], 1, finish)[0]:
+                    finish(i, _failed_file_run(tasks[i], error))
+    else:
+        for i, task in enumerate(tasks):
+            finish(i, _encode_file(*task))
+    files = [runs[i] for i in range(len(tasks))]
+
+    report = UnmappedReport()
+    partitions = []
+    rows = 0
+    for run in files:
+        if run.status != "ok":
+            continue
+        report.merge(run.report)
+        partitions.append({'file': os.path.basename(run.output_path), 'rows': run.rows, 'first_row': rows,
+                           'source': run.input_path})
+        rows += run.rows
+    manifest = {
+        'version': _MANIFEST_VERSION,
+        'spec_hash': _plan_fingerprint(plan),
+        'rows': rows,
+        'partitions': partitions,
+        'files': [run.to_dict() for run in files],
+        'unmapped': report.to_dict(),
+    }
+    _write_atomic(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    _report_unmapped(report, log_unmapped=log_unmapped, unmapped_path=unmapped_path)
+    return BatchRun(files, output_dir, report)
+
+def _run_in_pool(tasks: list, indices: list, n_jobs: int, finish) -> tuple:
+    """
+    Codifica los archivos `indices` de `tasks` en un pool de `n_jobs` procesos, enviando uno
+    nuevo solo cuando termina otro (nunca hay más de `n_jobs` en curso), y entrega cada
+    resultado a `finish(i, run)`.
+
+    Retorna (archivos en curso, archivos sin enviar, excepción) si el pool se rompe, o
+    ([], [], None) si terminaron todos.
+    """
+    queue = list(indices)
+    pending = {}
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        def submit():
+            # El índice sale de la cola solo si el envío funcionó
+            future = executor.submit(_encode_file, *tasks[queue[0]])
+            pending[future] = queue.pop(0)
+
+        try:
+            while queue and len(pending) < n_jobs:
+                submit()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        run = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as error:
+                        run = _failed_file_run(tasks[pending[future]], error)
+                    finish(pending.pop(future), run)
+                    if queue:
+                        submit()
+        except BrokenProcessPool as error:
+            return list(pending.values()), queue, error
+    return [], [], None
+
+def _failed_file_run(task: tuple, error: Exception) -> FileRun:
+    """
+    Resultado 'error' de un archivo cuyo worker no alcanzó a retornar; borra su salida temporal.
+    """
+    input_path, output_path = task[:2]
+    directory, name = os.path.split(output_path)
+    tmp_path = os.path.join(directory, f".{name}")
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    return FileRun(input_path, output_path, "error", error=f"{type(error).__name__}: {error}")
+
+def _expand_inputs(inputs) -> list:
+    """
+    Rutas de los CSV de `process_survey_batch`, en orden alfabético dentro de cada directorio o patrón.
+    """
+    if isinstance(inputs, (str, os.PathLike)):
+        inputs = [inputs]
+    paths = []
+    for item in map(str, inputs):
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.csv"))))
+        elif glob.has_magic(item):
+            paths.extend(sorted(glob.glob(item)))
+        else:
+            paths.append(item)
+    if not paths:
+        raise FileNotFoundError(f"No hay archivos CSV en {inputs}")
+    return paths
+
+def _encode_file(input_path: str, output_path: str, plan, chunksize: int, dtype: dict = None,
+                 collect: bool = False) -> FileRun:
+    """
+    Codifica un archivo de `process_survey_batch` (en su worker). Los errores se retornan en el
+    resultado, para que un archivo que falla no detenga a los demás. Con `collect`, los eventos
+    de medición se guardan en el resultado.
+    """
+    events = EventCollector() if collect else None
+    start = time.perf_counter()
+    directory, name = os.path.split(output_path)
+    tmp_path = os.path.join(directory, f".{name}")
+    try:
+        column_types = _column_types(pd.read_csv(input_path, nrows=0).columns, dtype)
+        reader = pd.read_csv(input_path, chunksize=chunksize, dtype=column_types)
+        with _ChunkSink(tmp_path, plan, complete=True) as sink:
+            report = _encode_stream(reader, plan, sink, events)
+        if sink.rows == 0:
+            raise ValueError("el archivo no tiene filas")
+        unmapped_path = os.path.join(directory, f"{os.path.splitext(name)[0]}.unmapped.json")
+        if report:
+            _write_atomic(unmapped_path, json.dumps(report.to_dict(), ensure_ascii=False, indent=2).encode("utf-8"))
+        elif os.path.exists(unmapped_path):
+            os.remove(unmapped_path)
+        os.replace(tmp_path, output_path)
+    except Exception as error:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return FileRun(input_path, output_path, "error", wall_s=time.perf_counter() - start,
+                       error=f"{type(error).__name__}: {error}", events=events.events if collect else [])
+    return FileRun(input_path, output_path, "ok", sink.rows, time.perf_counter() - start, report,
+                   events=events.events if collect else [])
+
+def _log_file_run(run: FileRun, log: bool = True) -> None:
+    if not log:
+        return
+    name = os.path.basename(run.input_path)
+    if run.status == "ok":
+        print(f"✅ {name}: {run.rows} fila(s) en {run.wall_s:.2f} s, {run.report.total()} no mapeado(s)")
+    else:
+        print(f"❌ {name}: {run.error}")
+
+def _plan_fingerprint(plan) -> str:
+    """
+    Hash del contenido de la especificación (no del archivo), igual para un dict o un plan cargado de disco.
+    """
+    content = json.dumps(plan.to_encoding_dict(), ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def _read_manifest(manifest_path: str):
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == _MANIFEST_VERSION else None
+
+def _is_continuation(manifest: dict, raw, header: bytes, size: int, spec_hash: str, output_path: str) -> bool:
+    """
+    True si la especificación no cambió, la salida anterior existe y el archivo de entrada
+    conserva el encabezado y la última fila procesada en la misma posición.
+    """
+    if manifest['spec_hash'] != spec_hash or manifest['header_hash'] != hashlib.sha256(header).hexdigest():
+        return False
+    if size < manifest['input_offset']:
+        return False
+    if output_path.lower().endswith(".csv"):
+        if not os.path.exists(output_path) or os.path.getsize(output_path) < manifest['output_bytes']:
+            return False
+    elif not all(os.path.exists(os.path.join(output_path, p['file'])) for p in manifest['partitions']):
+        return False
+    raw.seek(manifest['last_row_start'])
+    last_row = raw.read(manifest['input_offset'] - manifest['last_row_start'])
+    return hashlib.sha256(last_row).hexdigest() == manifest['last_row_hash']
+
+def _clear_output(output_path: str, csv_output: bool, manifest_path: str) -> None:
+    """
+    Elimina la salida anterior antes de reconstruir: el CSV o las particiones del directorio.
+    """
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    if csv_output:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+    elif os.path.isdir(output_path):
+        for name in os.listdir(output_path):
+            if name.endswith(".parquet"):
+                os.remove(os.path.join(output_path, name))
+
+def _last_line_end(raw, start: int, size: int, block_size: int = 1 << 16) -> int:
+    """
+    Posición siguiente al último salto de línea en [start, size), o `start` si no hay ninguno.
+    """
+    position = size
+    while position > start:
+        block_start = max(start, position - block_size)
+        raw.seek(block_start)
+        block = raw.read(position - block_start)
+        newline = block.rfind(b"\n")
+        if newline >= 0:
+            return block_start + newline + 1
+        position = block_start
+    return start
+
+def _line_start(raw, end: int, block_size: int = 1 << 16) -> int:
+    """
+    Inicio de la línea que termina en `end` (la posición siguiente al salto de línea anterior).
+    """
+    position = max(end - 1, 0)
+    while position > 0:
+        block_start = max(0, position - block_size)
+        raw.seek(block_start)
+        block = raw.read(position - block_start)
+        newline = block.rfind(b"\n")
+        if newline >= 0:
+            return block_start + newline + 1
+        position = block_start
+    return 0
+
+class _CsvSlice(io.RawIOBase):
+    """
+    Vista de solo lectura de un CSV: el encabezado seguido de los bytes [start, end) del archivo.
+    """
+
+    def __init__(self, raw, header: bytes, start: int, end: int):
+        self._raw = raw
+        self._header = header
+        self._position = start
+        self._end = end
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._header:
+            n = min(len(buffer), len(self._header))
+            buffer[:n] = self._header[:n]
+            self._header = self._header[n:]
+            return n
+        n = min(len(buffer), self._end - self._position)
+        if n <= 0:
+            return 0
+        self._raw.seek(self._position)
+        data = self._raw.read(n)
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+def _column_types(header, dtype: dict = None) -> dict:
+    """
+    Todas las columnas como texto, salvo las indicadas en `dtype` (ver `process_survey_file`).
+    """
+    column_types = {col: str for col in header}
+    column_types.update(dtype or {})
+    return column_types
+
+def _encode_stream(reader, plan, sink, observer=None, row_offset: int = 0) -> UnmappedReport:
+    """
+    Codifica los bloques de `reader` y los entrega a `sink` en orden.
+
+    `row_offset` se suma al índice de cada bloque, para que las primeras filas del reporte de
+    valores no mapeados sean números de fila del archivo aunque la lectura empiece a la mitad.
+    Retorna el reporte acumulado de todos los bloques.
+    """
+    report = UnmappedReport()
+    read_start = time.perf_counter()
+    for i, chunk in enumerate(reader):
+        if row_offset:
+            chunk.index = chunk.index + row_offset
+        if observer is None:
+            encoded, chunk_report = _encode_frame(chunk, plan, warn=(i == 0))
+        else:
+            # El tiempo de lectura del bloque es el que pasó desde el fin de la escritura anterior
+            observer(StageEvent(stage="read", wall_s=time.perf_counter() - read_start, rows=len(chunk), chunk=i))
+            start = time.perf_counter()
+            encoded, chunk_report = _encode_frame(
+                chunk, plan, warn=(i == 0), observer=lambda event: observer(replace(event, chunk=i))
+            )
+            observer(StageEvent(stage="encode", wall_s=time.perf_counter() - start, rows=len(chunk),
+                                unmapped=chunk_report.total(), chunk=i))
+            start = time.perf_counter()
+        report.merge(chunk_report)
+
+        sink.write(encoded)
+
+        if observer is not None:
+            observer(StageEvent(stage="write", wall_s=time.perf_counter() - start, rows=len(encoded), chunk=i))
+            read_start = time.perf_counter()
+    return report
+
+class _ChunkSink:
+    """
+    Escribe bloques codificados en un CSV o un Parquet, según la extensión de `output_path`.
+
+    En Parquet, el esquema se fija con el primer bloque. Con `append=True`, un CSV existente se
+    continúa sin repetir el encabezado. Con `complete=True`, las columnas del plan que no vienen
+    en los datos (preguntas ausentes del archivo) se agregan al final como nulas, con su tipo,
+    para que todas las salidas de un lote tengan las columnas de la especificación.
+    """
+
+    def __init__(self, output_path: str, plan, append: bool = False, complete: bool = False):
+        self.extension = os.path.splitext(output_path)[1].lower()
+        if self.extension not in (".parquet", ".csv"):
+            raise ValueError(f"Formato de salida no soportado: '{self.extension}' (use .parquet o .csv)")
+        self.output_path = output_path
+        self.plan = plan
+        self.append = append
+        self.complete = complete
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, encoded: pd.DataFrame) -> None:
+        if self.complete:
+            encoded = _complete_columns(encoded, self.plan)
+        if self.extension == ".csv":
+            first = self.rows == 0 and not self.append
+            encoded.to_csv(self.output_path, mode="w" if first else "a", header=first, index=False)
+        else:
+            if self._writer is None:
+                questions = {question.question: question for question in self.plan.questions}
+                schema = _resolve_schema(pa.Table.from_pandas(encoded, preserve_index=False).schema, questions)
+                self._schema = with_plan_metadata(schema, self.plan)
+                self._writer = pq.ParquetWriter(self.output_path, self._schema)
+            self._writer.write_table(pa.Table.from_pandas(encoded, schema=self._schema, preserve_index=False))
+        self.rows += len(encoded)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _complete_columns(encoded: pd.DataFrame, plan) -> pd.DataFrame:
+    """
+    Agrega como nulas las columnas de `plan.output_schema()` que faltan en `encoded`. Las dummies
+    multiselect (uint8, sin nulos) quedan como 'UInt8' nullable: la pregunta no se hizo, no es 0.
+    """
+    missing = {col: dtype for col, dtype in plan.output_schema().items() if col not in encoded.columns}
+    if not missing:
+        return encoded
+    filled = {
+        col: pd.Series(pd.NA, index=encoded.index, dtype="UInt8" if dtype == DUMMY_DTYPE else dtype)
+        for col, dtype in missing.items()
+    }
+    return pd.concat([encoded, pd.DataFrame(filled)], axis=1)
+
+def _resolve_schema(schema: pa.Schema, questions: dict) -> pa.Schema:
+    """
+    Reemplaza los campos sin tipo (columnas vacías en el primer bloque) por un tipo concreto.
+
+    Para preguntas codificadas se usa el tipo de los códigos del encoding; para el resto, texto.
+    """
+    fields = []
+    for field in schema:
+        if pa.types.is_null(field.type):
+            question = questions.get(field.name)
+            codes = list(question.encoding.values()) if question is not None and question.encoding else []
+            field_type = pa.array(codes).type if codes else pa.string()
+            field = field.with_type(pa.string() if pa.types.is_null(field_type) else field_type)
+        fields.append(field)
+    # Se conservan los metadatos de pandas para que la lectura recupere los tipos (Int8, category)
+    return pa.schema(fields, metadata=schema.metadata)
@@ -0,0 +1,313 @@
+import hashlib
+import json
+import os
+import pickle
+from dataclasses import dataclass, field
+from types import MappingProxyType
+import numpy as np
+import pandas as pd
+import yaml
+
+# Usa el parser en C de libyaml cuando PyYAML fue compilado con él
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+ENCODING_TYPES = ("binary", "ordinal", "categorical", "multiselect")
+
+# Tipos enteros nullable candidatos para los códigos binary/ordinal, del más chico al más grande
+_INTEGER_DTYPES = ("Int8", "UInt8", "Int16", "UInt16", "Int32", "UInt32", "Int64")
+
+# Tipo de las columnas dummy de las preguntas multiselect
+DUMMY_DTYPE = np.dtype(np.uint8)
+
+# Se incrementa cuando cambia la estructura de EncodingPlan, para invalidar los planes cacheados
+_PLAN_FORMAT_VERSION = 1
+
+_memory_cache = {}
+
+@dataclass(frozen=True)
+class QuestionPlan:
+    """
+    Codificación compilada de una pregunta.
+
+    Atributos:
+    ----------
+    question : str
+        Nombre exacto de la columna en el DataFrame.
+
+    type : str
+        Tipo de codificación ('binary', 'ordinal', 'categorical' o 'multiselect').
+
+    encoding : Mapping o None
+        Tabla de búsqueda de solo lectura {respuesta: código}.
+
+    dummy_columns : tuple
+        Columnas `pregunta__codigo` que genera una pregunta multiselect, en orden.
+
+    dummy_positions : Mapping
+        Posición de la columna dummy que marca cada opción multiselect.
+    """
+    question: str
+    type: str
+    encoding: MappingProxyType = None
+    dummy_columns: tuple = ()
+    dummy_positions: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+
+    @classmethod
+    def build(cls, question: str, encoding_type: str, encoding: dict = None) -> "QuestionPlan":
+        frozen = MappingProxyType(dict(encoding)) if encoding is not None else None
+        columns, positions = (), {}
+        if encoding_type == "multiselect" and encoding:
+            columns, positions = multiselect_layout(encoding, question)
+        return cls(question, encoding_type, frozen, columns, MappingProxyType(positions))
+
+    @property
+    def dtype(self):
+        """
+        Tipo de la columna codificada, derivado de la especificación (ver `output_dtype`).
+        """
+        return output_dtype(self.type, self.encoding)
+
+    def __reduce__(self):
+        # MappingProxyType no se puede serializar: se guardan los datos y se reconstruye al cargar
+        encoding = dict(self.encoding) if self.encoding is not None else None
+        return (QuestionPlan.build, (self.question, self.type, encoding))
+
+@dataclass(frozen=True)
+class EncodingPlan:
+    """
+    Especificación de encoding compilada y validada, lista para `process_survey_data`.
+
+    Atributos:
+    ----------
+    questions : tuple of QuestionPlan
+        Preguntas en el orden de la especificación.
+
+    spec_hash : str o None
+        Hash SHA-256 del contenido del archivo de especificación, si el plan se cargó desde disco.
+    """
+    questions: tuple
+    spec_hash: str = None
+
+    @classmethod
+    def from_dict(cls, encoding_dict, validate: bool = True, spec_hash: str = None) -> "EncodingPlan":
+        """
+        Compila un plan desde el diccionario de `load_yaml_encodings` o desde la lista de preguntas.
+
+        Si `validate` es True, lanza ValueError con todos los problemas encontrados en la especificación.
+        """
+        entries = encoding_dict['survey_responses'] if isinstance(encoding_dict, dict) else encoding_dict
+        if validate:
+            _validate_spec(entries)
+        questions = tuple(
+            QuestionPlan.build(entry['question'], entry['type'], entry.get('encoding', {}))
+            for entry in entries
+        )
+        return cls(questions, spec_hash)
+
+    def output_schema(self) -> dict:
+        """
+        Tipo de cada columna que genera el plan, en orden: {columna: dtype}.
+
+        Las preguntas binary/ordinal/categorical aportan su propia columna y las multiselect
+        una columna `DUMMY_DTYPE` por código. Las preguntas sin encoding o con un tipo sin
+        tipo compacto se omiten (conservan el tipo con que se leyeron).
+        """
+        schema = {}
+        for question in self.questions:
+            if question.type == "multiselect":
+                schema.update(dict.fromkeys(question.dummy_columns, DUMMY_DTYPE))
+            elif question.encoding and question.dtype is not None:
+                schema[question.question] = question.dtype
+        return schema
+
+    def to_encoding_dict(self) -> dict:
+        """
+        Devuelve la especificación en el formato de diccionario de `load_yaml_encodings`.
+        """
+        return {'survey_responses': [
+            {
+                'question': q.question,
+                'type': q.type,
+                'encoding': dict(q.encoding) if q.encoding is not None else None
+            }
+            for q in self.questions
+        ]}
+
+def as_plan(encoding) -> EncodingPlan:
+    """
+    Acepta un EncodingPlan o el diccionario clásico y devuelve un plan.
+
+    Los diccionarios se convierten sin validar, para conservar el comportamiento de
+    `process_survey_data` (advierte y omite en vez de fallar).
+    """
+    if isinstance(encoding, EncodingPlan):
+        return encoding
+    return EncodingPlan.from_dict(encoding, validate=False)
+
+def output_dtype(encoding_type: str, encoding):
+    """
+    Calcula el tipo compacto de una columna codificada a partir de los códigos de su encoding.
+
+    - 'binary'/'ordinal' con códigos enteros: el entero nullable más chico que los contiene
+      ('Int8' para los casos habituales); con códigos booleanos, 'boolean'.
+    - 'categorical', o 'binary'/'ordinal' con códigos de texto: `pd.CategoricalDtype` con los
+      códigos distintos en el orden del encoding.
+    - 'multiselect': `DUMMY_DTYPE` (uint8) para cada columna dummy.
+
+    Retorna None si no hay encoding o si los códigos mezclan tipos o son decimales; en ese caso
+    el tipo se infiere de los valores, como antes.
+    """
+    if encoding_type == "multiselect":
+        return DUMMY_DTYPE
+    if not encoding or encoding_type not in ENCODING_TYPES:
+        return None
+
+    codes = list(dict.fromkeys(encoding.values()))
+    if encoding_type in ("binary", "ordinal"):
+        if all(isinstance(code, (bool, np.bool_)) for code in codes):
+            return pd.BooleanDtype()
+        if all(isinstance(code, (int, np.integer)) and not isinstance(code, (bool, np.bool_)) for code in codes):
+            low, high = min(codes), max(codes)
+            for name in _INTEGER_DTYPES:
+                info = np.iinfo(name.lower())
+                if info.min <= low and high <= info.max:
+                    return pd.api.types.pandas_dtype(name)
+            return None
+    if len({type(code) for code in codes}) == 1 and isinstance(codes[0], (str, int, np.integer)):
+        return pd.CategoricalDtype(codes)
+    return None
+
+def multiselect_layout(encoding: dict, question_text: str):
+    """
+    Calcula las columnas dummy de una pregunta multiselect y la posición que marca cada opción.
+
+    Retorna:
+    -------
+    tuple (tuple, dict)
+        Las columnas `question_text__codigo` en orden y el diccionario {opción: posición}.
+        Si dos opciones comparten código, la última definida determina la columna.
+    """
+    position_of_column = {}
+    key_of_position = {}
+    for category_key, category_code in encoding.items():
+        position = position_of_column.setdefault(f"{question_text}__{category_code}", len(position_of_column))
+        key_of_position[position] = category_key
+    columns = tuple(position_of_column)
+    return columns, {key: position for position, key in key_of_position.items()}
+
+def load_encoding_plan(spec_path: str, cache_dir: str = None, use_cache: bool = True) -> EncodingPlan:
+    """
+    Carga y compila un archivo de especificación YAML o JSON, reutilizando compilaciones anteriores.
+
+    El plan compilado se guarda en disco con el hash del contenido del archivo como clave, de modo
+    que las ejecuciones siguientes (y las recargas del notebook) no vuelven a parsear ni validar
+    mientras el archivo no cambie. Dentro de un mismo proceso también se reutiliza en memoria.
+
+    Parámetros:
+    ----------
+    spec_path : str
+        Ruta al archivo '.yaml'/'.yml' o '.json'. El contenido puede ser la lista de preguntas
+        o un diccionario con la clave 'survey_responses'.
+
+    cache_dir : str, opcional
+        Directorio del caché. Por defecto es `$TALLER_UTILS_CACHE` o '~/.cache/taller_utils'.
+
+    use_cache : bool, opcional
+        Si es False, siempre parsea y compila el archivo sin leer ni escribir el caché.
+
+    Retorna:
+    -------
+    EncodingPlan
+        Plan validado, con `spec_hash` igual al hash SHA-256 del archivo.
+    """
+    with open(spec_path, 'rb') as file:
+        content = file.read()
+    spec_hash = hashlib.sha256(content).hexdigest()
+    cache_key = f"{spec_hash}-v{_PLAN_FORMAT_VERSION}"
+
+    if use_cache and cache_key in _memory_cache:
+        return _memory_cache[cache_key]
+
+    cache_path = os.path.join(cache_dir or _default_cache_dir(), "plans", f"{cache_key}.pkl")
+    plan = None
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as file:
+                plan = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            plan = None
+
+    if plan is None:
+        if spec_path.lower().endswith(".json"):
+            spec = json.loads(content.decode('utf-8'))
+        else:
+            spec = yaml.load(content.decode('utf-8'), Loader=YamlLoader)
+        plan = EncodingPlan.from_dict(spec, spec_hash=spec_hash)
+        if use_cache:
+            _write_atomic(cache_path, pickle.dumps(plan, protocol=pickle.HIGHEST_PROTOCOL))
+
+    if use_cache:
+        _memory_cache[cache_key] = plan
+    return plan
+
+def _default_cache_dir() -> str:
+    return os.environ.get("TALLER_UTILS_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "taller_utils"))
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """
+    Escribe en un archivo temporal y lo renombra, para que ejecuciones concurrentes nunca lean un archivo a medias.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        # El caché es opcional: si el directorio no es escribible se sigue sin él
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _validate_spec(entries) -> None:
+    """
+    Revisa la estructura de la especificación y lanza ValueError con todos los errores encontrados.
+
+    Las claves de encoding que no son texto (por ejemplo `No` o `1` sin comillas en YAML, que se
+    leen como booleano o entero) solo generan una advertencia, porque nunca coincidirán con las
+    respuestas normalizadas con `str(x).strip()`.
+    """
+    if not isinstance(entries, list):
+        raise ValueError("La especificación debe ser una lista de preguntas o un diccionario con 'survey_responses'.")
+
+    errors = []
+    seen = set()
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append(f"Entrada {i}: se esperaba un diccionario y se encontró {type(entry).__name__}.")
+            continue
+        question_text = entry.get('question')
+        if not isinstance(question_text, str):
+            errors.append(f"Entrada {i}: falta 'question' o no es texto.")
+            continue
+        if question_text in seen:
+            errors.append(f"'{question_text}': pregunta duplicada.")
+        seen.add(question_text)
+
+        if entry.get('type') not in ENCODING_TYPES:
+            errors.append(f"'{question_text}': tipo desconocido '{entry.get('type')}' (válidos: {', '.join(ENCODING_TYPES)}).")
+
+        encoding = entry.get('encoding', {})
+        if encoding is None:
+            if entry.get('type') in ("binary", "ordinal"):
+                errors.append(f"'{question_text}': las preguntas '{entry.get('type')}' requieren un encoding.")
+            continue
+        if not isinstance(encoding, dict):
+            errors.append(f"'{question_text}': 'encoding' debe ser un diccionario.")
+            continue
+
+        non_text_keys = [key for key in encoding if not isinstance(key, str)]
+        if non_text_keys:
+            print(f"⚠️  Claves de encoding que no son texto en '{question_text}': {non_text_keys}")
+
+    if errors:
+        raise ValueError("Especificación de encoding inválida:\n- " + "\n- ".join(errors))
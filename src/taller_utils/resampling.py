@@ -0,0 +1,296 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+import pandas as pd
+from taller_utils.analysis import _agrupar_preguntas, _benjamini_hochberg
+from taller_utils.cache import content_key, resolve_cache
+from taller_utils.dataset import ProcessedDataset
+
+def pruebas_permutacion(
+    df,
+    target,
+    preguntas=None,
+    n_permutaciones: int = 9999,
+    n_bootstrap: int = 9999,
+    nivel: float = 0.95,
+    semilla=None,
+    por: str = None,
+    n_jobs: int = 1,
+    tamano_lote: int = 1000,
+    cache=None
+) -> pd.DataFrame:
+    """
+    Pruebas de permutación y bootstrap para la relación de las preguntas con un target binario.
+
+    Complementa a `resumen_relaciones_con_target`, cuyos p-valores son asintóticos y poco confiables
+    en subgrupos chicos (por facultad, por cohorte). Las permutaciones del target se generan por
+    lotes como una matriz NumPy (una fila por permutación) y los estadísticos de todas las preguntas
+    se calculan para el lote completo con un único producto matricial por grupo de filas.
+
+    - Numéricas u ordinales: suma de rangos (Mann–Whitney U, bilateral), con la biserial de rangos
+      como efecto.
+    - Categóricas: χ² de independencia (sin corrección de Yates), con la V de Cramér como efecto.
+    - Multiselect (columnas `pregunta__codigo`): diferencia de proporciones por opción (bilateral),
+      con un intervalo de confianza bootstrap percentil.
+
+    Parámetros
+    ----------
+    df : pd.DataFrame o ProcessedDataset
+        DataFrame codificado con las respuestas de la encuesta. Con un `ProcessedDataset` solo se
+        leen el target, `por` y las columnas de `preguntas`.
+
+    target : str
+        Nombre de la columna objetivo binaria (0: no, 1: sí). Las filas con otro valor se ignoran.
+
+    preguntas : list of str, opcional
+        Preguntas a evaluar (columna o prefijo multiselect). Por defecto, todas las columnas
+        distintas del target y de `por`.
+
+    n_permutaciones : int, opcional
+        Cantidad de permutaciones del target. Por defecto es 9999.
+
+    n_bootstrap : int, opcional
+        Remuestreos para los intervalos de las multiselect. Con 0 no se calculan.
+
+    nivel : float, opcional
+        Nivel de confianza de los intervalos. Por defecto es 0.95.
+
+    semilla : int, opcional
+        Semilla de las permutaciones y del bootstrap. Cada lote usa una semilla derivada, así que con
+        la misma semilla y el mismo `tamano_lote` el resultado es idéntico para cualquier `n_jobs`.
+        Si es None, cada ejecución es distinta.
+
+    por : str, opcional
+        Columna para repetir las pruebas en cada subgrupo (por ejemplo, la facultad). El resultado
+        agrega esa columna al inicio y ajusta los p-valores dentro de cada subgrupo.
+
+    n_jobs : int, opcional
+        Procesos entre los que se reparten los lotes de permutaciones (-1 usa todos los núcleos).
+        Por defecto es 1.
+
+    tamano_lote : int, opcional
+        Permutaciones por lote. La matriz de un lote ocupa unos 8 × tamano_lote × filas bytes.
+
+    cache : bool o ResultCache, opcional
+        Caché del resultado, con clave según los datos de las columnas evaluadas y los parámetros
+        (salvo `n_jobs`, que no cambia el resultado). Solo se usa con una `semilla` fija. True usa
+        el caché por defecto (ver `taller_utils.cache.ResultCache`). Por defecto no se usa caché.
+
+    Retorna
+    -------
+    pd.DataFrame
+        Una fila por pregunta (y por opción en las multiselect) con las columnas 'pregunta',
+        'opcion', 'tipo', 'estadistico', 'p_permutacion', 'p_ajustado' (Benjamini–Hochberg),
+        'efecto', 'medida_efecto', 'ic_inferior', 'ic_superior' (solo multiselect), 'n_0' y 'n_1'.
+
+    Notas
+    -----
+    - El p-valor es (1 + permutaciones con estadístico al menos tan extremo) / (1 + n_permutaciones),
+      por lo que nunca es 0.
+    - Cada pregunta se permuta solo entre las filas que la respondieron; las preguntas con las
+      mismas filas respondidas comparten la matriz de permutaciones.
+    - El bootstrap remuestrea cada grupo del target por separado. Para una opción, la cantidad de
+      seleccionados en un remuestreo de n filas es binomial(n, proporción observada), así que se
+      sortea directamente así, sin materializar los índices de las filas.
+    """
+    if isinstance(df, ProcessedDataset):
+        extra = [por] if por is not None else []
+        df = df.read_questions(target, *extra, *preguntas) if preguntas is not None else df.read()
+
+    cache = resolve_cache(cache) if semilla is not None else None
+    if cache is not None:
+        clave = content_key(
+            "pruebas_permutacion", df, target, preguntas, n_permutaciones, n_bootstrap, nivel, semilla, por, tamano_lote
+        )
+        resultado = cache.get(clave)
+        if resultado is None:
+            resultado = pruebas_permutacion(
+                df, target, preguntas, n_permutaciones, n_bootstrap, nivel, semilla, por, n_jobs, tamano_lote
+            )
+            cache.put(clave, resultado)
+        return resultado.copy()
+
+    semillas = np.random.SeedSequence(semilla)
+    opciones = dict(
+        preguntas=preguntas, n_permutaciones=n_permutaciones, n_bootstrap=n_bootstrap, nivel=nivel,
+        n_jobs=(os.cpu_count() or 1) if n_jobs == -1 else n_jobs, tamano_lote=tamano_lote
+    )
+    if por is None:
+        return _pruebas(df, target, semillas=semillas, **opciones)
+
+    grupos = list(df.groupby(por, sort=True, observed=True))
+    partes = []
+    for (valor, subgrupo), semillas_grupo in zip(grupos, semillas.spawn(len(grupos))):
+        resultado = _pruebas(subgrupo.drop(columns=por), target, semillas=semillas_grupo, **opciones)
+        resultado.insert(0, por, valor)
+        partes.append(resultado)
+    return pd.concat(partes, ignore_index=True)
+
+_COLUMNAS = [
+    "pregunta", "opcion", "tipo", "estadistico", "p_permutacion", "p_ajustado", "efecto",
+    "medida_efecto", "ic_inferior", "ic_superior", "n_0", "n_1"
+]
+
+def _pruebas(df, target, preguntas, n_permutaciones, n_bootstrap, nivel, semillas, n_jobs, tamano_lote):
+    if target not in df.columns:
+        raise ValueError(f"Target '{target}' no encontrado.")
+
+    y = pd.to_numeric(df[target], errors="coerce").to_numpy(dtype=float)
+    validas = (y == 0) | (y == 1)
+    y = y[validas].astype(np.int8)
+
+    simples, multiselect = _agrupar_preguntas(df.columns.drop(target), preguntas)
+    filas = []
+    # Medidas agrupadas por filas respondidas: {máscara: {'mascara', 'columnas', 'medidas'}}. Cada
+    # medida es (tipo, columnas de la matriz del grupo, posición de su fila en el resultado)
+    bloques = {}
+
+    def agregar(mascara, columnas, medida, fila):
+        bloque = bloques.setdefault(np.packbits(mascara).tobytes(), {"mascara": mascara, "columnas": [], "medidas": []})
+        inicio = len(bloque["columnas"])
+        bloque["columnas"].extend(columnas)
+        bloque["medidas"].append((medida, slice(inicio, inicio + len(columnas)), len(filas)))
+        filas.append(fila)
+
+    for pregunta in simples:
+        serie = df[pregunta]
+        if pd.api.types.is_numeric_dtype(serie):
+            valores = serie.to_numpy(dtype=float, na_value=np.nan)[validas]
+            mascara = ~np.isnan(valores)
+            rangos = pd.Series(valores[mascara]).rank().to_numpy()
+            agregar(mascara, [rangos], "rangos", {"pregunta": pregunta, "opcion": None, "tipo": "numerica",
+                                                  "medida_efecto": "biserial de rangos"})
+        else:
+            codigos = pd.factorize(serie)[0][validas]
+            mascara = codigos >= 0
+            indicadores = np.eye(codigos.max() + 1 if mascara.any() else 0)[codigos[mascara]]
+            agregar(mascara, list(indicadores.T), "chi2", {"pregunta": pregunta, "opcion": None,
+                                                           "tipo": "categorica", "medida_efecto": "V de Cramér"})
+
+    for columnas in multiselect.values():
+        bloque = df.loc[validas, columnas]
+        mascara = bloque.notna().all(axis=1).to_numpy()
+        for col in columnas:
+            pregunta, opcion = col.rsplit("__", 1)
+            agregar(mascara, [bloque[col].to_numpy(dtype=float)[mascara]], "proporcion",
+                    {"pregunta": pregunta, "opcion": opcion, "tipo": "multiselect",
+                     "medida_efecto": "diferencia de proporciones"})
+
+    grupos = [
+        (y[bloque["mascara"]], np.column_stack(bloque["columnas"]) if bloque["columnas"]
+         else np.empty((int(bloque["mascara"].sum()), 0)), bloque["medidas"])
+        for bloque in bloques.values()
+    ]
+
+    # Estadísticos observados: la permutación identidad
+    observados = np.full(len(filas), np.nan)
+    for etiquetas, x, medidas in grupos:
+        valores = _estadisticos(etiquetas[None, :] @ x, etiquetas, x, medidas)[0]
+        observados[[posicion for _, _, posicion in medidas]] = valores
+
+    semilla_permutaciones, semilla_bootstrap = semillas.spawn(2)
+    conteos = _contar_permutaciones(grupos, observados, n_permutaciones, semilla_permutaciones, n_jobs, tamano_lote)
+    p_valores = np.where(np.isnan(observados), np.nan, (1 + conteos) / (1 + n_permutaciones))
+
+    rng_bootstrap = np.random.default_rng(semilla_bootstrap)
+    for etiquetas, x, medidas in grupos:
+        n1 = int(etiquetas.sum())
+        n0 = len(etiquetas) - n1
+        for medida, columnas, posicion in medidas:
+            fila = filas[posicion]
+            fila.update(p_permutacion=float(p_valores[posicion]), n_0=n0, n_1=n1,
+                        ic_inferior=np.nan, ic_superior=np.nan)
+            sumas = etiquetas @ x[:, columnas]
+            if not (n0 and n1):
+                fila.update(estadistico=np.nan, efecto=np.nan)
+            elif medida == "rangos":
+                # U del grupo 0, en la misma escala que `resumen_relaciones_con_target`
+                u0 = n0 * n1 - (float(sumas[0]) - n1 * (n1 + 1) / 2)
+                fila.update(estadistico=u0, efecto=1 - 2 * u0 / (n0 * n1))
+            elif medida == "chi2":
+                fila.update(estadistico=observados[posicion], efecto=float(np.sqrt(observados[posicion] / len(etiquetas))))
+            else:
+                s1, s0 = float(sumas[0]), float(x[:, columnas].sum()) - float(sumas[0])
+                diferencia = s1 / n1 - s0 / n0
+                fila.update(estadistico=diferencia, efecto=diferencia)
+                if n_bootstrap:
+                    remuestreos = (rng_bootstrap.binomial(n1, s1 / n1, n_bootstrap) / n1
+                                   - rng_bootstrap.binomial(n0, s0 / n0, n_bootstrap) / n0)
+                    alfa = (1 - nivel) / 2
+                    fila.update(ic_inferior=float(np.quantile(remuestreos, alfa)),
+                                ic_superior=float(np.quantile(remuestreos, 1 - alfa)))
+
+    resultado = pd.DataFrame(filas, columns=[col for col in _COLUMNAS if col != "p_ajustado"])
+    resultado.insert(5, "p_ajustado", _benjamini_hochberg(resultado["p_permutacion"].to_numpy(dtype=float)))
+    return resultado
+
+def _estadisticos(sumas: np.ndarray, etiquetas: np.ndarray, x: np.ndarray, medidas: list) -> np.ndarray:
+    """
+    Estadísticos de las medidas de un grupo de filas, para un lote de permutaciones.
+
+    `sumas` es la matriz (permutaciones × columnas de x) con la suma de cada columna en el grupo
+    target=1. Como una permutación conserva la cantidad de unos, los totales por columna y los
+    tamaños de los grupos son los mismos para todo el lote. Retorna una matriz
+    (permutaciones × medidas), con valores mayores cuanto más extremos (NaN si no aplica).
+    """
+    n = len(etiquetas)
+    n1 = float(etiquetas.sum())
+    n0 = n - n1
+    totales = x.sum(axis=0)
+    resultado = np.full((sumas.shape[0], len(medidas)), np.nan)
+    if n0 == 0 or n1 == 0:
+        return resultado
+
+    for j, (medida, columnas, _) in enumerate(medidas):
+        s1 = sumas[:, columnas]
+        if medida == "rangos":
+            # |U1 - n0·n1/2| = |R1 - n1(n+1)/2|
+            resultado[:, j] = np.abs(s1[:, 0] - n1 * (n + 1) / 2)
+        elif medida == "chi2":
+            presentes = totales[columnas] > 0
+            if presentes.sum() < 2:
+                continue
+            t = totales[columnas][presentes]
+            o1 = s1[:, presentes]
+            e1, e0 = t * n1 / n, t * n0 / n
+            resultado[:, j] = ((o1 - e1) ** 2 / e1 + ((t - o1) - e0) ** 2 / e0).sum(axis=1)
+        else:
+            t = totales[columnas][0]
+            resultado[:, j] = np.abs(s1[:, 0] / n1 - (t - s1[:, 0]) / n0)
+    return resultado
+
+def _contar_permutaciones(grupos, observados, n_permutaciones, semilla, n_jobs, tamano_lote):
+    """
+    Cuenta, por medida, las permutaciones con estadístico al menos tan extremo como el observado.
+
+    Las permutaciones se dividen en lotes de `tamano_lote`, cada uno con su semilla derivada, así que
+    el resultado no depende de cómo se repartan los lotes entre procesos.
+    """
+    tamanos = [min(tamano_lote, n_permutaciones - inicio) for inicio in range(0, n_permutaciones, tamano_lote)]
+    semillas = semilla.spawn(len(tamanos))
+    if n_jobs > 1 and len(tamanos) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            resultados = list(executor.map(_contar_lote, semillas, tamanos, repeat(grupos), repeat(observados)))
+    else:
+        resultados = map(_contar_lote, semillas, tamanos, repeat(grupos), repeat(observados))
+    return sum(resultados, np.zeros(len(observados)))
+
+def _contar_lote(semilla, tamano: int, grupos: list, observados: np.ndarray) -> np.ndarray:
+    """
+    Un lote de permutaciones: por cada grupo de filas, una matriz (tamano × filas) de etiquetas
+    permutadas, multiplicada una sola vez por la matriz de columnas del grupo.
+    """
+    rng = np.random.default_rng(semilla)
+    # Tolerancia para que los empates exactos con el observado cuenten pese al redondeo
+    umbral = observados - 1e-9 * np.maximum(1, np.abs(observados))
+    conteos = np.zeros(len(observados))
+    for etiquetas, x, medidas in grupos:
+        if x.shape[1] == 0:
+            continue
+        permutadas = rng.permuted(np.tile(etiquetas.astype(float), (tamano, 1)), axis=1)
+        valores = _estadisticos(permutadas @ x, etiquetas, x, medidas)
+        posiciones = [posicion for _, _, posicion in medidas]
+        # Las comparaciones con NaN son falsas: las medidas sin estadístico quedan en 0
+        conteos[posiciones] += (valores >= umbral[posiciones]).sum(axis=0)
+    return conteos
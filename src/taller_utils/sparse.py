@@ -0,0 +1,146 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from taller_utils.plan import DUMMY_DTYPE
+
+# scipy.sparse se importa dentro de las funciones: este módulo lo usa `encoding.py`, que no debe
+# cargar scipy al importarse (ver tests/test_imports.py).
+
+@dataclass
+class SparseIndicators:
+    """
+    Columnas dummy (0/1) guardadas como una matriz dispersa CSR con sus nombres de columna.
+
+    Solo ocupa memoria por cada opción marcada, no por cada celda, así que conviene para preguntas
+    multiselect con muchas opciones. `matrix` se puede pasar directamente a los modelos de
+    scikit-learn, y `to_frame` retorna las mismas columnas `pregunta__codigo` como columnas
+    dispersas de pandas, que aceptan las funciones de análisis.
+
+    Atributos:
+    ----------
+    matrix : scipy.sparse.csr_matrix
+        Matriz filas × columnas de tipo uint8.
+
+    columns : pd.Index
+        Nombre de cada columna de la matriz, en orden.
+
+    index : pd.Index
+        Etiquetas de las filas (el índice del DataFrame original).
+    """
+    matrix: object
+    columns: pd.Index
+    index: pd.Index
+
+    @property
+    def shape(self) -> tuple:
+        return self.matrix.shape
+
+    def columns_for(self, question: str) -> list:
+        """
+        Columnas `question__codigo` de una pregunta multiselect, en orden.
+        """
+        return [col for col in self.columns if col.startswith(f"{question}__")]
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Una columna como array denso.
+        """
+        return self.matrix[:, self.columns.get_loc(name)].toarray().ravel()
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame con una columna dispersa de pandas (`Sparse[uint8, 0]`) por columna.
+        """
+        return pd.DataFrame.sparse.from_spmatrix(self.matrix, index=self.index, columns=self.columns)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns=None) -> "SparseIndicators":
+        """
+        Construye la matriz a partir de columnas 0/1 de un DataFrame, densas o dispersas. Por
+        defecto usa todas las columnas `pregunta__codigo`.
+        """
+        from scipy import sparse
+
+        if columns is None:
+            columns = [col for col in df.columns if "__" in col]
+        blocks = []
+        for col in columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.SparseDtype):
+                array = values.array
+                blocks.append(sparse.csc_matrix(
+                    (array.sp_values.astype(DUMMY_DTYPE), array.sp_index.indices, [0, array.sp_index.npoints]),
+                    shape=(len(df), 1)
+                ))
+            else:
+                blocks.append(sparse.csc_matrix(values.to_numpy(dtype=DUMMY_DTYPE, na_value=0).reshape(-1, 1)))
+        matrix = sparse.hstack(blocks, format="csr", dtype=DUMMY_DTYPE) if blocks else sparse.csr_matrix((len(df), 0), dtype=DUMMY_DTYPE)
+        return cls(matrix, pd.Index(columns), df.index)
+
+    @classmethod
+    def hstack(cls, parts: list) -> "SparseIndicators":
+        """
+        Une varios bloques con las mismas filas, uno al lado del otro.
+        """
+        from scipy import sparse
+
+        matrix = sparse.hstack([part.matrix for part in parts], format="csr", dtype=DUMMY_DTYPE)
+        return cls(matrix, pd.Index([col for part in parts for col in part.columns]), parts[0].index)
+
+def multiselect_indicators(
+    series: pd.Series,
+    columns: tuple,
+    column_of_key,
+    sep: str = ', ',
+    strip: bool = False
+) -> SparseIndicators:
+    """
+    Codifica una pregunta multiselect directamente como `SparseIndicators`.
+
+    Igual que `encoding._encode_multiselect_layout`, cada valor distinto se separa una sola vez,
+    pero en vez de un bloque denso se guardan solo las posiciones marcadas de cada valor distinto;
+    la matriz CSR se arma repitiéndolas según los códigos de factorización, sin materializar
+    dummies densas ni filas por opción.
+
+    Parámetros:
+    ----------
+    series : pd.Series
+        Columna original con las respuestas separadas por `sep`.
+
+    columns : tuple
+        Nombres de las columnas de salida.
+
+    column_of_key : dict
+        Posición de la columna que marca cada opción (ver `taller_utils.plan.multiselect_layout`).
+
+    sep : str, opcional
+        Separador entre opciones. Por defecto es ', '.
+
+    strip : bool, opcional
+        Si es True, quita los espacios alrededor de cada opción antes de buscarla.
+    """
+    from scipy import sparse
+
+    codes, uniques = pd.factorize(series)
+    # Posiciones marcadas por cada valor distinto; el último grupo (vacío) es el de los nulos
+    positions = []
+    for value in uniques:
+        tokens = str(value).split(sep)
+        marked = {column_of_key.get(token.strip() if strip else token) for token in tokens}
+        marked.discard(None)
+        positions.append(sorted(marked))
+    positions.append([])
+    codes = np.where(codes == -1, len(uniques), codes)
+
+    lengths = np.array([len(p) for p in positions], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    flat = np.array([position for p in positions for position in p], dtype=np.int32)
+
+    row_lengths = lengths[codes]
+    indptr = np.concatenate([[0], np.cumsum(row_lengths)])
+    # Para cada celda marcada: inicio de las posiciones de su valor + su orden dentro de la fila
+    offsets = np.repeat(starts[codes] - indptr[:-1], row_lengths) + np.arange(indptr[-1])
+    matrix = sparse.csr_matrix(
+        (np.ones(indptr[-1], dtype=DUMMY_DTYPE), flat[offsets], indptr), shape=(len(series), len(columns))
+    )
+    return SparseIndicators(matrix, pd.Index(list(columns)), series.index)
@@ -0,0 +1,475 @@
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+
+# Agregadores por bloques para las estadísticas de `explorar_relacion_con_target`. Cada uno tiene
+# `update` (incorpora un bloque de filas) y `merge` (combina el estado parcial de otro bloque o de
+# otro worker), de modo que el resultado no depende de cómo se repartieron las filas.
+
+@dataclass
+class ContingencyCounts:
+    """
+    Conteos valor × target (0/1) de una pregunta, acumulados por bloques.
+
+    Atributos:
+    ----------
+    counts : dict
+        {valor: np.ndarray([n_0, n_1])}, en orden de aparición.
+
+    categories : list o None
+        Orden de las categorías si la columna es categórica.
+    """
+    counts: dict = field(default_factory=dict)
+    categories: list = None
+
+    def update(self, values: pd.Series, target) -> "ContingencyCounts":
+        """
+        Suma los conteos de un bloque. Se ignoran las filas con la pregunta nula o el target fuera de 0/1.
+        """
+        if self.categories is None and isinstance(values.dtype, pd.CategoricalDtype):
+            self.categories = list(values.cat.categories)
+        y, valid = _binary_target(target)
+        codes, uniques = pd.factorize(values[valid])
+        present = codes >= 0
+        table = np.bincount(codes[present] * 2 + y[valid][present], minlength=2 * len(uniques)).reshape(-1, 2)
+        for value, row in zip(uniques, table):
+            self._add(value, row)
+        return self
+
+    def merge(self, other: "ContingencyCounts") -> "ContingencyCounts":
+        """
+        Incorpora los conteos de otro agregador y retorna self.
+        """
+        if self.categories is None:
+            self.categories = other.categories
+        for value, row in other.counts.items():
+            self._add(value, row)
+        return self
+
+    def table(self) -> pd.DataFrame:
+        """
+        Tabla de contingencia valor × target (columnas 0 y 1), como `pd.crosstab`: en el orden de las
+        categorías o, si no es categórica, con los valores ordenados.
+        """
+        if self.categories is not None:
+            index = [value for value in self.categories if value in self.counts]
+        else:
+            index = _sorted(self.counts)
+        data = np.array([self.counts[value] for value in index], dtype=np.int64).reshape(-1, 2)
+        return pd.DataFrame(data, index=index, columns=[0, 1])
+
+    def _add(self, value, row) -> None:
+        value = value.item() if isinstance(value, np.generic) else value
+        current = self.counts.get(value)
+        self.counts[value] = np.asarray(row, dtype=np.int64) if current is None else current + row
+
+@dataclass
+class RankSumAccumulator:
+    """
+    Conteos de cada valor numérico por grupo del target, suficientes para Mann–Whitney U y para
+    las estadísticas descriptivas exactas (cuantiles incluidos) sin guardar las filas.
+
+    Pensado para respuestas ordinales o discretas: la memoria depende de la cantidad de valores
+    distintos. Si supera `max_values`, los conteos se descartan (`overflow`) y quien lo usa debe
+    recurrir a `QuantileSketch`.
+
+    Atributos:
+    ----------
+    counts : ContingencyCounts
+        Conteos valor × target.
+
+    max_values : int
+        Máximo de valores distintos que se guardan. Por defecto, 10.000.
+
+    overflow : bool
+        True si se superó `max_values`.
+    """
+    counts: ContingencyCounts = field(default_factory=ContingencyCounts)
+    max_values: int = 10_000
+    overflow: bool = False
+
+    def update(self, values: pd.Series, target) -> "RankSumAccumulator":
+        if not self.overflow:
+            self.counts.update(values, target)
+            self._check()
+        return self
+
+    def merge(self, other: "RankSumAccumulator") -> "RankSumAccumulator":
+        self.overflow = self.overflow or other.overflow
+        if not self.overflow:
+            self.counts.merge(other.counts)
+            self._check()
+        return self
+
+    def table(self) -> pd.DataFrame:
+        return self.counts.table()
+
+    def mann_whitney(self) -> tuple:
+        """
+        (U del grupo 0, p-valor bilateral), con rangos medios para los empates y la aproximación
+        normal con corrección por empates y por continuidad (como `scipy.stats.mannwhitneyu`
+        cuando hay empates).
+        """
+        from taller_utils.analysis import _mann_whitney_tabla
+
+        table = self.table().to_numpy()
+        if table[:, 0].sum() == 0 or table[:, 1].sum() == 0:
+            return np.nan, np.nan
+        return _mann_whitney_tabla(table)
+
+    def describe(self) -> pd.DataFrame:
+        """
+        Igual que `df.groupby(target)[pregunta].describe()`, calculado desde los conteos.
+        """
+        table = self.table()
+        values = table.index.to_numpy(dtype=float)
+        rows = {}
+        for group in (0, 1):
+            weights = table[group].to_numpy()
+            n = weights.sum()
+            if n == 0:
+                continue
+            mean = (values * weights).sum() / n
+            std = np.sqrt((weights * (values - mean) ** 2).sum() / (n - 1)) if n > 1 else np.nan
+            present = values[weights > 0]
+            quartiles = [_weighted_quantile(values, weights, q) for q in (0.25, 0.5, 0.75)]
+            rows[group] = [float(n), mean, std, present.min(), *quartiles, present.max()]
+        return _describe_frame(rows)
+
+    def box_stats(self, group: int) -> dict:
+        """
+        Estadísticas del boxplot de un grupo (formato de `Axes.bxp`), exactas y sin valores atípicos.
+        """
+        table = self.table()
+        values = table.index.to_numpy(dtype=float)
+        weights = table[group].to_numpy()
+        q1, med, q3 = (_weighted_quantile(values, weights, q) for q in (0.25, 0.5, 0.75))
+        present = values[weights > 0]
+        return _box(group, q1, med, q3, present)
+
+    def _check(self) -> None:
+        if len(self.counts.counts) > self.max_values:
+            self.overflow = True
+            self.counts = ContingencyCounts()
+
+@dataclass
+class QuantileSketch:
+    """
+    Resumen de cuantiles aproximados de tamaño acotado, combinable entre bloques (tipo KLL).
+
+    Guarda niveles de muestras: cuando un nivel supera `k` valores, se ordena y la mitad de ellos
+    (uno por medio) pasa al nivel siguiente con el doble de peso. El error en el rango de un
+    cuantil es del orden de log2(n / k) / k. Con n <= k los cuantiles son exactos. Además lleva
+    la cantidad, la media, la varianza (con el método de Chan, exactas), el mínimo y el máximo.
+
+    Atributos:
+    ----------
+    k : int
+        Valores por nivel. Por defecto, 512.
+    """
+    k: int = 512
+    levels: list = field(default_factory=list)
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = np.inf
+    max: float = -np.inf
+    _compactions: int = 0
+
+    def update(self, values) -> "QuantileSketch":
+        """
+        Incorpora valores (se ignoran los nulos).
+        """
+        values = np.asarray(pd.Series(values).to_numpy(dtype=float, na_value=np.nan), dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        m2 = ((values - values.mean()) ** 2).sum()
+        self._merge_moments(len(values), values.mean(), m2, values.min(), values.max())
+        self._push(0, values)
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Incorpora otro resumen y retorna self.
+        """
+        if other.count == 0:
+            return self
+        self._merge_moments(other.count, other.mean, other.m2, other.min, other.max)
+        for level, values in enumerate(other.levels):
+            self._push(level, values)
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """
+        Cuantil aproximado (interpolación lineal como pandas mientras no haya compactaciones).
+        """
+        if self.count == 0:
+            return np.nan
+        if len(self.levels) == 1:
+            return float(np.quantile(self.levels[0], q))
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** i) for i, level in enumerate(self.levels)])
+        return _weighted_quantile(values, weights, q)
+
+    def describe(self) -> list:
+        """
+        [count, mean, std, min, 25%, 50%, 75%, max], como `Series.describe` (cuantiles aproximados).
+        """
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        return [float(self.count), self.mean, std, self.min,
+                self.quantile(0.25), self.quantile(0.5), self.quantile(0.75), self.max]
+
+    def items(self) -> tuple:
+        """
+        (valores, pesos) de las muestras guardadas; los pesos suman `count`.
+        """
+        if not self.levels:
+            return np.empty(0), np.empty(0)
+        return (np.concatenate(self.levels),
+                np.concatenate([np.full(len(level), 2 ** i) for i, level in enumerate(self.levels)]))
+
+    def box_stats(self, group) -> dict:
+        """
+        Estadísticas del boxplot (formato de `Axes.bxp`), aproximadas y sin valores atípicos.
+        """
+        q1, med, q3 = (self.quantile(q) for q in (0.25, 0.5, 0.75))
+        values, _ = self.items()
+        return _box(group, q1, med, q3, np.concatenate([values, [self.min, self.max]]))
+
+    def _merge_moments(self, n, mean, m2, low, high) -> None:
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def _push(self, level: int, values: np.ndarray) -> None:
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+        self.levels[level] = np.concatenate([self.levels[level], values])
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) > self.k:
+                values = np.sort(values)
+                # Con cantidad impar, el último valor queda en el nivel; del resto sube uno por medio,
+                # alternando el punto de partida para no sesgar los cuantiles
+                keep = values[-1:] if len(values) % 2 else values[:0]
+                pairs = values[:len(values) - len(keep)]
+                self._compactions += 1
+                self.levels[level] = keep
+                self._push(level + 1, pairs[self._compactions % 2::2])
+            level += 1
+
+@dataclass
+class TargetAggregates:
+    """
+    Estado acumulado de una pregunta frente al target, con todo lo que necesita
+    `explorar_relacion_con_target` para sus estadísticas y gráficos.
+
+    Según el tipo de la pregunta (que se detecta en el primer bloque):
+    - 'multiselect': sumas y conteos de cada columna dummy por grupo del target.
+    - 'numerica': `RankSumAccumulator` (exacto para valores discretos) y un `QuantileSketch` por
+      grupo, que se usa para los cuantiles si hay demasiados valores distintos.
+    - 'categorica': `ContingencyCounts`.
+    Solo se consideran las filas con target 0 o 1.
+
+    Parámetros:
+    ----------
+    question : str
+        Columna o prefijo multiselect.
+
+    target : str
+        Columna objetivo binaria.
+    """
+    question: str
+    target: str
+    kind: str = None
+    columns: list = None
+    contingency: ContingencyCounts = None
+    ranks: RankSumAccumulator = None
+    sketches: dict = None
+    sums: np.ndarray = None
+    counts: np.ndarray = None
+
+    @classmethod
+    def from_batches(cls, batches, question: str, target: str) -> "TargetAggregates":
+        """
+        Acumula una secuencia de DataFrames (por ejemplo, `ProcessedDataset.iter_batches`).
+        """
+        aggregates = cls(question, target)
+        for batch in batches:
+            aggregates.update(batch)
+        return aggregates
+
+    @classmethod
+    def from_dataset(cls, dataset, question: str, target: str, batch_size: int = 65_536) -> "TargetAggregates":
+        """
+        Acumula una pregunta de un `ProcessedDataset` leyendo solo sus columnas y el target, por bloques.
+        """
+        columns = [target, *dataset.columns_for(question)]
+        return cls.from_batches(dataset.iter_batches(columns, batch_size), question, target)
+
+    def update(self, batch: pd.DataFrame) -> "TargetAggregates":
+        """
+        Incorpora un bloque de filas con el target y las columnas de la pregunta.
+        """
+        if self.kind is None:
+            self._start(batch)
+        target = batch[self.target]
+        if self.kind == "multiselect":
+            y, valid = _binary_target(target)
+            for group in (0, 1):
+                rows = batch.loc[valid & (y == group), self.columns]
+                self.sums[group] += rows.sum().to_numpy(dtype=float)
+                self.counts[group] += rows.count().to_numpy(dtype=float)
+        elif self.kind == "numerica":
+            values = batch[self.question]
+            self.ranks.update(values, target)
+            y, valid = _binary_target(target)
+            for group in (0, 1):
+                self.sketches[group].update(values[valid & (y == group)])
+        else:
+            self.contingency.update(batch[self.question], target)
+        return self
+
+    def merge(self, other: "TargetAggregates") -> "TargetAggregates":
+        """
+        Incorpora el estado de otro agregador de la misma pregunta y retorna self.
+        """
+        if other.kind is None:
+            return self
+        if self.kind is None:
+            self.kind, self.columns = other.kind, other.columns
+            self._start(None)
+        if self.kind == "multiselect":
+            self.sums += other.sums
+            self.counts += other.counts
+        elif self.kind == "numerica":
+            self.ranks.merge(other.ranks)
+            for group in (0, 1):
+                self.sketches[group].merge(other.sketches[group])
+        else:
+            self.contingency.merge(other.contingency)
+        return self
+
+    def statistics(self) -> dict:
+        """
+        Las estadísticas de `explorar_relacion_con_target` (ver `analysis._estadisticas_exploracion`),
+        más 'cajas' (estadísticas de boxplot por grupo) para las numéricas. Los cuantiles y la
+        prueba de Mann–Whitney son aproximados solo si la pregunta tiene más de
+        `RankSumAccumulator.max_values` valores distintos ('aproximado' es True).
+        """
+        from taller_utils.analysis import _mann_whitney_tabla, _prueba_categorica
+
+        if self.kind == "multiselect":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means = self.sums / self.counts
+            medios = pd.DataFrame(means.T, index=self.columns, columns=["No (0)", "Sí (1)"])
+            return {"tipo": "multiselect", "medios": medios}
+
+        if self.kind == "numerica":
+            exact = not self.ranks.overflow
+            if exact:
+                resumen = self.ranks.describe()
+                table = self.ranks.table()
+                unique_vals = table.index[table.sum(axis=1) > 0]
+                discrete = all(float(x).is_integer() for x in unique_vals) and len(unique_vals) <= 10
+                tabla = table.div(table.sum(axis=1), axis=0) * 100 if discrete else None
+                u, p = self.ranks.mann_whitney()
+                cajas = [self.ranks.box_stats(group) for group in (0, 1)]
+            else:
+                resumen = _describe_frame({group: self.sketches[group].describe() for group in (0, 1)
+                                           if self.sketches[group].count})
+                tabla = None
+                # Mann–Whitney sobre las muestras ponderadas de ambos resúmenes
+                values0, weights0 = self.sketches[0].items()
+                values1, weights1 = self.sketches[1].items()
+                codes, uniques = pd.factorize(np.concatenate([values0, values1]), sort=True)
+                groups = np.repeat([0, 1], [len(values0), len(values1)])
+                table = np.zeros((len(uniques), 2))
+                np.add.at(table, (codes, groups), np.concatenate([weights0, weights1]))
+                u, p = _mann_whitney_tabla(table)
+                cajas = [self.sketches[group].box_stats(group) for group in (0, 1)]
+            resumen.index.name = self.target
+            tabla = tabla if tabla is None else tabla.rename_axis(index=self.question, columns=self.target)
+            return {"tipo": "numerica", "resumen": resumen, "tabla": tabla, "u": float(u), "p_valor": float(p),
+                    "cajas": cajas, "aproximado": not exact}
+
+        table = self.contingency.table()
+        tabla = table.div(table.sum(axis=1), axis=0) * 100
+        return {"tipo": "categorica", "tabla": tabla.rename_axis(index=self.question, columns=self.target),
+                "prueba": _prueba_categorica(table.to_numpy())}
+
+    def _start(self, batch) -> None:
+        if self.columns is None:
+            dummies = [col for col in batch.columns if col.startswith(f"{self.question}__")]
+            if dummies:
+                self.kind, self.columns = "multiselect", dummies
+            elif self.question not in batch.columns:
+                raise ValueError(f"Pregunta '{self.question}' no encontrada.")
+            else:
+                numeric = pd.api.types.is_numeric_dtype(batch[self.question])
+                self.kind, self.columns = ("numerica" if numeric else "categorica"), [self.question]
+        if self.kind == "multiselect":
+            self.sums = np.zeros((2, len(self.columns)))
+            self.counts = np.zeros((2, len(self.columns)))
+        elif self.kind == "numerica":
+            self.ranks = RankSumAccumulator()
+            self.sketches = {0: QuantileSketch(), 1: QuantileSketch()}
+        else:
+            self.contingency = ContingencyCounts()
+
+def _binary_target(target: pd.Series) -> tuple:
+    """
+    (códigos 0/1 como int64, máscara de filas con target 0 o 1).
+    """
+    y = pd.to_numeric(target, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    valid = (y == 0) | (y == 1)
+    return np.where(valid, y, 0).astype(np.int64), valid
+
+def _weighted_quantile(values: np.ndarray, weights: np.ndarray, q: float) -> float:
+    """
+    Cuantil con interpolación lineal (como pandas) de valores con pesos enteros: equivale a repetir
+    cada valor según su peso.
+    """
+    order = np.argsort(values, kind="stable")
+    values, weights = values[order], weights[order]
+    values, weights = values[weights > 0], weights[weights > 0]
+    if len(values) == 0:
+        return np.nan
+    cumulative = np.cumsum(weights)
+    position = q * (cumulative[-1] - 1)
+    lower = np.floor(position)
+    # Valor en la posición `lower` y en la siguiente de la lista expandida
+    below = values[np.searchsorted(cumulative, lower, side="right")]
+    above = values[min(np.searchsorted(cumulative, lower + 1, side="right"), len(values) - 1)]
+    return float(below + (above - below) * (position - lower))
+
+def _box(group, q1: float, med: float, q3: float, values: np.ndarray) -> dict:
+    """
+    Estadísticas de `Axes.bxp`: bigotes en los valores más extremos dentro de 1,5 rangos intercuartiles.
+    """
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {"label": group, "med": med, "q1": q1, "q3": q3,
+            "whislo": float(inside.min()) if len(inside) else q1,
+            "whishi": float(inside.max()) if len(inside) else q3, "fliers": []}
+
+def _describe_frame(rows: dict) -> pd.DataFrame:
+    return pd.DataFrame.from_dict(
+        rows, orient="index", columns=["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+    )
+
+def _sorted(values) -> list:
+    try:
+        return sorted(values)
+    except TypeError:
+        return list(values)
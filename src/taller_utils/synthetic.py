@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import yaml
+
+# Pregunta objetivo de la encuesta sintética (binaria, igual que en la encuesta real)
+SYNTHETIC_TARGET = "¿Has tenido la idea de retirarte o cambiarte a otra carrera?"
+
+# Columna con fechas de nacimiento en formato dd/mm/aaaa, para `calculate_age_series`
+BIRTH_DATE_COLUMN = "Fecha de nacimiento"
+
+_BINARY_OPTIONS = {"Sí": 1, "No": 0}
+_ORDINAL_OPTIONS = {"Nada": 0, "Poco": 1, "Regular": 2, "Bastante": 3, "Mucho": 4}
+_CATEGORICAL_OPTIONS = {"Mañana": "M", "Tarde": "T", "Noche": "N", "Madrugada": "D", "Variable": "V"}
+_MULTISELECT_OPTIONS = {"Casa": "A", "Biblioteca": "B", "Cafetería": "C", "Sala de estudio": "D", "Transporte": "E"}
+
+# Respuestas que no están en ningún encoding, para ejercitar el reporte de valores no mapeados
+_UNMAPPED_VALUES = np.array(["Tal vez", "No sé", "N/A", "Otro"], dtype=object)
+
+def generate_survey(
+    n_rows: int,
+    seed: int = 0,
+    n_binary: int = 3,
+    n_ordinal: int = 3,
+    n_categorical: int = 2,
+    n_multiselect: int = 2,
+    unmapped_fraction: float = 0.01,
+    missing_fraction: float = 0.05
+):
+    """
+    Genera una encuesta cruda sintética y reproducible, junto con su especificación de encoding.
+
+    Las respuestas se sortean como índices sobre las opciones de cada pregunta y se convierten
+    a texto con un único `take`, así que se pueden generar millones de filas en segundos.
+
+    Parámetros:
+    ----------
+    n_rows : int
+        Cantidad de filas (respuestas).
+
+    seed : int, opcional
+        Semilla del generador. La misma semilla y parámetros producen siempre la misma encuesta.
+
+    n_binary, n_ordinal, n_categorical, n_multiselect : int, opcional
+        Cantidad de preguntas de cada tipo, además del target.
+
+    unmapped_fraction : float, opcional
+        Fracción de respuestas reemplazadas por valores fuera del encoding ('Tal vez', 'No sé', ...).
+        En las multiselect se agregan como una opción más ('Casa, Otro').
+
+    missing_fraction : float, opcional
+        Fracción de respuestas faltantes (None) en cada pregunta, incluido el target.
+
+    Retorna:
+    -------
+    tuple (pd.DataFrame, dict)
+        - La encuesta cruda, con una columna de texto por pregunta, el target (`SYNTHETIC_TARGET`)
+          y las fechas de nacimiento (`BIRTH_DATE_COLUMN`).
+        - La especificación en el formato de `load_yaml_encodings` ({'survey_responses': [...]}).
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    entries = []
+
+    def add_question(question, encoding_type, options):
+        entries.append({'question': question, 'type': encoding_type, 'encoding': dict(options)})
+        if encoding_type == "multiselect":
+            values = _multiselect_answers(rng, n_rows, list(options), unmapped_fraction)
+        else:
+            values = _single_answers(rng, n_rows, list(options), unmapped_fraction)
+        columns[question] = _with_missing(rng, values, missing_fraction)
+
+    add_question(SYNTHETIC_TARGET, "binary", _BINARY_OPTIONS)
+    for i in range(1, n_binary + 1):
+        add_question(f"Pregunta binaria {i}", "binary", _BINARY_OPTIONS)
+    for i in range(1, n_ordinal + 1):
+        add_question(f"Pregunta ordinal {i}", "ordinal", _ORDINAL_OPTIONS)
+    for i in range(1, n_categorical + 1):
+        add_question(f"Pregunta categórica {i}", "categorical", _CATEGORICAL_OPTIONS)
+    for i in range(1, n_multiselect + 1):
+        add_question(f"Pregunta multiselect {i}", "multiselect", _MULTISELECT_OPTIONS)
+
+    columns[BIRTH_DATE_COLUMN] = _with_missing(rng, _birth_dates(rng, n_rows), missing_fraction)
+    return pd.DataFrame(columns), {'survey_responses': entries}
+
+def write_synthetic_survey(csv_path: str, yaml_path: str, n_rows: int, **kwargs) -> None:
+    """
+    Guarda una encuesta de `generate_survey` en CSV y su especificación en YAML, en el mismo
+    formato que `data/raw/encuesta.csv` y `data/raw/encodings.yaml`.
+
+    Los argumentos adicionales se pasan a `generate_survey`.
+    """
+    df, encoding_dict = generate_survey(n_rows, **kwargs)
+    df.to_csv(csv_path, index=False)
+    with open(yaml_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(encoding_dict['survey_responses'], f, allow_unicode=True, sort_keys=False)
+
+def _single_answers(rng, n_rows: int, options: list, unmapped_fraction: float) -> np.ndarray:
+    """
+    Una respuesta por fila, sorteada entre las opciones (con pesos distintos) o entre los valores no mapeados.
+    """
+    weights = rng.dirichlet(np.ones(len(options)) * 2)
+    values = np.array(options, dtype=object)[rng.choice(len(options), size=n_rows, p=weights)]
+    unmapped = rng.random(n_rows) < unmapped_fraction
+    values[unmapped] = _UNMAPPED_VALUES[rng.integers(0, len(_UNMAPPED_VALUES), unmapped.sum())]
+    return values
+
+def _multiselect_answers(rng, n_rows: int, options: list, unmapped_fraction: float) -> np.ndarray:
+    """
+    Respuestas multiselect 'A, B, ...': cada fila es un subconjunto no vacío de opciones.
+
+    Los subconjuntos se representan como máscaras de bits; el texto se arma una vez por máscara
+    y se propaga a las filas.
+    """
+    n_masks = 2 ** len(options)
+    answers = np.empty(2 * n_masks, dtype=object)
+    for mask in range(n_masks):
+        chosen = [option for bit, option in enumerate(options) if mask >> bit & 1]
+        answers[mask] = ", ".join(chosen)
+        answers[n_masks + mask] = ", ".join(chosen + ["Otro"])
+    masks = rng.integers(1, n_masks, n_rows)
+    masks[rng.random(n_rows) < unmapped_fraction] += n_masks
+    return answers[masks]
+
+def _birth_dates(rng, n_rows: int) -> np.ndarray:
+    """
+    Fechas de nacimiento entre 1970 y 2008 como texto 'dd/mm/aaaa' (sin ceros a la izquierda en
+    parte de ellas, como en las respuestas reales).
+    """
+    days = pd.date_range("1970-01-01", "2008-12-31", freq="D")
+    labels = np.array(
+        [f"{d.day}/{d.month}/{d.year}" if d.day % 3 == 0 else d.strftime("%d/%m/%Y") for d in days],
+        dtype=object
+    )
+    return labels[rng.integers(0, len(days), n_rows)]
+
+def _with_missing(rng, values: np.ndarray, missing_fraction: float) -> np.ndarray:
+    values = values.copy()
+    values[rng.random(len(values)) < missing_fraction] = None
+    return values
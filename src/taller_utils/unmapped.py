@@ -0,0 +1,140 @@
+import json
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+
+@dataclass
+class UnmappedReport:
+    """
+    Resumen de los valores que no se encontraron en el encoding, por pregunta.
+
+    Cada valor distinto se registra una sola vez con su cantidad de ocurrencias y la etiqueta
+    de índice de la primera fila donde apareció, por lo que el tamaño del reporte depende de
+    la cantidad de valores distintos y no de la cantidad de filas.
+
+    Atributos:
+    ----------
+    questions : dict
+        {pregunta: {valor: {'count': int, 'first_row': etiqueta}}}, en orden de aparición.
+    """
+    questions: dict = field(default_factory=dict)
+
+    def add(self, question: str, value: str, count: int, first_row) -> None:
+        """
+        Suma `count` ocurrencias de `value`. Si el valor ya estaba, conserva su primera fila.
+        """
+        values = self.questions.setdefault(question, {})
+        entry = values.get(value)
+        if entry is None:
+            values[value] = {'count': int(count), 'first_row': _json_label(first_row)}
+        else:
+            entry['count'] += int(count)
+
+    def merge(self, other: "UnmappedReport") -> "UnmappedReport":
+        """
+        Incorpora otro reporte (por ejemplo, de un bloque posterior o de otro worker) y retorna self.
+
+        Se asume que `other` corresponde a filas posteriores: para valores repetidos se
+        mantiene la primera fila ya registrada.
+        """
+        for question, values in other.questions.items():
+            for value, entry in values.items():
+                self.add(question, value, entry['count'], entry['first_row'])
+        return self
+
+    def __bool__(self) -> bool:
+        return any(self.questions.values())
+
+    def total(self, question: str = None) -> int:
+        """
+        Cantidad total de ocurrencias no mapeadas, de una pregunta o de todas.
+        """
+        questions = [question] if question is not None else list(self.questions)
+        return sum(entry['count'] for q in questions for entry in self.questions.get(q, {}).values())
+
+    def to_dict(self) -> dict:
+        return {question: {value: dict(entry) for value, entry in values.items()}
+                for question, values in self.questions.items() if values}
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Devuelve el reporte como tabla con columnas 'question', 'value', 'count' y 'first_row'.
+        """
+        rows = [
+            {'question': question, 'value': value, 'count': entry['count'], 'first_row': entry['first_row']}
+            for question, values in self.questions.items()
+            for value, entry in values.items()
+        ]
+        return pd.DataFrame(rows, columns=['question', 'value', 'count', 'first_row'])
+
+    def to_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def summary(self) -> str:
+        """
+        Texto con el resumen por pregunta: valores distintos, ocurrencias y los valores más frecuentes.
+        """
+        lines = [f"⚠️  Valores no mapeados: {self.total()} ocurrencias en {len(self.to_dict())} pregunta(s)"]
+        for question, values in self.questions.items():
+            if not values:
+                continue
+            top = sorted(values.items(), key=lambda item: -item[1]['count'])[:5]
+            detail = ", ".join(f"'{value}' ({entry['count']})" for value, entry in top)
+            more = f" y {len(values) - len(top)} más" if len(values) > len(top) else ""
+            lines.append(f"- '{question}': {len(values)} valor(es) distinto(s): {detail}{more}")
+        return "\n".join(lines)
+
+def unmapped_counts(index: pd.Index, keys: np.ndarray, codes: np.ndarray, encoding) -> dict:
+    """
+    Cuenta los valores no mapeados de una columna a partir de su factorización.
+
+    Parámetros:
+    ----------
+    index : pd.Index
+        Índice de la columna, para reportar la etiqueta de la primera fila.
+
+    keys : np.ndarray
+        Valores únicos normalizados, en orden de primera aparición (como los entrega `pd.factorize`).
+
+    codes : np.ndarray
+        Código por fila; `len(keys)` marca los nulos.
+
+    encoding : Mapping
+        Encoding de la pregunta.
+
+    Retorna:
+    -------
+    dict
+        {valor: (cantidad, etiqueta de la primera fila)}. Valores crudos distintos que se normalizan
+        al mismo texto se suman.
+    """
+    unmapped_positions = [i for i, key in enumerate(keys) if key not in encoding]
+    if not unmapped_positions:
+        return {}
+
+    counts = np.bincount(codes, minlength=len(keys) + 1)
+    # Como factorize numera por orden de aparición, el máximo acumulado de los códigos
+    # (ignorando nulos) alcanza el valor c justo en la primera fila donde aparece c
+    running_max = np.maximum.accumulate(np.where(codes == len(keys), -1, codes))
+    first_rows = np.searchsorted(running_max, unmapped_positions, side='left')
+
+    result = {}
+    for position, first_row in zip(unmapped_positions, first_rows):
+        key = keys[position]
+        if key in result:
+            count, first = result[key]
+            result[key] = (count + int(counts[position]), min(first, int(first_row)))
+        else:
+            result[key] = (int(counts[position]), int(first_row))
+    return {key: (count, index[first]) for key, (count, first) in result.items()}
+
+def _json_label(label):
+    """
+    Convierte etiquetas de índice de NumPy a tipos nativos para que el reporte sea serializable.
+    """
+    if isinstance(label, np.generic):
+        return label.item()
+    if isinstance(label, (int, float, str)) or label is None:
+        return label
+    return str(label)
@@ -1,5 +1,10 @@
+import contextlib
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-import matplotlib.pyplot as plt
+from taller_utils.dataset import ProcessedDataset
 
 def plot_distribution(
    df: pd.DataFrame, 
@@ -8,8 +13,9 @@ def plot_distribution(
    ascending: bool = False, 
    rotation: int = 0,
    horizontal: bool = True,
-   figsize: tuple = (8, 6)
-) -> None:
+   figsize: tuple = (8, 6),
+   show: bool = True
+):
     """
     Genera un gráfico de barras para visualizar la distribución de una variable categórica u ordinal.
 
@@ -37,30 +43,159 @@ def plot_distribution(
     figsize : tuple, opcional
         Tamaño de la figura en pulgadas como (ancho, alto). Si el gráfico es vertical, se invierte automáticamente.
 
+    show : bool, opcional
+        Si es True (por defecto), muestra el gráfico con `plt.show()`. Si es False, no usa el estado
+        global de pyplot y retorna la figura sin dibujarla en pantalla.
+
     Retorna:
     -------
-    None
-        Muestra el gráfico directamente usando matplotlib.pyplot.
+    None o matplotlib.figure.Figure
+        Con `show=True`, muestra el gráfico directamente usando matplotlib.pyplot.
+        Con `show=False`, retorna la figura.
     """
     target_counts = df[variable_name].value_counts().sort_index(ascending=ascending)
     title_text = question_text if question_text else f'Distribution for {variable_name}'
 
-    plt.figure(figsize=figsize if horizontal else figsize[::-1])
+    size = figsize if horizontal else figsize[::-1]
+    if show:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=size)
+    else:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=size)
+    ax = fig.subplots()
     target_counts.plot(
         kind='barh' if horizontal else 'bar',
         color=['skyblue', 'salmon'], 
-        edgecolor='black'
+        edgecolor='black',
+        ax=ax
     )
 
-    plt.title(f'Distribución para: {title_text} ({variable_name})', fontsize=16)
+    ax.set_title(f'Distribución para: {title_text} ({variable_name})', fontsize=16)
     if horizontal:
-        plt.xlabel('Cantidad', fontsize=14)
-        plt.ylabel(f'{variable_name} Categorías', fontsize=14)
+        ax.set_xlabel('Cantidad', fontsize=14)
+        ax.set_ylabel(f'{variable_name} Categorías', fontsize=14)
     else:
-        plt.xlabel(f'{variable_name} Categorías', fontsize=14)
-        plt.ylabel('Cantidad', fontsize=14)
+        ax.set_xlabel(f'{variable_name} Categorías', fontsize=14)
+        ax.set_ylabel('Cantidad', fontsize=14)
         
-    plt.xticks(rotation=rotation)
-    plt.grid(axis='x' if horizontal else 'y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    ax.tick_params(axis='x', labelrotation=rotation)
+    ax.grid(axis='x' if horizontal else 'y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    if not show:
+        return fig
+    plt.show()
+
+def export_target_report(
+    df: pd.DataFrame,
+    target: str,
+    output_path: str,
+    questions: list = None,
+    fmt: str = "png",
+    n_jobs: int = None,
+    cache=None
+) -> list:
+    """
+    Genera y guarda los gráficos de `explorar_relacion_con_target` para muchas preguntas a la vez.
+
+    Cada pregunta se dibuja en un proceso separado con el backend Agg (sin ventanas ni estado
+    global de pyplot), enviando a cada worker solo las columnas que necesita.
+
+    Parámetros:
+    ----------
+    df : pd.DataFrame o ProcessedDataset
+        DataFrame codificado con las respuestas de la encuesta, o el archivo Parquet abierto con
+        `open_processed_dataset` (cada worker lee solo las columnas de su pregunta).
+
+    target : str
+        Nombre de la columna objetivo binaria.
+
+    output_path : str
+        Para 'png' y 'svg', directorio donde se guarda un archivo por figura
+        ('001_pregunta_1.png', ...). Para 'pdf', ruta del archivo PDF con una página por figura.
+
+    questions : list of str, opcional
+        Preguntas a graficar (columna o prefijo multiselect). Por defecto, todas las columnas
+        distintas del target, agrupando las multiselect por su prefijo.
+
+    fmt : str, opcional
+        'png', 'svg' o 'pdf'. Por defecto es 'png'.
+
+    n_jobs : int, opcional
+        Cantidad de procesos. Por defecto, todos los núcleos; con 1 se dibuja en el proceso actual.
+
+    cache : bool o ResultCache, opcional
+        Caché de las estadísticas de cada pregunta (ver `explorar_relacion_con_target`). Los workers
+        comparten la parte en disco. Por defecto no se usa caché.
+
+    Retorna:
+    -------
+    list of str
+        Rutas de los archivos generados (para 'pdf', solo el PDF).
+    """
+    if fmt not in ("png", "svg", "pdf"):
+        raise ValueError(f"Formato no soportado: '{fmt}' (use 'png', 'svg' o 'pdf')")
+
+    if questions is None:
+        questions = list(dict.fromkeys(
+            col.rsplit("__", 1)[0] if "__" in col else col for col in df.columns if col != target
+        ))
+
+    tasks = []
+    for i, question in enumerate(questions, start=1):
+        columns = [col for col in df.columns if col == question or col.startswith(f"{question}__")]
+        prefix = None if fmt == "pdf" else os.path.join(output_path, f"{i:03d}_{_slug(question)}")
+        # Con un ProcessedDataset cada worker lee sus columnas del archivo; no se envían datos
+        data = df if isinstance(df, ProcessedDataset) else df[columns + [target]]
+        tasks.append((data, question, target, prefix, fmt, cache))
+
+    if fmt != "pdf":
+        os.makedirs(output_path, exist_ok=True)
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1:
+        results = [_render_question(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_use_agg) as executor:
+            results = list(executor.map(_render_question, *zip(*tasks)))
+
+    if fmt != "pdf":
+        return [path for paths in results for path in paths]
+
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    with PdfPages(output_path) as pdf:
+        for figures in results:
+            for fig in figures:
+                pdf.savefig(fig)
+    return [output_path]
+
+def _render_question(df, question, target, prefix, fmt, cache):
+    """
+    Dibuja una pregunta en un worker. Guarda las figuras con el prefijo indicado y retorna las rutas,
+    o, para PDF, retorna las figuras para que el proceso principal las agregue al documento.
+    """
+    from taller_utils.analysis import explorar_relacion_con_target
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        figures = explorar_relacion_con_target(df, question, target, mostrar=False, cache=cache)
+    if fmt == "pdf":
+        return figures
+
+    paths = []
+    for j, fig in enumerate(figures, start=1):
+        path = f"{prefix}_{j}.{fmt}" if len(figures) > 1 else f"{prefix}.{fmt}"
+        fig.savefig(path)
+        paths.append(path)
+    return paths
+
+def _use_agg():
+    import matplotlib
+    matplotlib.use("Agg")
+
+def _slug(text: str, max_length: int = 60) -> str:
+    """
+    Convierte el texto de una pregunta en un nombre de archivo seguro.
+    """
+    slug = re.sub(r"\W+", "_", text, flags=re.UNICODE).strip("_")
+    return slug[:max_length] or "pregunta"
\ No newline at end of file
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency, fisher_exact, mannwhitneyu
+from taller_utils.analysis import matriz_asociaciones, resumen_relaciones_con_target
+
+TARGET = "¿Has tenido la idea de retirarte o cambiarte a otra carrera?"
+
+def _encuesta_codificada(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, n)
+    return pd.DataFrame({
+        TARGET: y,
+        "¿Qué tanto te gusta estudiar?": rng.integers(0, 5, n) + y,
+        "¿En qué horario prefieres estudiar?": rng.choice(["A", "B", "C"], n),
+        "¿Estudias sol(a/o) o acompañad(a/o)?": np.where(rng.random(n) < 0.9, "A", "B"),
+        "¿Qué lugar(es) utilizas para estudiar?__A": (rng.random(n) < 0.3 + 0.3 * y).astype(np.uint8),
+        "¿Qué lugar(es) utilizas para estudiar?__B": (rng.random(n) < 0.5).astype(np.uint8),
+    })
+
+def test_resumen_relaciones_matches_scipy():
+    """
+    Verifica que la evaluación en lote entregue los mismos estadísticos que aplicar cada prueba
+    de scipy por separado, pregunta por pregunta.
+    """
+    df = _encuesta_codificada()
+    resumen = resumen_relaciones_con_target(df, TARGET).set_index(["pregunta", "opcion"], drop=False)
+    g0, g1 = df[df[TARGET] == 0], df[df[TARGET] == 1]
+
+    fila = resumen.loc[("¿Qué tanto te gusta estudiar?", None)]
+    u, p = mannwhitneyu(g0["¿Qué tanto te gusta estudiar?"], g1["¿Qué tanto te gusta estudiar?"], alternative="two-sided")
+    assert fila["prueba"] == "mann-whitney"
+    assert fila["estadistico"] == pytest.approx(u)
+    assert fila["p_valor"] == pytest.approx(p)
+
+    fila = resumen.loc[("¿En qué horario prefieres estudiar?", None)]
+    chi2, p, _, _ = chi2_contingency(pd.crosstab(df["¿En qué horario prefieres estudiar?"], df[TARGET]))
+    assert fila["prueba"] == "chi2"
+    assert fila["estadistico"] == pytest.approx(chi2)
+    assert fila["p_valor"] == pytest.approx(p)
+
+    multi = resumen[resumen["tipo"] == "multiselect"]
+    assert list(multi["opcion"]) == ["A", "B"]
+    diferencia = g1["¿Qué lugar(es) utilizas para estudiar?__A"].mean() - g0["¿Qué lugar(es) utilizas para estudiar?__A"].mean()
+    assert multi.iloc[0]["efecto"] == pytest.approx(diferencia)
+    assert multi.iloc[0]["p_valor"] < 0.001
+    assert (resumen["p_ajustado"] >= resumen["p_valor"]).all()
+
+def test_resumen_relaciones_uses_fisher_for_small_2x2():
+    """
+    Verifica que una tabla 2x2 con frecuencias esperadas menores a 5 use el test exacto de Fisher.
+    """
+    df = _encuesta_codificada(n=30, seed=1)
+    resumen = resumen_relaciones_con_target(df, TARGET, preguntas=["¿Estudias sol(a/o) o acompañad(a/o)?"])
+
+    tabla = pd.crosstab(df["¿Estudias sol(a/o) o acompañad(a/o)?"], df[TARGET])
+    assert resumen.loc[0, "prueba"] == "fisher"
+    assert resumen.loc[0, "p_valor"] == pytest.approx(fisher_exact(tabla)[1])
+
+def test_explorar_sin_mostrar_retorna_figuras():
+    """
+    Verifica que con `mostrar=False` se retornen las figuras sin registrarlas en pyplot,
+    para que no queden abiertas ni bloqueen la ejecución en scripts.
+    """
+    import matplotlib.pyplot as plt
+    from taller_utils.analysis import explorar_relacion_con_target
+
+    df = _encuesta_codificada(n=60)
+    abiertas = plt.get_fignums()
+
+    ordinal = explorar_relacion_con_target(df, "¿Qué tanto te gusta estudiar?", TARGET, mostrar=False)
+    multi = explorar_relacion_con_target(df, "¿Qué lugar(es) utilizas para estudiar?", TARGET, mostrar=False)
+
+    assert len(ordinal) == 2
+    assert len(multi) == 1
+    assert plt.get_fignums() == abiertas
+
+def test_export_target_report_writes_one_file_per_figure(tmp_path):
+    """
+    Verifica que la exportación en lote guarde cada figura como archivo, con nombres seguros
+    derivados del texto de la pregunta.
+    """
+    from taller_utils.visuals import export_target_report
+
+    df = _encuesta_codificada(n=60)
+    paths = export_target_report(
+        df, TARGET, str(tmp_path),
+        questions=["¿En qué horario prefieres estudiar?", "¿Qué lugar(es) utilizas para estudiar?"],
+        fmt="svg", n_jobs=1
+    )
+
+    assert [p.split("/")[-1] for p in paths] == [
+        "001_En_qué_horario_prefieres_estudiar.svg",
+        "002_Qué_lugar_es_utilizas_para_estudiar.svg"
+    ]
+    assert all((tmp_path / p.split("/")[-1]).stat().st_size > 0 for p in paths)
+
+def _entropia(p):
+    p = p[p > 0]
+    return -(p * np.log(p)).sum()
+
+def test_matriz_asociaciones_coincide_con_tablas_por_par(capsys):
+    """
+    Verifica la matriz de asociaciones contra el cálculo por par con `pd.crosstab`.
+
+    El test asegura que:
+    - χ², p-valor, NMI y n coinciden con `chi2_contingency` (sin corrección) y con la información
+      mutua calculada a partir de la tabla de cada par, usando solo las filas respondidas por ambas.
+    - El resultado no depende del tamaño de bloque.
+    - Las preguntas sin variación quedan en NaN y las de demasiadas categorías se omiten con aviso.
+    """
+    rng = np.random.default_rng(0)
+    n = 500
+    base = rng.integers(0, 4, n)
+    df = pd.DataFrame({
+        "ordinal": pd.array(base, dtype="Int8"),
+        "categorica": pd.Categorical(np.where(rng.random(n) < 0.7, base % 2, rng.integers(0, 3, n)).astype(str)),
+        "texto": rng.choice(["x", "y"], n),
+        "constante": np.ones(n, dtype=np.uint8),
+        "lugares__A": (rng.random(n) < 0.3).astype(np.uint8),
+        "continua": rng.random(n),
+    })
+    df.loc[::7, "ordinal"] = pd.NA
+
+    resultado = matriz_asociaciones(df)
+    assert "continua" in capsys.readouterr().out
+    for medida, matriz in matriz_asociaciones(df, tamano_bloque=2).items():
+        pd.testing.assert_frame_equal(matriz, resultado[medida])
+
+    nombres = ["ordinal", "categorica", "texto", "constante", "lugares__A"]
+    assert resultado["chi2"].index.tolist() == nombres
+    assert resultado["cramer_v"].loc["constante"].isna().all()
+    for a in nombres:
+        for b in nombres:
+            tabla = pd.crosstab(df[a], df[b]).to_numpy()
+            assert resultado["n"].loc[a, b] == tabla.sum()
+            if a == "constante" or b == "constante":
+                continue
+            chi2, p_valor = chi2_contingency(tabla, correction=False)[:2]
+            conjunta = tabla / tabla.sum()
+            p_a, p_b = conjunta.sum(axis=1), conjunta.sum(axis=0)
+            informacion = _entropia(p_a) + _entropia(p_b) - _entropia(conjunta.ravel())
+            assert resultado["chi2"].loc[a, b] == pytest.approx(chi2)
+            assert resultado["p_valor"].loc[a, b] == pytest.approx(p_valor)
+            assert resultado["nmi"].loc[a, b] == pytest.approx(informacion / ((_entropia(p_a) + _entropia(p_b)) / 2))
+            assert resultado["cramer_v"].loc[a, b] == pytest.approx(np.sqrt(chi2 / (tabla.sum() * (min(tabla.shape) - 1))))
@@ -0,0 +1,119 @@
+import pandas as pd
+import pyarrow as pa
+from taller_utils.arrow_encoding import encode_table, process_survey_arrow
+from taller_utils.encoding import process_survey_data
+from taller_utils.pipeline import read_survey_frame
+from taller_utils.synthetic import generate_survey
+
+def test_arrow_backend_matches_pandas_backend(tmp_path):
+    """
+    Verifica que el backend 'arrow' produzca exactamente lo mismo que el backend 'pandas'.
+
+    El test asegura que:
+    - Con `process_survey_data(backend='arrow')` el DataFrame (valores, tipos, índice y orden de
+      columnas) y el reporte de no mapeados son idénticos, también con un índice no estándar y
+      respuestas con espacios alrededor.
+    - Leyendo el CSV con `pyarrow.csv`, `process_survey_arrow(..., to_pandas=True)` coincide con
+      `read_survey_frame` seguido de `process_survey_data`, incluidos los textos que se leen como nulos.
+    """
+    df, spec = generate_survey(3_000, seed=4, unmapped_fraction=0.05)
+    df.index = df.index * 3
+    df.iloc[0, 1] = "  Sí "
+    df.iloc[1, 2] = " No sé"
+
+    expected, expected_report = process_survey_data(df, spec, log_unmapped=False, return_report=True)
+    result, report = process_survey_data(df, spec, log_unmapped=False, return_report=True, backend="arrow")
+    pd.testing.assert_frame_equal(result, expected)
+    assert report.to_dict() == expected_report.to_dict()
+
+    csv_path = tmp_path / "encuesta.csv"
+    df.to_csv(csv_path, index=False)
+    expected, expected_report = process_survey_data(
+        read_survey_frame(str(csv_path)), spec, log_unmapped=False, return_report=True
+    )
+    result, report = process_survey_arrow(str(csv_path), spec, log_unmapped=False, return_report=True, to_pandas=True)
+    pd.testing.assert_frame_equal(result, expected)
+    assert report.to_dict() == expected_report.to_dict()
+
+def test_arrow_backend_matches_pandas_backend_on_numeric_answers(tmp_path):
+    """
+    Verifica que ambos backends lean igual las respuestas que parecen números.
+
+    El test asegura que:
+    - Con claves numéricas ('1', '2') y respuestas vacías, `process_survey_arrow` y
+      `process_survey_data(read_survey_frame(...))` dan el mismo DataFrame y el mismo reporte.
+    - Las demás columnas también se leen como texto en ambos backends.
+    """
+    csv_path = tmp_path / "encuesta.csv"
+    csv_path.write_text("q,d\n1,x\n2,y\n,z\n3,4\n", encoding="utf-8")
+    spec = {"survey_responses": [{"question": "q", "type": "ordinal", "encoding": {"1": 1, "2": 2}}]}
+
+    expected, expected_report = process_survey_data(
+        read_survey_frame(str(csv_path)), spec, log_unmapped=False, return_report=True
+    )
+    result, report = process_survey_arrow(str(csv_path), spec, log_unmapped=False, return_report=True, to_pandas=True)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert result["q"].tolist() == [1, 2, pd.NA, pd.NA]
+    assert report.to_dict() == expected_report.to_dict() == {"q": {"3": {"count": 1, "first_row": 3}}}
+
+def test_encode_table_stays_in_arrow():
+    """
+    Verifica que `encode_table` trabaje sobre la tabla Arrow y conserve el orden de columnas.
+
+    El test asegura que:
+    - Las columnas codificadas tienen los tipos Arrow compactos (int8, diccionario, uint8).
+    - Las dummies multiselect reemplazan a la pregunta y se agregan al final.
+    - Los valores no mapeados se reportan con su posición como primera fila.
+    """
+    table = pa.table({
+        "id": [1, 2, 3],
+        "binaria": ["Sí", "Tal vez", None],
+        "turno": ["Mañana", "Noche", "Mañana"],
+        "lugares": ["Casa, Biblioteca", None, "Casa"],
+    })
+    spec = {"survey_responses": [
+        {"question": "binaria", "type": "binary", "encoding": {"Sí": 1, "No": 0}},
+        {"question": "turno", "type": "categorical", "encoding": {"Mañana": "M", "Noche": "N"}},
+        {"question": "lugares", "type": "multiselect", "encoding": {"Casa": "A", "Biblioteca": "B"}},
+    ]}
+
+    encoded, report = encode_table(table, spec)
+
+    assert encoded.column_names == ["id", "binaria", "turno", "lugares__A", "lugares__B"]
+    assert encoded.schema.field("binaria").type == pa.int8()
+    assert encoded.column("binaria").to_pylist() == [1, None, None]
+    assert pa.types.is_dictionary(encoded.schema.field("turno").type)
+    assert encoded.column("turno").to_pylist() == ["M", "N", "M"]
+    assert encoded.column("lugares__A").to_pylist() == [1, 0, 1]
+    assert encoded.column("lugares__B").type == pa.uint8()
+    assert report.to_dict() == {"binaria": {"Tal vez": {"count": 1, "first_row": 1}}}
+
+def test_encode_table_reports_first_row_of_each_unmapped_value():
+    """
+    Verifica la primera fila de los valores no mapeados en una tabla con varios bloques.
+
+    El test asegura que:
+    - Cada valor no mapeado se reporta con su cantidad y la posición de su primera aparición,
+      aunque aparezca recién en un bloque posterior o después de filas nulas.
+    - Los valores crudos que solo difieren en espacios se suman, con la primera fila de ambos.
+    - El reporte coincide con el del backend 'pandas'.
+    """
+    values = [None, "Sí", "Tal vez ", "No", "A veces", None, "Tal vez", "Nunca", "A veces", "Sí"]
+    table = pa.Table.from_batches([
+        pa.record_batch({"binaria": pa.array(values[:4], type=pa.string())}),
+        pa.record_batch({"binaria": pa.array(values[4:], type=pa.string())}),
+    ])
+    spec = {"survey_responses": [{"question": "binaria", "type": "binary", "encoding": {"Sí": 1, "No": 0}}]}
+
+    _, report = encode_table(table, spec)
+
+    assert report.to_dict() == {"binaria": {
+        "Tal vez": {"count": 2, "first_row": 2},
+        "A veces": {"count": 2, "first_row": 4},
+        "Nunca": {"count": 1, "first_row": 7},
+    }}
+    _, expected = process_survey_data(
+        pd.DataFrame({"binaria": values}), spec, log_unmapped=False, return_report=True
+    )
+    assert report.to_dict() == expected.to_dict()
@@ -0,0 +1,75 @@
+import pickle
+import numpy as np
+import pandas as pd
+from taller_utils.analysis import resumen_relaciones_con_target
+from taller_utils.cache import ResultCache, content_key
+
+TARGET = "¿Has tenido la idea de retirarte o cambiarte a otra carrera?"
+
+def _encuesta(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        TARGET: rng.integers(0, 2, n),
+        "¿Qué tanto te gusta estudiar?": pd.array(rng.integers(0, 5, n), dtype="Int8"),
+        "¿En qué horario prefieres estudiar?": pd.Categorical(rng.choice(["M", "T", "N"], n)),
+        "¿Qué lugar(es) utilizas para estudiar?__A": (rng.random(n) < 0.4).astype(np.uint8),
+        "¿Qué lugar(es) utilizas para estudiar?__B": (rng.random(n) < 0.5).astype(np.uint8),
+    })
+
+def test_resumen_recalcula_solo_preguntas_modificadas(tmp_path):
+    """
+    Verifica el caché de `resumen_relaciones_con_target` por pregunta.
+
+    El test asegura que:
+    - El resultado con caché es idéntico al calculado sin caché, también leyéndolo desde disco
+      en un caché nuevo (otra sesión).
+    - Al modificar los datos de una pregunta solo esa pregunta se recalcula.
+    - Al modificar el target se recalculan todas.
+    """
+    df = _encuesta()
+    esperado = resumen_relaciones_con_target(df, TARGET)
+
+    cache = ResultCache(str(tmp_path))
+    pd.testing.assert_frame_equal(resumen_relaciones_con_target(df, TARGET, cache=cache), esperado)
+    assert cache.stats == {"memory": 0, "disk": 0, "misses": 3}
+
+    otra_sesion = ResultCache(str(tmp_path))
+    pd.testing.assert_frame_equal(resumen_relaciones_con_target(df, TARGET, cache=otra_sesion), esperado)
+    assert otra_sesion.stats == {"memory": 0, "disk": 3, "misses": 0}
+
+    df.loc[0, "¿Qué lugar(es) utilizas para estudiar?__B"] ^= 1
+    resultado = resumen_relaciones_con_target(df, TARGET, cache=otra_sesion)
+    assert otra_sesion.stats == {"memory": 2, "disk": 3, "misses": 1}
+    pd.testing.assert_frame_equal(resultado, resumen_relaciones_con_target(df, TARGET))
+
+    df.loc[0, TARGET] = 1 - df.loc[0, TARGET]
+    resumen_relaciones_con_target(df, TARGET, cache=otra_sesion)
+    assert otra_sesion.stats["misses"] == 4
+
+def test_cache_lru_acotado_en_disco(tmp_path):
+    """
+    Verifica las claves por contenido y el desalojo LRU del disco.
+
+    El test asegura que:
+    - La clave depende de los valores, el tipo y el nombre de las columnas y de los parámetros,
+      pero no del índice.
+    - Al superar `max_bytes` se borran los resultados usados hace más tiempo, y un resultado
+      leído recientemente se conserva.
+    """
+    serie = pd.Series([1, 2, 3], name="a")
+    assert content_key("x", serie, 5) == content_key("x", serie.set_axis([7, 8, 9]), 5)
+    assert content_key("x", serie, 5) != content_key("x", serie, 6)
+    assert content_key("x", serie) != content_key("x", serie.astype("Int64"))
+    assert content_key("x", serie) != content_key("x", serie.rename("b"))
+
+    valor = np.zeros(1000)
+    tamano = len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+    cache = ResultCache(str(tmp_path), max_bytes=int(tamano * 2.5), max_items=1)
+    cache.put("aa1", valor)
+    cache.put("bb2", valor)
+    assert cache.get("aa1") is not None  # desde disco: pasa a ser el más reciente
+    cache.put("cc3", valor)
+
+    nuevo = ResultCache(str(tmp_path))
+    assert nuevo.get("bb2") is None
+    assert nuevo.get("aa1") is not None and nuevo.get("cc3") is not None
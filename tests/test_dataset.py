@@ -0,0 +1,75 @@
+import pandas as pd
+from taller_utils.analysis import explorar_relacion_con_target, resumen_relaciones_con_target
+from taller_utils.dataset import open_processed_dataset, write_processed_dataset
+from taller_utils.encoding import process_survey_data
+from taller_utils.helpers import resumen_na
+from taller_utils.pipeline import process_survey_file
+from taller_utils.plan import EncodingPlan
+
+TARGET = "¿Has tenido la idea de retirarte o cambiarte a otra carrera?"
+LUGAR = "¿Qué lugar(es) utilizas para estudiar?"
+
+ENCODING_DICT = {
+    "survey_responses": [
+        {"question": TARGET, "type": "binary", "encoding": {"Sí": 1, "No": 0}},
+        {"question": "¿Qué tanto te gusta estudiar?", "type": "ordinal", "encoding": {"Nada": 0, "Poco": 1, "Mucho": 2}},
+        {"question": "¿En qué horario prefieres estudiar?", "type": "categorical",
+         "encoding": {"Mañana": "M", "Tarde": "T", "Noche": "N"}},
+        {"question": LUGAR, "type": "multiselect", "encoding": {"Casa": "A", "Biblioteca": "B"}},
+    ]
+}
+
+def _raw_survey(n=60):
+    return pd.DataFrame({
+        TARGET: (["Sí", "No", "No"] * n)[:n],
+        "¿Qué tanto te gusta estudiar?": (["Mucho", "Poco", "Nada", None] * n)[:n],
+        "¿En qué horario prefieres estudiar?": (["Mañana", "Noche", "Tarde", "Noche", "Otro"] * n)[:n],
+        LUGAR: (["Casa", "Casa, Biblioteca", None, "Biblioteca"] * n)[:n],
+        "edad": list(range(n)),
+    })
+
+def test_processed_dataset_reads_only_requested_columns(tmp_path):
+    """
+    Verifica el formato Parquet de la encuesta procesada y su lectura perezosa.
+
+    El test asegura que:
+    - La especificación de encoding viaja en los metadatos del archivo.
+    - Al leer una pregunta multiselect por su prefijo se obtienen solo sus dummies.
+    - Los tipos codificados (Int8, category, uint8) se recuperan al leer.
+    - El resumen de nulos desde las estadísticas del archivo coincide con `resumen_na`.
+    """
+    encoded = process_survey_data(_raw_survey(), ENCODING_DICT, log_unmapped=False)
+    path = str(tmp_path / "encuesta.parquet")
+    write_processed_dataset(encoded, path, ENCODING_DICT)
+
+    dataset = open_processed_dataset(path)
+    assert len(dataset) == len(encoded)
+    assert list(dataset.columns) == list(encoded.columns)
+    assert dataset.plan.to_encoding_dict() == EncodingPlan.from_dict(ENCODING_DICT).to_encoding_dict()
+
+    parte = dataset.read_questions(TARGET, LUGAR, "¿Pregunta inexistente?")
+    assert list(parte.columns) == [TARGET, f"{LUGAR}__A", f"{LUGAR}__B"]
+    pd.testing.assert_frame_equal(parte, encoded[parte.columns])
+    pd.testing.assert_frame_equal(dataset.read(), encoded)
+    pd.testing.assert_frame_equal(dataset.resumen_na(), resumen_na(encoded), check_dtype=False)
+
+def test_analysis_accepts_processed_dataset(tmp_path):
+    """
+    Verifica que las funciones de análisis entreguen lo mismo con el archivo abierto que con el DataFrame.
+    """
+    path = str(tmp_path / "encuesta.parquet")
+    csv_path = str(tmp_path / "encuesta.csv")
+    _raw_survey().to_csv(csv_path, index=False)
+    process_survey_file(csv_path, path, ENCODING_DICT, chunksize=25, log_unmapped=False)
+
+    dataset = open_processed_dataset(path)
+    encoded = dataset.read()
+    assert dataset.plan is not None
+
+    pd.testing.assert_frame_equal(
+        resumen_relaciones_con_target(dataset, TARGET),
+        resumen_relaciones_con_target(encoded, TARGET)
+    )
+    figuras = explorar_relacion_con_target(dataset, LUGAR, TARGET, mostrar=False)
+    assert len(figuras) == 1
+    assert len(explorar_relacion_con_target(dataset, "¿Qué tanto te gusta estudiar?", TARGET, mostrar=False)) == 2
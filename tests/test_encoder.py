@@ -0,0 +1,68 @@
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import clone
+from sklearn.exceptions import NotFittedError
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import FunctionTransformer
+from taller_utils.encoder import SurveyEncoder
+from taller_utils.encoding import process_survey_data
+from taller_utils.synthetic import generate_survey
+
+def test_survey_encoder_matches_process_survey_data():
+    """
+    Verifica que `SurveyEncoder` codifique igual que `process_survey_data`.
+
+    El test asegura que:
+    - `transform` sobre el DataFrame coincide columna a columna con `process_survey_data` (los
+      códigos de las categóricas como `cat.codes`, nulos y no mapeados como NaN).
+    - `transform_one` y `transform_records` dan las mismas filas que `transform`, también para
+      respuestas con espacios alrededor o preguntas ausentes del diccionario.
+    """
+    df, spec = generate_survey(1_000, seed=3, unmapped_fraction=0.05)
+    df.iloc[0, 1] = "  Sí "
+    encoder = SurveyEncoder(spec).fit()
+    matriz = encoder.transform(df)
+    esperado = process_survey_data(df, spec, log_unmapped=False)
+
+    assert matriz.shape == (len(df), encoder.n_features_out_)
+    for j, columna in enumerate(encoder.get_feature_names_out()):
+        serie = esperado[columna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            valores = serie.cat.codes.to_numpy(dtype=float)
+            valores[valores < 0] = np.nan
+        else:
+            valores = serie.to_numpy(dtype=float, na_value=np.nan)
+        np.testing.assert_array_equal(matriz[:, j], valores, err_msg=columna)
+
+    respuestas = df.to_dict("records")
+    np.testing.assert_array_equal(encoder.transform_records(respuestas), matriz)
+    np.testing.assert_array_equal(encoder.transform_one(respuestas[0]), matriz[0])
+    nombres = encoder.get_feature_names_out().tolist()
+    parcial = encoder.transform_one({"Pregunta binaria 1": " No "})
+    assert parcial[nombres.index("Pregunta binaria 1")] == 0
+    assert np.isnan(parcial[nombres.index("Pregunta binaria 2")])
+    assert not parcial[["__" in nombre for nombre in nombres]].any()
+
+def test_survey_encoder_is_picklable_and_sklearn_compatible():
+    """
+    Verifica la compatibilidad con scikit-learn y la serialización del encoder.
+
+    El test asegura que:
+    - Un encoder serializado con pickle codifica igual que el original.
+    - `clone` conserva los parámetros y el encoder funciona dentro de un Pipeline.
+    - `transform` antes de `fit` falla con el error de sklearn.
+    """
+    df, spec = generate_survey(50, seed=1)
+    encoder = SurveyEncoder(spec, sep=", ").fit()
+    copia = pickle.loads(pickle.dumps(encoder))
+    np.testing.assert_array_equal(copia.transform(df), encoder.transform(df))
+    assert copia.get_feature_names_out().tolist() == encoder.get_feature_names_out().tolist()
+
+    assert clone(encoder).get_params() == encoder.get_params()
+    pipeline = make_pipeline(SurveyEncoder(spec), FunctionTransformer(np.nan_to_num))
+    assert not np.isnan(pipeline.fit_transform(df)).any()
+
+    with pytest.raises(NotFittedError):
+        SurveyEncoder(spec).transform(df)
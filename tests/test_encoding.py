@@ -117,4 +117,201 @@ def test_process_skips_none_encoding():
 
     # Verificamos que la columna sigue igual (no transformada ni eliminada)
     assert "¿Qué lugar(es) utilizas para estudiar?" in result.columns
-    assert result.shape == df.shape
\ No newline at end of file
+    assert result.shape == df.shape
+
+def test_ordinal_encoding_normalizes_unique_values(tmp_path):
+    """
+    Verifica que la codificación vectorizada de preguntas ordinales entregue lo mismo
+    que la búsqueda fila a fila.
+
+    El test asegura que:
+    - Los espacios alrededor de la respuesta se ignoran (" Mucho " se codifica como "Mucho").
+    - Los valores nulos y no mapeados quedan como `pd.NA`.
+    - Cada valor no mapeado se reporta una vez, con su cantidad y la etiqueta de su primera fila,
+      y el reporte se guarda solo en la ruta indicada.
+    """
+    import json
+
+    df = pd.DataFrame(
+        {"¿Qué tanto te gusta estudiar?": ["Mucho", " Mucho ", None, "Poco", "Nada?", " Nada?"]},
+        index=[10, 11, 12, 13, 14, 15]
+    )
+    encoding_dict = {
+        "survey_responses": [{
+            "question": "¿Qué tanto te gusta estudiar?",
+            "type": "ordinal",
+            "encoding": {"Nada": 0, "Poco": 1, "Mucho": 2}
+        }]
+    }
+    report_path = tmp_path / "no_mapeados.json"
+    result, report = process_survey_data(df, encoding_dict, unmapped_path=str(report_path), return_report=True)
+
+    assert result["¿Qué tanto te gusta estudiar?"].tolist() == [2, 2, pd.NA, 1, pd.NA, pd.NA]
+    expected = {"¿Qué tanto te gusta estudiar?": {"Nada?": {"count": 2, "first_row": 14}}}
+    assert report.to_dict() == expected
+    with open(report_path, encoding="utf-8") as f:
+        assert json.load(f) == expected
+
+
+def test_unmapped_summary_is_printed_once(tmp_path, monkeypatch, capsys):
+    """
+    Verifica que los valores no mapeados generen un único resumen por consola, sin una línea
+    por fila, y que sin `unmapped_path` no se escriba ningún archivo.
+    """
+    monkeypatch.chdir(tmp_path)
+    df = pd.DataFrame({"¿Te gusta programar?": ["Tal vez"] * 1000 + ["Sí", "Quizás"]})
+    encoding_dict = {
+        "survey_responses": [{
+            "question": "¿Te gusta programar?",
+            "type": "binary",
+            "encoding": {"Sí": 1, "No": 0}
+        }]
+    }
+    process_survey_data(df, encoding_dict)
+
+    output = capsys.readouterr().out
+    assert "1001 ocurrencias" in output
+    assert output.count("Tal vez") == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_multiselect_dummies_single_block():
+    """
+    Verifica la codificación de preguntas multiselect en columnas dummy.
+
+    El test asegura que:
+    - Se crea una columna `pregunta__codigo` por opción, al final del DataFrame y en el orden del encoding.
+    - Una opción solo se marca si coincide exactamente con una de las partes separadas por ', '.
+    - Los nulos no marcan ninguna opción y la columna original se elimina.
+    """
+    pregunta = "¿Qué lugar(es) utilizas para estudiar?"
+    df = pd.DataFrame({
+        pregunta: ["Casa, Biblioteca", "Biblioteca", None, "Casa de un amigo"],
+        "edad": [20, 21, 22, 23]
+    })
+    encoding_dict = {
+        "survey_responses": [{
+            "question": pregunta,
+            "type": "multiselect",
+            "encoding": {"Casa": "A", "Biblioteca": "B", "Cafetería": "C"}
+        }]
+    }
+    result = process_survey_data(df, encoding_dict, log_unmapped=False)
+
+    assert list(result.columns) == ["edad", f"{pregunta}__A", f"{pregunta}__B", f"{pregunta}__C"]
+    assert result[f"{pregunta}__A"].tolist() == [1, 0, 0, 0]
+    assert result[f"{pregunta}__B"].tolist() == [1, 1, 0, 0]
+    assert result[f"{pregunta}__C"].tolist() == [0, 0, 0, 0]
+
+
+@pytest.mark.parametrize("parallel_backend", ["thread", "process"])
+def test_parallel_encoding_matches_serial(parallel_backend):
+    """
+    Verifica que codificar las preguntas en paralelo entregue exactamente el mismo DataFrame
+    que la ejecución en serie, con las columnas en el mismo orden.
+    """
+    df = pd.DataFrame({
+        "¿Te gusta programar?": ["Sí", "No", "Tal vez", None],
+        "¿Qué lugar(es) utilizas para estudiar?": ["Casa, Biblioteca", None, "Casa", "Otro"],
+        "¿Qué tanto te gusta estudiar?": ["Mucho", "Poco", "Poco", "Nada"],
+        "edad": [20, 21, 22, 23]
+    })
+    encoding_dict = {
+        "survey_responses": [
+            {"question": "¿Te gusta programar?", "type": "binary", "encoding": {"Sí": 1, "No": 0}},
+            {"question": "¿Qué lugar(es) utilizas para estudiar?", "type": "multiselect",
+             "encoding": {"Casa": "A", "Biblioteca": "B"}},
+            {"question": "¿Pregunta inexistente?", "type": "binary", "encoding": {"Sí": 1}},
+            {"question": "¿Qué tanto te gusta estudiar?", "type": "ordinal",
+             "encoding": {"Nada": 0, "Poco": 1, "Mucho": 2}}
+        ]
+    }
+    serial = process_survey_data(df, encoding_dict, log_unmapped=False)
+    parallel = process_survey_data(
+        df, encoding_dict, log_unmapped=False, n_jobs=2, parallel_backend=parallel_backend
+    )
+
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial.to_csv(index=False) == parallel.to_csv(index=False)
+
+
+def test_output_dtypes_follow_spec():
+    """
+    Verifica que los tipos de las columnas codificadas se deriven del encoding y no de los datos.
+
+    El test asegura que:
+    - Las binarias y ordinales usan el entero nullable más chico que contiene sus códigos.
+    - Las categóricas usan 'category' con todos los códigos del encoding, aunque no aparezcan.
+    - Las dummies multiselect son uint8.
+    - El resultado coincide con `EncodingPlan.output_schema`.
+    """
+    from taller_utils.plan import EncodingPlan
+
+    df = pd.DataFrame({
+        "¿Te gusta programar?": [None, None],
+        "¿Qué tanto te gusta estudiar?": ["Mucho", "Nada"],
+        "¿En qué horario prefieres estudiar?": ["Mañana", "Otro"],
+        "¿Qué lugar(es) utilizas para estudiar?": ["Casa", None],
+    })
+    encoding_dict = {
+        "survey_responses": [
+            {"question": "¿Te gusta programar?", "type": "binary", "encoding": {"Sí": 1, "No": 0}},
+            {"question": "¿Qué tanto te gusta estudiar?", "type": "ordinal", "encoding": {"Nada": 0, "Mucho": 200}},
+            {"question": "¿En qué horario prefieres estudiar?", "type": "categorical",
+             "encoding": {"Mañana": "M", "Tarde": "T"}},
+            {"question": "¿Qué lugar(es) utilizas para estudiar?", "type": "multiselect", "encoding": {"Casa": "A"}},
+        ]
+    }
+    result = process_survey_data(df, encoding_dict, log_unmapped=False)
+
+    assert result.dtypes.to_dict() == {
+        "¿Te gusta programar?": pd.Int8Dtype(),
+        "¿Qué tanto te gusta estudiar?": pd.UInt8Dtype(),
+        "¿En qué horario prefieres estudiar?": pd.CategoricalDtype(["M", "T"]),
+        "¿Qué lugar(es) utilizas para estudiar?__A": "uint8",
+    }
+    assert result.dtypes.to_dict() == EncodingPlan.from_dict(encoding_dict).output_schema()
+    assert result["¿En qué horario prefieres estudiar?"].tolist()[0] == "M"
+    assert pd.isna(result["¿En qué horario prefieres estudiar?"].iloc[1])
+
+def test_sparse_multiselect_output():
+    """
+    Verifica el modo disperso de las dummies multiselect.
+
+    El test asegura que:
+    - `encode_multiselect(..., sparse=True)` retorna una matriz CSR con los mismos valores y nombres
+      de columna que el bloque denso, con nulos, opciones repetidas y opciones desconocidas.
+    - `process_survey_data(..., sparse=True)` agrega las dummies como columnas `Sparse[uint8]` y,
+      densificadas, el resultado es idéntico al modo denso.
+    - `resumen_relaciones_con_target` da el mismo resultado con columnas dispersas, y
+      `SparseIndicators.from_frame` recupera la matriz CSR.
+    """
+    from taller_utils.analysis import resumen_relaciones_con_target
+    from taller_utils.encoding import encode_multiselect
+    from taller_utils.sparse import SparseIndicators
+    from taller_utils.synthetic import generate_survey
+
+    series = pd.Series(["Casa, Biblioteca", None, "Otro, Casa", "Biblioteca, Biblioteca"], index=[5, 6, 7, 8], name="lugares")
+    encoding = {"Casa": "A", "Biblioteca": "B", "Cafetería": "C"}
+    indicators = encode_multiselect(series, encoding, sparse=True)
+    dense = encode_multiselect(series, encoding)
+    assert indicators.matrix.format == "csr"
+    assert indicators.columns.tolist() == dense.columns.tolist()
+    assert indicators.index.tolist() == [5, 6, 7, 8]
+    assert (indicators.matrix.toarray() == dense.to_numpy()).all()
+    assert indicators.matrix.nnz == 4
+
+    df, spec = generate_survey(1_000, seed=2)
+    expected = process_survey_data(df, spec, log_unmapped=False)
+    result = process_survey_data(df, spec, log_unmapped=False, sparse=True)
+    sparse_columns = [col for col in result.columns if isinstance(result[col].dtype, pd.SparseDtype)]
+    assert sparse_columns == [col for col in expected.columns if "__" in col]
+    pd.testing.assert_frame_equal(result.astype({col: "uint8" for col in sparse_columns}), expected)
+
+    target = spec["survey_responses"][0]["question"]
+    pd.testing.assert_frame_equal(
+        resumen_relaciones_con_target(result, target), resumen_relaciones_con_target(expected, target)
+    )
+    matrix = SparseIndicators.from_frame(result).matrix
+    assert matrix.format == "csr"
+    assert (matrix.toarray() == expected[sparse_columns].to_numpy()).all()
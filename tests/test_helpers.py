@@ -0,0 +1,51 @@
+import pandas as pd
+from taller_utils.helpers import calculate_age, calculate_age_series, memory_report
+
+def test_calculate_age_series_against_reference_date():
+    """
+    Verifica el cálculo vectorizado de edades contra una fecha de referencia fija.
+
+    El test asegura que:
+    - La edad descuenta un año si aún no se cumple años en la fecha de referencia.
+    - Los valores nulos, vacíos o con formato inválido (incluido 29/02 de un año no bisiesto) quedan como `pd.NA`.
+    - Se conservan el índice y el nombre de la columna.
+    """
+    fechas = pd.Series(
+        ["17/10/2006", "18/10/2006", "1/2/2000", None, "", "29/02/2001", "17/10/2006"],
+        index=list("abcdefg"), name="Fecha de nacimiento"
+    )
+    edades = calculate_age_series(fechas, reference_date="2026-10-17")
+
+    assert edades.tolist() == [20, 19, 26, pd.NA, pd.NA, pd.NA, 20]
+    assert edades.index.tolist() == list("abcdefg")
+    assert edades.name == "Fecha de nacimiento"
+
+def test_calculate_age_scalar_wrapper():
+    """
+    Verifica que la versión escalar entregue un int o None, igual que antes.
+
+    El test asegura que:
+    - Los valores inválidos, nulos o que no son texto dan None.
+    - La edad coincide con la de `calculate_age_series`, también el día del cumpleaños y el día anterior.
+    """
+    assert calculate_age("25/12/2000", reference_date="2026-10-17") == 25
+    assert calculate_age("2000-12-25", reference_date="2026-10-17") is None
+    assert calculate_age(None) is None
+    assert calculate_age(float("nan")) is None
+
+    fechas = ["17/10/2000", "18/10/2000", "16/10/2000", "29/02/2004", "01/01/2026", "31/12/1950"]
+    esperadas = calculate_age_series(pd.Series(fechas), reference_date="2026-10-17").tolist()
+    assert [calculate_age(fecha, reference_date="2026-10-17") for fecha in fechas] == esperadas
+
+def test_memory_report_compares_columns():
+    """
+    Verifica que el reporte de memoria incluya las columnas de ambas versiones y el total.
+    """
+    antes = pd.DataFrame({"a": ["Sí", "No", "Sí"], "b": ["x", "y", "z"]})
+    despues = pd.DataFrame({"a": pd.array([1, 0, 1], dtype="Int8"), "b__x": [1, 0, 0]})
+    reporte = memory_report(antes, despues)
+
+    assert list(reporte.index) == ["a", "b__x", "b", "TOTAL"]
+    assert reporte.loc["a", "bytes_despues"] == 6
+    assert reporte.loc["b", "bytes_despues"] == 0
+    assert reporte.loc["TOTAL", "bytes_antes"] == antes.memory_usage(index=False, deep=True).sum()
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"))
+
+def _loaded_after(code: str) -> set:
+    """
+    Ejecuta `code` en un proceso nuevo y retorna los paquetes de primer nivel cargados.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(' '.join(sys.modules))"],
+        capture_output=True, text=True, check=True, env={**os.environ, "PYTHONPATH": SRC}
+    )
+    return {name.split(".")[0] for name in result.stdout.split()}
+
+def test_imports_do_not_load_plotting_or_stats():
+    """
+    Verifica que importar el paquete y sus módulos no cargue matplotlib, seaborn, scipy ni sklearn.
+
+    El test asegura que:
+    - `import taller_utils` no importa ningún módulo del paquete hasta que se usa un nombre.
+    - Los módulos de análisis y gráficos difieren esos paquetes hasta llamar a sus funciones.
+    - Los nombres públicos se resuelven desde `taller_utils`.
+    """
+    heavy = {"matplotlib", "seaborn", "scipy", "sklearn"}
+
+    assert not heavy & _loaded_after("import taller_utils")
+    assert "pandas" not in _loaded_after("import taller_utils")
+    code = (
+        "import taller_utils.analysis, taller_utils.missing_data, taller_utils.visuals, taller_utils.pipeline\n"
+        "from taller_utils import process_survey_data, resumen_relaciones_con_target"
+    )
+    assert not heavy & _loaded_after(code)
+
+    import taller_utils
+    from taller_utils.encoding import process_survey_data
+
+    assert taller_utils.process_survey_data is process_survey_data
+    assert "process_survey_data" in dir(taller_utils)
@@ -0,0 +1,65 @@
+import json
+import pandas as pd
+from taller_utils.encoding import process_survey_data
+from taller_utils.instrumentation import EventCollector, JsonLinesExporter
+from taller_utils.pipeline import process_survey_file
+
+ENCODING_DICT = {
+    "survey_responses": [
+        {"question": "¿Te gusta programar?", "type": "binary", "encoding": {"Sí": 1, "No": 0}},
+        {"question": "¿Pregunta inexistente?", "type": "binary", "encoding": {"Sí": 1}},
+        {"question": "¿Qué lugar(es) utilizas para estudiar?", "type": "multiselect",
+         "encoding": {"Casa": "A", "Biblioteca": "B"}},
+    ]
+}
+
+def _raw_survey():
+    return pd.DataFrame({
+        "¿Te gusta programar?": ["Sí", "No", "Tal vez", None, "Quizás", "Tal vez"],
+        "¿Qué lugar(es) utilizas para estudiar?": ["Casa", None, "Casa, Biblioteca", "Biblioteca", "Casa", "Otro"],
+    })
+
+def test_observer_receives_one_event_per_question():
+    """
+    Verifica que el observador reciba un evento por pregunta codificada, en orden, y uno con el total.
+
+    El test asegura que:
+    - Las preguntas que no están en el DataFrame no generan eventos.
+    - Cada evento informa filas, valores distintos y no mapeados (solo binary/ordinal).
+    - El resultado es el mismo con y sin observador, también en paralelo.
+    """
+    collector = EventCollector()
+    result = process_survey_data(_raw_survey(), ENCODING_DICT, log_unmapped=False, observer=collector)
+    events = collector.to_frame()
+
+    assert events["stage"].tolist() == ["question", "question", "encode"]
+    assert events["question"].tolist()[:2] == ["¿Te gusta programar?", "¿Qué lugar(es) utilizas para estudiar?"]
+    binaria = collector.events[0]
+    assert (binaria.rows, binaria.distinct, binaria.unmapped, binaria.unmapped_distinct) == (6, 4, 3, 2)
+    assert collector.events[1].unmapped is None
+    assert collector.events[2].unmapped == 3
+    assert (events["wall_s"] >= 0).all()
+
+    pd.testing.assert_frame_equal(result, process_survey_data(_raw_survey(), ENCODING_DICT, log_unmapped=False))
+    paralelo = EventCollector()
+    process_survey_data(_raw_survey(), ENCODING_DICT, log_unmapped=False, n_jobs=2, observer=paralelo)
+    assert [e.question for e in paralelo.events] == [e.question for e in collector.events]
+
+def test_pipeline_exports_json_lines_per_chunk(tmp_path):
+    """
+    Verifica que el modo por bloques exporte, por cada bloque, lectura, preguntas, codificación y escritura.
+    """
+    csv_path, metrics_path = tmp_path / "encuesta.csv", tmp_path / "metricas.jsonl"
+    _raw_survey().to_csv(csv_path, index=False)
+
+    with JsonLinesExporter(str(metrics_path), extra={"run": "test"}) as exporter:
+        process_survey_file(str(csv_path), str(tmp_path / "salida.parquet"), ENCODING_DICT,
+                            chunksize=4, log_unmapped=False, observer=exporter)
+
+    with open(metrics_path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [(line["stage"], line["chunk"]) for line in lines] == [
+        (stage, chunk) for chunk in (0, 1) for stage in ("read", "question", "question", "encode", "write")
+    ]
+    assert all(line["run"] == "test" for line in lines)
+    assert sum(line["rows"] for line in lines if line["stage"] == "write") == 6
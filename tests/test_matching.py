@@ -0,0 +1,67 @@
+import pandas as pd
+import yaml
+from taller_utils.encoding import process_survey_data
+from taller_utils.matching import apply_matches, fold_text, suggest_matches, write_patch
+
+SPEC = {
+    "survey_responses": [
+        {"question": "¿Trabajas?", "type": "binary", "encoding": {"Sí": 1, "No": 0}},
+        {"question": "¿Qué tanto te gusta estudiar?", "type": "ordinal", "encoding": {"Nada": 0, "Poco": 1, "Mucho": 2}},
+    ]
+}
+
+def _encuesta(repeticiones=3):
+    return pd.DataFrame({
+        "¿Trabajas?": ["Sí", "Si", " SÍ ", "no", "Tal vez"] * repeticiones,
+        "¿Qué tanto te gusta estudiar?": ["Mucho", "Muhco", "poco", "Nada", "xyz"] * repeticiones,
+    })
+
+def test_suggest_matches_builds_patch_ready_report(tmp_path):
+    """
+    Verifica las sugerencias para los valores no mapeados.
+
+    El test asegura que:
+    - `fold_text` quita tildes, mayúsculas y espacios extra.
+    - Las variantes de tildes y mayúsculas coinciden exactamente y los errores de tipeo por distancia de edición.
+    - Los valores sin una clave parecida no se aceptan.
+    - El parche YAML conserva los códigos de la especificación y, aplicado, deja todo mapeado salvo esos valores.
+    """
+    assert fold_text("  SÍ   señor ") == "si senor"
+
+    _, report = process_survey_data(_encuesta(), SPEC, return_report=True, log_unmapped=False)
+    matches = suggest_matches(report, SPEC).set_index("value")
+
+    assert matches.loc["Si", "match"] == "Sí" and matches.loc["Si", "method"] == "folded"
+    assert matches.loc["SÍ", "code"] == 1 and matches.loc["no", "code"] == 0
+    assert matches.loc["Muhco", "match"] == "Mucho" and matches.loc["Muhco", "method"] == "fuzzy"
+    assert matches.loc["Muhco", "count"] == 3
+    assert not matches.loc["Tal vez", "accepted"] and not matches.loc["xyz", "accepted"]
+
+    patch = write_patch(matches.reset_index(), str(tmp_path / "parche.yaml"))
+    with open(tmp_path / "parche.yaml", encoding="utf-8") as file:
+        assert yaml.safe_load(file)[0] == {"question": "¿Trabajas?", "encoding": {"Si": 1, "SÍ": 1, "no": 0}}
+
+    _, restante = process_survey_data(_encuesta(), apply_matches(SPEC, patch), return_report=True, log_unmapped=False)
+    assert restante.to_dict() == {
+        "¿Trabajas?": {"Tal vez": {"count": 3, "first_row": 4}},
+        "¿Qué tanto te gusta estudiar?": {"xyz": {"count": 3, "first_row": 4}},
+    }
+
+def test_match_threshold_recodes_only_accepted_values():
+    """
+    Verifica la corrección automática en `process_survey_data`.
+
+    El test asegura que:
+    - Con `match_threshold`, las respuestas corregidas quedan codificadas como su clave sugerida.
+    - El resto de la salida es igual a la codificación sin corrección.
+    - El reporte retornado solo contiene los valores que siguen sin mapear.
+    """
+    df = _encuesta()
+    sin_corregir = process_survey_data(df, SPEC, log_unmapped=False)
+    corregido, report = process_survey_data(df, SPEC, return_report=True, log_unmapped=False, match_threshold=0.8)
+
+    assert corregido["¿Trabajas?"].tolist()[:5] == [1, 1, 1, 0, pd.NA]
+    assert corregido["¿Qué tanto te gusta estudiar?"].tolist()[:5] == [2, 2, 1, 0, pd.NA]
+    assert corregido.dtypes.equals(sin_corregir.dtypes)
+    assert set(report.to_dict()) == {"¿Trabajas?", "¿Qué tanto te gusta estudiar?"}
+    assert report.total() == 6
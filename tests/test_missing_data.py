@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from taller_utils.missing_data import test_missing_mcar as evaluar_mcar
+
+def test_missing_mcar_counts_patterns_without_mutating():
+    """
+    Verifica que `test_missing_mcar` cuente los patrones de faltantes sin modificar el DataFrame original.
+
+    El test asegura que:
+    - Los textos vacíos se consideran faltantes igual que NaN/None.
+    - Los patrones quedan en orden lexicográfico con su cantidad de filas.
+    - El DataFrame recibido no cambia (antes se reemplazaban los "" en el lugar).
+    """
+    df = pd.DataFrame({
+        "edad": [20, np.nan, 22, np.nan, 25],
+        "carrera": ["Ingeniería", "", None, "", "Derecho"]
+    })
+    original = df.copy()
+
+    result = evaluar_mcar(df, verbose=False)
+
+    pd.testing.assert_frame_equal(df, original)
+    assert result.patterns[["edad", "carrera"]].values.tolist() == [[False, False], [False, True], [True, True]]
+    assert result.patterns["conteo"].tolist() == [2, 1, 2]
+    assert result.dof == 0
+    assert not result.reject
+
+def test_missing_mcar_wide_frame_uses_exact_patterns():
+    """
+    Verifica que con más de 64 columnas (claves por hash) los patrones se cuenten igual que
+    agrupando las filas completas.
+    """
+    rng = np.random.default_rng(0)
+    mask = rng.random((500, 100)) < 0.02
+    df = pd.DataFrame(np.where(mask, np.nan, 1.0), columns=[f"p{j}" for j in range(100)])
+
+    result = evaluar_mcar(df, verbose=False)
+
+    expected = pd.DataFrame(mask).value_counts().sort_index()
+    assert result.patterns["conteo"].tolist() == expected.tolist()
+    assert result.patterns["conteo"].sum() == 500
@@ -0,0 +1,287 @@
+import json
+import os
+import pandas as pd
+from taller_utils.dataset import open_processed_dataset
+from taller_utils.encoding import process_survey_data
+from taller_utils.pipeline import process_survey_file, process_survey_incremental, read_survey_frame
+
+ENCODING_DICT = {
+    "survey_responses": [
+        {
+            "question": "¿Te gusta programar?",
+            "type": "binary",
+            "encoding": {"Sí": 1, "No": 0}
+        },
+        {
+            "question": "¿Qué lugar(es) utilizas para estudiar?",
+            "type": "multiselect",
+            "encoding": {"Casa": "A", "Biblioteca": "B"}
+        }
+    ]
+}
+
+def _raw_survey():
+    return pd.DataFrame({
+        "¿Te gusta programar?": [None, None, "Sí", "Tal vez", "No", "Quizás", "Sí", "Tal vez"],
+        "¿Qué lugar(es) utilizas para estudiar?": ["Casa", None, "Casa, Biblioteca", "Biblioteca", None, "Casa", "Otro", "Casa"]
+    })
+
+def _as_list(serie):
+    return [None if pd.isna(x) else int(x) for x in serie]
+
+def test_process_survey_file_matches_whole_file_run(tmp_path, monkeypatch):
+    """
+    Verifica que el modo por bloques produzca el mismo resultado que procesar el archivo completo.
+
+    El test asegura que:
+    - La salida Parquet, escrita bloque a bloque, contiene los mismos valores codificados.
+    - Los valores no mapeados se suman entre bloques y conservan la fila de su primera aparición.
+    - El primer bloque puede venir vacío en una pregunta sin romper el esquema del archivo.
+    - Los tipos compactos (Int8, uint8) se recuperan al leer el Parquet.
+    """
+    monkeypatch.chdir(tmp_path)
+    _raw_survey().to_csv("encuesta.csv", index=False)
+
+    whole = process_survey_data(pd.read_csv("encuesta.csv"), ENCODING_DICT, log_unmapped=False)
+    unmapped = process_survey_file("encuesta.csv", "encuesta.parquet", ENCODING_DICT, chunksize=2, log_unmapped=False)
+    streamed = pd.read_parquet("encuesta.parquet")
+
+    assert list(streamed.columns) == list(whole.columns)
+    assert streamed.dtypes.to_dict() == whole.dtypes.to_dict()
+    for col in whole.columns:
+        assert _as_list(streamed[col]) == _as_list(whole[col])
+    assert unmapped.to_dict() == {"¿Te gusta programar?": {
+        "Tal vez": {"count": 2, "first_row": 3},
+        "Quizás": {"count": 1, "first_row": 5}
+    }}
+
+def test_process_survey_file_writes_merged_summary(tmp_path):
+    """
+    Verifica que el reporte JSON del modo por bloques sea el de todo el archivo.
+    """
+    raw_path = tmp_path / "encuesta.csv"
+    _raw_survey().to_csv(raw_path, index=False)
+    whole_path = tmp_path / "completo.json"
+    chunked_path = tmp_path / "bloques.json"
+
+    process_survey_data(pd.read_csv(raw_path), ENCODING_DICT, log_unmapped=False, unmapped_path=str(whole_path))
+    process_survey_file(str(raw_path), str(tmp_path / "salida.csv"), ENCODING_DICT, chunksize=3,
+                        unmapped_path=str(chunked_path))
+
+    with open(whole_path, encoding="utf-8") as f1, open(chunked_path, encoding="utf-8") as f2:
+        assert json.load(f1) == json.load(f2)
+    assert len(pd.read_csv(tmp_path / "salida.csv")) == 8
+
+def test_whole_file_read_matches_chunked_mode_on_numeric_answers(tmp_path):
+    """
+    Verifica que `read_survey_frame` lea las respuestas igual que el modo por bloques.
+
+    El test asegura que:
+    - Una pregunta con claves numéricas ('1', '2') y respuestas vacías se codifica igual leyendo
+      el archivo completo y por bloques (con `pd.read_csv` a secas se leería como float).
+    - Ambos modos reportan los mismos valores no mapeados.
+    """
+    raw_path = tmp_path / "encuesta.csv"
+    raw_path.write_text("q,d\n1,x\n2,y\n,z\n3,w\n", encoding="utf-8")
+    spec = {"survey_responses": [{"question": "q", "type": "ordinal", "encoding": {"1": 1, "2": 2}}]}
+
+    whole, whole_report = process_survey_data(
+        read_survey_frame(str(raw_path)), spec, log_unmapped=False, return_report=True
+    )
+    chunked_report = process_survey_file(
+        str(raw_path), str(tmp_path / "salida.parquet"), spec, chunksize=2, log_unmapped=False
+    )
+    streamed = pd.read_parquet(tmp_path / "salida.parquet")
+
+    assert _as_list(whole["q"]) == _as_list(streamed["q"]) == [1, 2, None, None]
+    assert whole_report.to_dict() == chunked_report.to_dict() == {"q": {"3": {"count": 1, "first_row": 3}}}
+
+def test_incremental_encodes_only_new_rows(tmp_path):
+    """
+    Verifica el modo incremental con salida en particiones Parquet.
+
+    El test asegura que:
+    - Cada ejecución con filas nuevas escribe una partición con solo esas filas.
+    - Sin filas nuevas (o con una fila a medio escribir) no se escribe nada.
+    - El dataset resultante es igual a codificar el archivo completo, y el reporte de no
+      mapeados acumulado conserva los números de fila del archivo.
+    - Un cambio en la especificación reconstruye la salida completa.
+    """
+    raw = pd.concat([_raw_survey()] * 3, ignore_index=True)
+    csv_path, output_dir = tmp_path / "encuesta.csv", str(tmp_path / "procesada")
+    raw.iloc[:10].to_csv(csv_path, index=False)
+
+    first = process_survey_incremental(str(csv_path), output_dir, ENCODING_DICT, chunksize=4, log_unmapped=False)
+    assert (first.new_rows, first.total_rows, first.rebuilt) == (10, 10, True)
+    assert process_survey_incremental(str(csv_path), output_dir, ENCODING_DICT, log_unmapped=False).new_rows == 0
+
+    raw.iloc[10:].to_csv(csv_path, index=False, header=False, mode="a")
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("Sí,Ca")
+    second = process_survey_incremental(str(csv_path), output_dir, ENCODING_DICT, chunksize=4, log_unmapped=False)
+    assert (second.new_rows, second.total_rows, second.rebuilt) == (14, 24, False)
+    assert second.partition.endswith("part-00001.parquet")
+
+    whole, report = process_survey_data(raw, ENCODING_DICT, log_unmapped=False, return_report=True)
+    pd.testing.assert_frame_equal(open_processed_dataset(output_dir).read(), whole)
+    assert second.report.to_dict() == report.to_dict()
+
+    changed = {"survey_responses": ENCODING_DICT["survey_responses"][:1]}
+    third = process_survey_incremental(str(csv_path), output_dir, changed, log_unmapped=False)
+    assert (third.new_rows, third.rebuilt) == (24, True)
+    assert sorted(os.listdir(output_dir)) == ["_manifest.json", "part-00000.parquet"]
+
+def test_incremental_csv_tail_and_rewritten_input(tmp_path):
+    """
+    Verifica el modo incremental con salida CSV: las filas nuevas se agregan al final y, si el
+    archivo de entrada se reescribe (cambia una fila ya procesada), se reconstruye todo.
+    """
+    raw = pd.concat([_raw_survey()] * 2, ignore_index=True)
+    csv_path, output_path = tmp_path / "encuesta.csv", str(tmp_path / "procesada.csv")
+    raw.iloc[:5].to_csv(csv_path, index=False)
+    process_survey_incremental(str(csv_path), output_path, ENCODING_DICT, log_unmapped=False)
+    raw.iloc[5:].to_csv(csv_path, index=False, header=False, mode="a")
+    process_survey_incremental(str(csv_path), output_path, ENCODING_DICT, chunksize=3, log_unmapped=False)
+
+    expected = process_survey_data(raw, ENCODING_DICT, log_unmapped=False).to_csv(index=False)
+    with open(output_path, encoding="utf-8") as f:
+        assert f.read() == expected
+
+    raw.iloc[-1, 0] = "No"
+    raw.to_csv(csv_path, index=False)
+    run = process_survey_incremental(str(csv_path), output_path, ENCODING_DICT, log_unmapped=False)
+    assert (run.new_rows, run.rebuilt) == (16, True)
+    with open(output_path, encoding="utf-8") as f:
+        assert f.read() == process_survey_data(raw, ENCODING_DICT, log_unmapped=False).to_csv(index=False)
+
+def test_process_survey_batch_writes_per_file_and_combined_outputs(tmp_path):
+    """
+    Verifica el procesamiento en lote de varios archivos con la misma especificación.
+
+    El test asegura que:
+    - Cada archivo correcto tiene su Parquet, igual al de `process_survey_file`, y su reporte de no mapeados.
+    - Un archivo que falla no deja salida (ni temporal) y no detiene a los demás.
+    - El directorio se lee como un dataset con los archivos correctos, en el orden de entrada.
+    - El estado, las filas y los no mapeados de cada archivo quedan en el resultado y en el manifiesto.
+    - El reporte combinado se guarda en `unmapped_path` y el observador recibe los eventos de cada archivo.
+    """
+    from taller_utils.instrumentation import EventCollector
+    from taller_utils.pipeline import process_survey_batch
+
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    survey = _raw_survey()
+    survey.assign(edad="20").iloc[:5].to_csv(raw / "ola_1.csv", index=False)
+    survey.assign(edad="veinte").to_csv(raw / "ola_2.csv", index=False)
+    survey.assign(edad="21").iloc[3:].to_csv(raw / "ola_3.csv", index=False)
+
+    collector = EventCollector()
+    run = process_survey_batch(str(raw / "ola_*.csv"), str(tmp_path / "olas"), ENCODING_DICT, n_jobs=2,
+                               chunksize=2, dtype={"edad": "Int64"}, log_unmapped=False,
+                               unmapped_path=str(tmp_path / "unmapped.json"), observer=collector)
+
+    status = run.to_frame()
+    assert status["status"].tolist() == ["ok", "error", "ok"]
+    assert status["rows"].tolist() == [5, 0, 5]
+    assert status["unmapped"].tolist() == [1, 0, 3]
+    assert "edad" not in run.files[0].report.to_dict() and run.files[1].error
+
+    assert sorted(os.listdir(tmp_path / "olas")) == [
+        "_manifest.json", "ola_1.parquet", "ola_1.unmapped.json", "ola_3.parquet", "ola_3.unmapped.json"
+    ]
+    process_survey_file(str(raw / "ola_3.csv"), str(tmp_path / "ola_3.parquet"), ENCODING_DICT,
+                        dtype={"edad": "Int64"}, log_unmapped=False)
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "olas" / "ola_3.parquet"),
+                                  pd.read_parquet(tmp_path / "ola_3.parquet"))
+
+    combined = open_processed_dataset(str(tmp_path / "olas")).read()
+    assert len(combined) == 10
+    assert combined["edad"].tolist() == [20] * 5 + [21] * 5
+    with open(tmp_path / "olas" / "_manifest.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert [p["first_row"] for p in manifest["partitions"]] == [0, 5]
+    assert [f["status"] for f in manifest["files"]] == ["ok", "error", "ok"]
+    assert run.report.total() == 4
+    with open(tmp_path / "unmapped.json", encoding="utf-8") as f:
+        assert json.load(f) == run.report.to_dict()
+
+    events = collector.to_frame()
+    files = events[events["stage"] == "file"].sort_values("file")
+    assert files["file"].tolist() == ["ola_1.csv", "ola_2.csv", "ola_3.csv"]
+    assert files["rows"].tolist() == [5, 0, 5]
+    assert set(events.loc[events["file"] == "ola_3.csv", "stage"]) == {"read", "question", "encode", "write", "file"}
+
+def test_process_survey_batch_combines_waves_with_different_columns(tmp_path):
+    """
+    Verifica el dataset combinado cuando las olas no tienen las mismas columnas.
+
+    El test asegura que:
+    - Una pregunta que falta en una ola queda nula en sus filas, con el tipo de la especificación.
+    - Las columnas que no son del encoding y solo están en una ola también se combinan como nulas.
+    - El dataset combinado se lee completo, por columnas, por bloques y con su resumen de nulos.
+    """
+    from taller_utils.pipeline import process_survey_batch
+
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    survey = _raw_survey()
+    survey.to_csv(raw / "ola_1.csv", index=False)
+    survey[["¿Te gusta programar?"]].assign(facultad="Ingeniería").to_csv(raw / "ola_2.csv", index=False)
+
+    run = process_survey_batch(str(raw), str(tmp_path / "olas"), ENCODING_DICT, log_unmapped=False)
+    assert [f.status for f in run.files] == ["ok", "ok"]
+
+    dataset = open_processed_dataset(str(tmp_path / "olas"))
+    combined = dataset.read()
+    assert len(combined) == 16
+    assert list(combined.columns) == ["¿Te gusta programar?", "¿Qué lugar(es) utilizas para estudiar?__A",
+                                      "¿Qué lugar(es) utilizas para estudiar?__B", "facultad"]
+    assert str(combined["¿Te gusta programar?"].dtype) == "Int8"
+    dummy = combined["¿Qué lugar(es) utilizas para estudiar?__A"]
+    assert dummy.iloc[8:].isna().all() and _as_list(dummy.iloc[:8]) == [1, 0, 1, 0, 0, 1, 0, 1]
+    assert combined["facultad"].iloc[:8].isna().all() and (combined["facultad"].iloc[8:] == "Ingeniería").all()
+
+    assert dataset.read(["facultad"])["facultad"].notna().sum() == 8
+    batches = list(dataset.iter_batches(["¿Te gusta programar?", "facultad"], batch_size=5))
+    assert sum(len(batch) for batch in batches) == 16
+    assert dataset.resumen_na().loc["facultad", "nulos"] == 8
+
+def test_process_survey_batch_survives_a_worker_crash(tmp_path, monkeypatch):
+    """
+    Verifica que un worker que muere solo haga fallar a su archivo.
+
+    El test asegura que:
+    - El archivo que mata a su proceso (`os._exit`) queda con estado 'error' y sin salida temporal.
+    - Los demás archivos, en curso o todavía sin enviar, se codifican igual.
+    - El manifiesto se escribe con el estado de todos los archivos.
+    """
+    from taller_utils import pipeline
+
+    column_types = pipeline._column_types
+
+    def crash_on_marked_file(header, dtype=None):
+        # Los workers heredan este reemplazo al crearse con fork
+        if "romper" in header:
+            os._exit(1)
+        return column_types(header, dtype)
+
+    monkeypatch.setattr(pipeline, "_column_types", crash_on_marked_file)
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for i in range(1, 5):
+        survey = _raw_survey()
+        (survey.assign(romper=1) if i == 2 else survey).to_csv(raw / f"ola_{i}.csv", index=False)
+
+    run = pipeline.process_survey_batch(str(raw), str(tmp_path / "olas"), ENCODING_DICT, n_jobs=2, log_unmapped=False)
+
+    assert [f.status for f in run.files] == ["ok", "error", "ok", "ok"]
+    assert run.files[1].error.startswith("BrokenProcessPool")
+    assert sorted(os.listdir(tmp_path / "olas")) == [
+        "_manifest.json", "ola_1.parquet", "ola_1.unmapped.json", "ola_3.parquet", "ola_3.unmapped.json",
+        "ola_4.parquet", "ola_4.unmapped.json",
+    ]
+    with open(tmp_path / "olas" / "_manifest.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert [f["status"] for f in manifest["files"]] == ["ok", "error", "ok", "ok"]
+    assert manifest["rows"] == 24
+    assert len(open_processed_dataset(str(tmp_path / "olas")).read()) == 24
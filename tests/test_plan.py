@@ -0,0 +1,90 @@
+import pytest
+import yaml
+import pandas as pd
+from taller_utils.encoding import process_survey_data
+from taller_utils.plan import EncodingPlan, load_encoding_plan
+
+SPEC = [
+    {
+        "question": "¿Te gusta programar?",
+        "type": "binary",
+        "encoding": {"Sí": 1, "No": 0}
+    },
+    {
+        "question": "¿Qué lugar(es) utilizas para estudiar?",
+        "type": "multiselect",
+        "encoding": {"Casa": "A", "Biblioteca": "B"}
+    }
+]
+
+def _write_spec(path, spec=SPEC):
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(spec, f, allow_unicode=True, sort_keys=False)
+
+def test_plan_and_dict_produce_same_output(tmp_path):
+    """
+    Verifica que `process_survey_data` entregue el mismo resultado con un EncodingPlan compilado
+    que con el diccionario de `load_yaml_encodings`.
+    """
+    df = pd.DataFrame({
+        "¿Te gusta programar?": ["Sí", "No", None],
+        "¿Qué lugar(es) utilizas para estudiar?": ["Casa, Biblioteca", None, "Biblioteca"]
+    })
+    spec_path = tmp_path / "encodings.yaml"
+    _write_spec(spec_path)
+
+    plan = load_encoding_plan(str(spec_path), cache_dir=str(tmp_path / "cache"))
+    from_plan = process_survey_data(df, plan, log_unmapped=False)
+    from_dict = process_survey_data(df, {"survey_responses": SPEC}, log_unmapped=False)
+
+    pd.testing.assert_frame_equal(from_plan, from_dict)
+
+def test_load_encoding_plan_uses_disk_cache(tmp_path, monkeypatch):
+    """
+    Verifica que un plan ya compilado se lea desde el caché en disco sin volver a parsear el YAML,
+    y que un cambio en el contenido del archivo genere un plan nuevo.
+    """
+    import taller_utils.plan as plan_module
+
+    spec_path = tmp_path / "encodings.yaml"
+    cache_dir = tmp_path / "cache"
+    _write_spec(spec_path)
+    plan_module._memory_cache.clear()
+    first = load_encoding_plan(str(spec_path), cache_dir=str(cache_dir))
+    assert len(list((cache_dir / "plans").glob("*.pkl"))) == 1
+
+    plan_module._memory_cache.clear()
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("El YAML no debería parsearse de nuevo")
+
+    monkeypatch.setattr(plan_module.yaml, "load", fail_parse)
+    cached = load_encoding_plan(str(spec_path), cache_dir=str(cache_dir))
+    assert cached == first
+    assert cached.questions[1].dummy_columns == (
+        "¿Qué lugar(es) utilizas para estudiar?__A",
+        "¿Qué lugar(es) utilizas para estudiar?__B"
+    )
+    monkeypatch.undo()
+
+    _write_spec(spec_path, SPEC[:1])
+    changed = load_encoding_plan(str(spec_path), cache_dir=str(cache_dir))
+    assert changed.spec_hash != first.spec_hash
+    assert len(changed.questions) == 1
+
+def test_plan_validation_reports_all_errors():
+    """
+    Verifica que la compilación del plan rechace especificaciones inválidas, listando cada problema.
+    """
+    spec = [
+        {"question": "A", "type": "binario", "encoding": {"Sí": 1}},
+        {"question": "B", "type": "ordinal", "encoding": ["Poco", "Mucho"]},
+        {"type": "binary", "encoding": {}}
+    ]
+    with pytest.raises(ValueError) as error:
+        EncodingPlan.from_dict(spec)
+
+    message = str(error.value)
+    assert "tipo desconocido 'binario'" in message
+    assert "'encoding' debe ser un diccionario" in message
+    assert "falta 'question'" in message
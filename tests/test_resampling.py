@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from taller_utils.analysis import resumen_relaciones_con_target
+from taller_utils.resampling import pruebas_permutacion
+
+TARGET = "¿Has tenido la idea de retirarte o cambiarte a otra carrera?"
+
+def _encuesta_codificada(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, n)
+    df = pd.DataFrame({
+        TARGET: y,
+        "Facultad": rng.choice(["Ingeniería", "Medicina"], n),
+        "¿Qué tanto te gusta estudiar?": pd.array(rng.integers(0, 5, n) + y, dtype="Int8"),
+        "¿En qué horario prefieres estudiar?": pd.Categorical(rng.choice(["M", "T", "N"], n)),
+        "¿Qué lugar(es) utilizas para estudiar?__A": (rng.random(n) < 0.3 + 0.3 * y).astype(np.uint8),
+        "¿Qué lugar(es) utilizas para estudiar?__B": (rng.random(n) < 0.5).astype(np.uint8),
+    })
+    df.loc[::9, "¿Qué tanto te gusta estudiar?"] = pd.NA
+    return df
+
+def test_permutaciones_reproducibles_y_consistentes_con_resumen():
+    """
+    Verifica el motor de permutaciones contra las pruebas asintóticas y su reproducibilidad.
+
+    El test asegura que:
+    - Los estadísticos observados y los efectos coinciden con `resumen_relaciones_con_target`.
+    - Con la misma semilla el resultado es idéntico, también repartiendo los lotes en procesos.
+    - Una asociación fuerte da el p-valor mínimo (1 / (n_permutaciones + 1)) y una nula no.
+    """
+    df = _encuesta_codificada().drop(columns="Facultad")
+    resultado = pruebas_permutacion(df, TARGET, n_permutaciones=999, semilla=7, tamano_lote=200)
+    resumen = resumen_relaciones_con_target(df, TARGET)
+
+    assert resultado["estadistico"].iloc[[0, 2, 3]].tolist() == pytest.approx(
+        [resumen["estadistico"].iloc[0], resumen["efecto"].iloc[2], resumen["efecto"].iloc[3]]
+    )
+    assert resultado["efecto"].tolist() == pytest.approx(resumen["efecto"].tolist())
+    assert resultado["p_permutacion"].iloc[0] == pytest.approx(1 / 1000)
+    assert resultado["p_permutacion"].iloc[2] == pytest.approx(1 / 1000)
+    assert resultado["p_permutacion"].iloc[3] > 0.05
+
+    repetido = pruebas_permutacion(df, TARGET, n_permutaciones=999, semilla=7, tamano_lote=200, n_jobs=2)
+    pd.testing.assert_frame_equal(resultado, repetido)
+    distinto = pruebas_permutacion(df, TARGET, n_permutaciones=999, semilla=8, tamano_lote=200)
+    assert not distinto["p_permutacion"].equals(resultado["p_permutacion"])
+
+def test_bootstrap_multiselect_y_subgrupos():
+    """
+    Verifica los intervalos bootstrap de las multiselect y la evaluación por subgrupo.
+
+    El test asegura que:
+    - Cada intervalo contiene la diferencia de proporciones observada y solo existe para multiselect.
+    - Con `por`, se evalúa cada subgrupo por separado y sus tamaños suman los del total.
+    """
+    df = _encuesta_codificada(n=400, seed=1)
+    resultado = pruebas_permutacion(df, TARGET, n_permutaciones=199, semilla=0, por="Facultad")
+
+    assert resultado["Facultad"].unique().tolist() == ["Ingeniería", "Medicina"]
+    multi = resultado[resultado["tipo"] == "multiselect"]
+    assert (multi["ic_inferior"] <= multi["estadistico"]).all()
+    assert (multi["estadistico"] <= multi["ic_superior"]).all()
+    assert resultado.loc[resultado["tipo"] != "multiselect", "ic_inferior"].isna().all()
+
+    tamanos = multi[multi["opcion"] == "A"][["n_0", "n_1"]].sum()
+    assert tamanos.tolist() == [(df[TARGET] == 0).sum(), (df[TARGET] == 1).sum()]
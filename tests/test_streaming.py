@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from taller_utils.analysis import _estadisticas_exploracion, explorar_relacion_con_target
+from taller_utils.dataset import open_processed_dataset, write_processed_dataset
+from taller_utils.streaming import QuantileSketch, TargetAggregates
+
+def _encuesta(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "target": rng.integers(0, 2, n),
+        "gusto": pd.array(rng.integers(0, 5, n), dtype="Int8"),
+        "horario": pd.Categorical(rng.choice(["M", "T", "N"], n), categories=["N", "T", "M"]),
+        "lugar__A": rng.integers(0, 2, n).astype("uint8"),
+        "lugar__B": rng.integers(0, 2, n).astype("uint8"),
+    })
+    df.loc[::9, "gusto"] = pd.NA
+    return df
+
+def test_streaming_aggregates_match_in_memory_statistics(tmp_path):
+    """
+    Verifica que las estadísticas acumuladas por bloques coinciden con las calculadas en memoria.
+
+    El test asegura que:
+    - Las preguntas ordinales, categóricas y multiselect dan las mismas tablas, resúmenes y pruebas.
+    - Combinar estados parciales (como los de workers en paralelo) da lo mismo que un solo recorrido.
+    - `explorar_relacion_con_target` acepta `tamano_bloque` con un `ProcessedDataset`.
+    """
+    df = _encuesta()
+    path = tmp_path / "encuesta.parquet"
+    write_processed_dataset(df, str(path))
+    dataset = open_processed_dataset(str(path))
+
+    for pregunta, multi in [("gusto", []), ("horario", []), ("lugar", ["lugar__A", "lugar__B"])]:
+        esperado = _estadisticas_exploracion(df, pregunta, "target", multi)
+        obtenido = TargetAggregates.from_dataset(dataset, pregunta, "target", batch_size=500).statistics()
+        partes = [TargetAggregates.from_batches([df.iloc[i:i + 700]], pregunta, "target") for i in range(0, len(df), 700)]
+        combinado = partes[0]
+        for parte in partes[1:]:
+            combinado.merge(parte)
+
+        for resultado in (obtenido, combinado.statistics()):
+            assert resultado["tipo"] == esperado["tipo"]
+            for clave in ("resumen", "tabla", "medios"):
+                if clave in esperado:
+                    pd.testing.assert_frame_equal(resultado[clave], esperado[clave], check_dtype=False, check_names=False,
+                                                  check_index_type=False, check_categorical=False)
+            if "u" in esperado:
+                assert resultado["u"] == esperado["u"]
+                assert np.isclose(resultado["p_valor"], esperado["p_valor"])
+            if "prueba" in esperado:
+                assert resultado["prueba"]["prueba"] == esperado["prueba"]["prueba"]
+                assert np.isclose(resultado["prueba"]["p_valor"], esperado["prueba"]["p_valor"])
+
+    figuras = explorar_relacion_con_target(dataset, "gusto", "target", mostrar=False, tamano_bloque=500)
+    assert len(figuras) == 2
+
+def test_quantile_sketch_is_bounded_and_mergeable():
+    """
+    Verifica el resumen de cuantiles aproximados.
+
+    El test asegura que:
+    - Con pocos valores los cuantiles son exactos, como `np.quantile`.
+    - Con muchos valores guarda una cantidad acotada de muestras y el error de rango es chico.
+    - La cantidad, la media y la desviación combinadas son exactas.
+    """
+    rng = np.random.default_rng(1)
+    pocos = rng.normal(size=200)
+    assert np.isclose(QuantileSketch().update(pocos).quantile(0.3), np.quantile(pocos, 0.3))
+
+    valores = rng.exponential(size=200_000)
+    partes = [QuantileSketch(k=256).update(parte) for parte in np.array_split(valores, 16)]
+    sketch = partes[0]
+    for parte in partes[1:]:
+        sketch.merge(parte)
+
+    assert sum(len(level) for level in sketch.levels) < 256 * 12
+    for q in (0.1, 0.5, 0.9):
+        rango = (valores < sketch.quantile(q)).mean()
+        assert abs(rango - q) < 0.02
+    assert sketch.count == len(valores)
+    assert np.isclose(sketch.mean, valores.mean())
+    assert np.isclose(sketch.describe()[2], valores.std(ddof=1))
@@ -0,0 +1,40 @@
+import pandas as pd
+from taller_utils.encoding import process_survey_data
+from taller_utils.plan import load_encoding_plan
+from taller_utils.synthetic import BIRTH_DATE_COLUMN, SYNTHETIC_TARGET, generate_survey, write_synthetic_survey
+
+def test_generate_survey_is_reproducible_and_encodable():
+    """
+    Verifica que la encuesta sintética sea reproducible y se codifique con su propia especificación.
+
+    El test asegura que:
+    - La misma semilla genera exactamente la misma encuesta.
+    - Las fracciones de faltantes y no mapeados se respetan aproximadamente.
+    - Todas las preguntas de la especificación están en la encuesta y se codifican.
+    """
+    df, spec = generate_survey(20_000, seed=3, unmapped_fraction=0.02, missing_fraction=0.1)
+    again, _ = generate_survey(20_000, seed=3, unmapped_fraction=0.02, missing_fraction=0.1)
+    pd.testing.assert_frame_equal(df, again)
+
+    questions = [entry["question"] for entry in spec["survey_responses"]]
+    assert {entry["type"] for entry in spec["survey_responses"]} == {"binary", "ordinal", "categorical", "multiselect"}
+    assert list(df.columns) == questions + [BIRTH_DATE_COLUMN]
+    assert 0.08 < df[SYNTHETIC_TARGET].isna().mean() < 0.12
+
+    encoded, report = process_survey_data(df, spec, log_unmapped=False, return_report=True)
+    mapped = df[SYNTHETIC_TARGET].notna().sum() - report.total(SYNTHETIC_TARGET)
+    assert 0.015 < report.total(SYNTHETIC_TARGET) / df[SYNTHETIC_TARGET].notna().sum() < 0.025
+    assert encoded[SYNTHETIC_TARGET].notna().sum() == mapped
+    assert "Pregunta multiselect 1__A" in encoded.columns
+
+def test_write_synthetic_survey_matches_yaml(tmp_path):
+    """
+    Verifica que el CSV y el YAML escritos se puedan cargar con el flujo normal del pipeline.
+    """
+    csv_path, yaml_path = tmp_path / "encuesta.csv", tmp_path / "encodings.yaml"
+    write_synthetic_survey(str(csv_path), str(yaml_path), 500, seed=1)
+
+    plan = load_encoding_plan(str(yaml_path), use_cache=False)
+    _, spec = generate_survey(500, seed=1)
+    assert plan.to_encoding_dict() == spec
+    assert len(pd.read_csv(csv_path)) == 500